@@ -0,0 +1,167 @@
+"""
+Benchmarks of the ELM327 driver against a simulated adapter.
+
+Run with: python -m benchmarks.elm327 [--backend pty|tcp|sim|<serial port>] [--low-latency] [--output results.json]
+
+The pty backend (default) serves the simulator on a pseudo-terminal in other threads, so the CPU time measured in the
+calling thread is the one of the driver (and pyserial). The tcp backend serves it on a local TCP port, like a WiFi
+adapter. With the sim backend, the simulation runs in the calling thread and is counted too. A serial port runs the
+benchmarks against a real adapter; run them with and without --low-latency to measure the effect of the low latency
+mode of the port (FTDI latency timer).
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from core.collectors.ELM327 import ELM327
+from core.collectors.command_queue import CommandQueue
+from core.connection.simulator import ELM327Simulator, PtyELM327Simulator, TCPELM327Simulator
+
+PIDS = [0x04, 0x05, 0x0B, 0x0C, 0x0D, 0x0F]
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """
+    Summary of latencies (in seconds)
+    """
+    samples = sorted(samples)
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+    return {'min': samples[0], 'p50': pct(50), 'p90': pct(90), 'p99': pct(99), 'max': samples[-1],
+            'mean': statistics.fmean(samples)}
+
+
+def measure(func: Callable[[], object], iterations: int) -> Dict[str, object]:
+    """
+    Calls func several times. Returns the latency percentiles, the calls per second and the CPU time per call spent in
+    the calling thread.
+    """
+    latencies = []
+    cpu = time.thread_time()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    cpu = time.thread_time() - cpu
+    return {'latency': percentiles(latencies), 'per_second': iterations / elapsed, 'cpu_per_call': cpu / iterations}
+
+
+class Backend:
+    """
+    Simulated adapter, in-process or on a pseudo-terminal
+    """
+
+    def __init__(self, kind: str, low_latency: bool = False, **sim_args):
+        from core.connection.usb_serial import USBSerial
+
+        self.kind = kind
+        self._pty = None
+        self._server = None
+        if kind == 'pty':
+            self._pty = PtyELM327Simulator(**sim_args)
+            self.connection = USBSerial(self._pty.port, low_latency=low_latency)
+        elif kind == 'tcp':
+            from core.connection.tcp_socket import TCPSocket
+            self._server = TCPELM327Simulator(**sim_args)
+            self.connection = TCPSocket(*self._server.address)
+        elif kind == 'sim':
+            self.connection = ELM327Simulator(**sim_args)
+        else:  # serial port of an adapter
+            self.connection = USBSerial(kind, low_latency=low_latency)
+
+    def close(self):
+        if self._server is not None:
+            self.connection.close()
+            self._server.close()
+        elif self.kind != 'sim':
+            self.connection.com.close()
+        if self._pty is not None:
+            self._pty.close()
+
+
+def run(backend: str, iterations: int, latency: float, response_timeout: float, baudrate: bool,
+        low_latency: bool = False) -> Dict[str, object]:
+    sim_args = {'latency': latency, 'response_timeout': response_timeout, 'byte_timing': True}
+    b = Backend(backend, low_latency, **sim_args)
+    try:
+        t = time.perf_counter()
+        elm = ELM327(b.connection)
+        results = {'connect': {'reset_to_ready': time.perf_counter() - t},
+                   'latency_timer': getattr(b.connection, 'latency_timer', None)}
+
+        # no baudrate on a network link
+        serial = hasattr(b.connection, 'baudrate')
+        if baudrate and serial:
+            elm.negotiate_baudrate(force=True)
+        results['baudrate'] = elm.baudrate if serial else None
+
+        # the first requests learn the protocol and the response counts
+        elm.query_pids(PIDS)
+        for pid in PIDS:
+            elm.query(0x01, pid)
+
+        results['send_command'] = measure(lambda: elm.send_command(b'AT I'), iterations)
+        results['query_single'] = measure(lambda: elm.query(0x01, 0x0C), iterations)
+
+        single = measure(lambda: [elm.query(0x01, pid) for pid in PIDS], iterations // len(PIDS) or 1)
+        batched = measure(lambda: elm.query_pids(PIDS), iterations // len(PIDS) or 1)
+        for r in (single, batched):
+            r['pids_per_second'] = r['per_second'] * len(PIDS)
+        results['pids_single'] = single
+        results['pids_batched'] = batched
+
+        # same PID polled back-to-back through the command queue (repeated by a carriage return)
+        with CommandQueue(elm) as queue:
+            queued = measure(lambda: [f.result() for f in [queue.query(0x01, 0x0C) for _ in PIDS]],
+                             iterations // len(PIDS) or 1)
+        queued['pids_per_second'] = queued['per_second'] * len(PIDS)
+        results['pids_queued'] = queued
+
+        t = time.perf_counter()
+        elm.connect()
+        results['connect']['reconnect'] = time.perf_counter() - t
+    finally:
+        b.close()
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', default='pty', help="pty, tcp, sim or the serial port of an adapter")
+    parser.add_argument('--low-latency', action='store_true', help="set the low latency mode of the serial port")
+    parser.add_argument('--iterations', type=int, default=300)
+    parser.add_argument('--latency', type=float, default=0.0, help="vehicle answer time (s)")
+    parser.add_argument('--response-timeout', type=float, default=0.0, help="adapter final wait (s)")
+    parser.add_argument('--no-baudrate', action='store_true', help="stay at the default baudrate")
+    parser.add_argument('--output', help="JSON file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'parameters': vars(args),
+        'results': run(args.backend, args.iterations, args.latency, args.response_timeout, not args.no_baudrate,
+                       args.low_latency),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
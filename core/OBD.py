@@ -1,1050 +1,219 @@
-from enum import Enum
+import mmap
+import os
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 
-class OBDErrorCodes(Enum):
+# letter of the DTC given by the 2 first bits of its raw value
+DTC_CATEGORIES = 'PCBU'
+CATEGORY_NAMES = {
+    'P': "Groupe motopropulseur",
+    'C': "Châssis",
+    'B': "Carrosserie",
+    'U': "Réseau",
+}
+
+_MAGIC = b'DTC1'
+_HEADER_SIZE = 12  # magic, number of codes, number of pages
+_PAGE_SIZE = 256
+
+
+def raw_to_dtc(raw: int) -> str:
+    """
+    Converts the raw 2-byte value of a DTC (as answered in Mode 03) into its code, e.g. 0x0133 -> 'P0133'.
+    """
+    return f"{DTC_CATEGORIES[raw >> 14]}{(raw >> 12) & 0x3}{raw & 0xFFF:03X}"
+
+
+def dtc_to_raw(code: str) -> int:
+    """
+    Converts a DTC code into its raw 2-byte value, e.g. 'P0133' -> 0x0133.
+    """
+    if len(code) != 5 or code[0] not in DTC_CATEGORIES or code[1] not in '0123':
+        raise ValueError(f"Bad DTC code: {code}")
+    return (DTC_CATEGORIES.index(code[0]) << 14) | (int(code[1]) << 12) | int(code[2:], 16)
+
+
+def is_manufacturer_specific(raw: int) -> bool:
+    """
+    True if the DTC is in a range defined by the manufacturers (P1xxx, P30xx-P33xx, B/C/U1xxx and B/C/U2xxx)
+    """
+    category, digit = raw >> 14, (raw >> 12) & 0x3
+    if category == 0:  # P
+        return digit == 1 or (digit == 3 and (raw & 0xF00) <= 0x300)
+    return digit in (1, 2)
+
+
+def unpack_dtcs(payload: bytes) -> List[int]:
     """
-    List of OBD error codes
-    Extracted from https://www.outilsobdfacile.fr/code-defaut-standard-obd.php
+    Raw values of the DTC packed in an answer to Mode 03, 07 or 0A (2 bytes each, big-endian), without the 0000 padding.
+    """
+    raws = array('H', payload[:len(payload) & ~1])
+    if sys.byteorder == 'little':
+        raws.byteswap()
+    return [raw for raw in raws if raw]
+
+
+class DTCDatabase:
+    """
+    Descriptions of the OBD error codes (DTC), read from a packed file that is memory-mapped at the first lookup.
+
+    The file is made by build() from a text table (code, tab, description per line). Its layout (little-endian) is:
+    magic, number of codes and number of pages (uint32), 256 page numbers (uint16, 0 if no code in the page) indexed
+    by the high byte of the raw DTC, the pages (256 uint16 code numbers, 0 if no code) indexed by the low byte, the
+    offsets of the descriptions (number of codes + 1 uint32) and the UTF-8 descriptions.
+    So a lookup by raw value is two array accesses, whatever the number of codes.
     """
 
-    P0000 = "Aucune panne détectée"
-    P0001 = "Commande de régulateur de volume de carburant - circuit ouvert"
-    P0002 = "Commande de régulateur de volume de carburant - plage de mesure/performance du circuit"
-    P0003 = "Commande de régulateur de volume de carburant - circuit trop bas"
-    P0004 = "Commande de régulateur de volume de carburant - circuit trop haut"
-    P0005 = "électrovanne de coupure carburant - circuit ouvert"
-    P0006 = "électrovanne de coupure carburant - circuit trop bas"
-    P0007 = "électrovanne de coupure carburant - circuit trop haut"
-    P0008 = "Calage moteur, ligne 1 - performance du moteur"
-    P0009 = "Calage moteur, ligne 2 - performance du moteur"
-    P0010 = "Capteur d'arbre à cames d'admission, ligne 1 - panne du circuit"
-    P0011 = "Position d'arbre à cames, ligne 1 - calage excessivement avancé/performance du système"
-    P0012 = "Position d'arbre à cames, ligne 1 - calage excessivement retardé"
-    P0013 = "Capteur d'arbre à cames d'échappement, ligne 1 - panne du circuit"
-    P0014 = "Capteur d'arbre à cames d'échappement, ligne 1 - calage excessivement avancé/performance du système"
-    P0015 = "Capteur d'arbre à cames d'échappement, ligne 1 - calage excessivement retardé"
-    P0016 = "Position du vilebrequin/position d'arbre à cames, ligne 1 capteur A - corrélation"
-    P0017 = "Position du vilebrequin/position d'arbre à cames, ligne 1 capteur B - corrélation"
-    P0018 = "Position du vilebrequin/position d'arbre à cames, ligne 2 capteur A - corrélation"
-    P0019 = "Position du vilebrequin/position d'arbre à cames, ligne 2 capteur B - corrélation"
-    P0020 = "Capteur d'arbre à cames d'admission, ligne 2 - panne du circuit"
-    P0021 = "Position d'arbre à cames d'admission, ligne 2 - calage excessivement avancé"
-    P0022 = "Position d'arbre à cames d'admission, ligne 2 - calage excessivement retardé"
-    P0023 = "Capteur d'arbre à cames d'échappement, ligne 2 - panne du circuit"
-    P0024 = "Position d'arbre à cames d'échappement, ligne 2 - calage excessivement avancé"
-    P0025 = "Position d'arbre à cames d'échappement, ligne 2 - calage excessivement retardé"
-    P0026 = "Système électrovanne de commande de soupape d'admission, ligne 1 - plage de mesure/performance"
-    P0027 = "Système électrovanne de commande de soupape d'échappement, ligne 1 - plage de mesure/performance"
-    P0028 = "Système électrovanne de commande de soupape d'admission, ligne 2 - plage de mesure/performance"
-    P0029 = "Système électrovanne de commande de soupape d'échappement, ligne 2 - plage de mesure/performance"
-    P0030 = "Sonde Lambda 1, ligne 1, commande de chauffage - panne du circuit"
-    P0031 = "Sonde Lambda 1, ligne 1, commande de chauffage - circuit trop bas"
-    P0032 = "Sonde Lambda 1, ligne 1, commande de chauffage - circuit trop haut"
-    P0033 = "électrovanne de décharge du turbocompresseur - panne du circuit"
-    P0034 = "électrovanne de décharge du turbocompresseur - circuit trop bas"
-    P0035 = "électrovanne de décharge du turbocompresseur - circuit trop haut"
-    P0036 = "Sonde Lambda 2, ligne 1 , commande de chauffage - panne du circuit"
-    P0037 = "Sonde Lambda 2, ligne 1 , commande de chauffage - circuit trop bas"
-    P0038 = "Sonde Lambda 2, ligne 1 , commande de chauffage - circuit trop haut"
-    P0039 = "Soupape de dérivation du compresseur/turbocompresseur, circuit de commande - plage de mesure/performance"
-    P0040 = "Signaux sondes Lambda inversées, ligne 1 capteur 1/ligne 2 capteur 1"
-    P0041 = "Signaux sondes Lambda inversées, ligne 1 capteur 2/ligne 2 capteur 2"
-    P0042 = "Sonde Lambda 3, ligne 1 , commande de chauffage - panne du circuit"
-    P0043 = "Sonde Lambda 3, ligne 1 , commande de chauffage - circuit trop bas"
-    P0044 = "Sonde Lambda 3, ligne 1 , commande de chauffage - circuit trop haut"
-    P0045 = "électrovanne de commande de la pression de suralimentation - circuit ouvert"
-    P0046 = "électrovanne de commande de la pression de suralimentation du compresseur/turbocompresseur - plage de " \
-            "mesure/performance du circuit "
-    P0047 = "électrovanne de commande de la pression de suralimentation du compresseur/turbocompresseur - circuit " \
-            "trop bas "
-    P0048 = "électrovanne de commande de la pression de suralimentation du compresseur/turbocompresseur - circuit " \
-            "trop haut "
-    P0049 = "Turbine de compresseur/turbocompresseur - régime excessif"
-    P0050 = "Sonde Lambda 1, ligne 2, commande de chauffage - panne du circuit"
-    P0051 = "Sonde Lambda 1, ligne 2, commande de chauffage - circuit trop bas"
-    P0052 = "Sonde Lambda 1, ligne 2, commande de chauffage - circuit trop haut"
-    P0053 = "Sonde Lambda, ligne 1 , capteur 1 - résistance du chauffage"
-    P0054 = "Sonde Lambda, ligne 1 , capteur 2 - résistance du chauffage"
-    P0055 = "Sonde Lambda, ligne 1 , capteur 3 - résistance du chauffage"
-    P0056 = "Sonde Lambda 2, ligne 2, commande de chauffage - panne du circuit"
-    P0057 = "Sonde Lambda 2, ligne 2, commande de chauffage - circuit de chauffage trop faible"
-    P0058 = "Sonde Lambda 2, ligne 2, commande de chauffage - circuit trop haut"
-    P0059 = "Sonde Lambda, ligne 2, capteur 1 - résistance du chauffage"
-    P0060 = "Sonde Lambda, ligne 2, capteur 2 - résistance du chauffage"
-    P0061 = "Sonde Lambda, ligne 2, capteur 3 -résistance du chauffage"
-    P0062 = "Sonde Lambda 3, ligne 2, commande de chauffage - panne du circuit"
-    P0063 = "Sonde Lambda 3, ligne 2, commande de chauffage - circuit trop bas"
-    P0064 = "Sonde Lambda 3, ligne 2, commande de chauffage - circuit trop haut"
-    P0065 = "Injecteur assisté par air comprimé - problème de performance/de limites"
-    P0066 = "Injecteur assisté par air comprimé - panne du circuit/circuit trop bas"
-    P0067 = "Injecteur assisté par air comprimé - circuit trop haut"
-    P0068 = "Corrélation capteur de pression absolue du collecteur d'admission/débitmètre d'air/position du papillon"
-    P0069 = "Corrélation capteur de pression absolue du collecteur d'admission/capteur de pression atmosphérique"
-    P0070 = "Sonde de température extérieure - panne du circuit"
-    P0071 = "Sonde de température extérieure - problème de performance/de limites"
-    P0072 = "Sonde de température extérieure - valeur d'entrée trop basse"
-    P0073 = "Sonde de température extérieure - valeur d'entrée trop haute"
-    P0074 = "Sonde de température extérieure - circuit intermittent"
-    P0075 = "électrovanne de commande de soupape d'admission, ligne 1 - panne du circuit"
-    P0076 = "électrovanne de commande de soupape d'admission, ligne 1 - circuit trop bas"
-    P0077 = "électrovanne de commande de soupape d'admission, ligne 1 - circuit trop haut"
-    P0078 = "électrovanne de commande de soupape d'échappement ligne 1 - panne du circuit"
-    P0079 = "électrovanne de commande de soupape d'échappement ligne 1 - circuit trop bas"
-    P0080 = "électrovanne de commande de soupape d'échappement ligne 1 - circuit trop haut"
-    P0081 = "électrovanne de commande de soupape d'admission, ligne 2 - panne du circuit"
-    P0082 = "électrovanne de commande de soupape d'admission, ligne 2 - circuit trop bas"
-    P0083 = "électrovanne de commande de soupape d'admission, ligne 2 - circuit trop haut"
-    P0084 = "électrovanne de commande de soupape d'échappement ligne 2 - panne du circuit"
-    P0085 = "électrovanne de commande de soupape d'échappement ligne 2 - circuit trop bas"
-    P0086 = "électrovanne de commande de soupape d'échappement ligne 2 - circuit trop haut"
-    P0087 = "Rampe de distribution/pression du système trop faible"
-    P0088 = "Rampe de distribution/pression du système trop haute"
-    P0089 = "Régulateur de pression du carburant - problème de performance"
-    P0090 = "électrovanne de dosage de carburant - circuit ouvert"
-    P0091 = "électrovanne de dosage de carburant - court-circuit sur masse"
-    P0092 = "électrovanne de dosage de carburant - court-circuit sur l'alimentation"
-    P0093 = "Fuite dans le système d'alimentation en carburant - fuite importante détectée"
-    P0094 = "Fuite dans le système d'alimentation en carburant - petit fuite détectée"
-    P0095 = "Sonde de température d'air d'admission 2 - panne du circuit"
-    P0096 = "Sonde de température d'air d'admission 2 - plage de mesure/performance du circuit"
-    P0097 = "Sonde de température d'air d'admission 2 - signal d'entrée du circuit trop bas"
-    P0098 = "Sonde de température d'air d'admission 2 - signal d'entrée du circuit trop haut"
-    P0099 = "Sonde de température d'air d'admission 2 - circuit intermittent/instable"
-    P0100 = "Débitmètre d'air - panne du circuit"
-    P0101 = "Débitmètre d'air - problème de performance/de limites"
-    P0102 = "Débitmètre d'air - valeur d'entrée trop basse"
-    P0103 = "Débitmètre d'air - valeur d'entrée trop haute"
-    P0104 = "Débitmètre d'air - circuit intermittent"
-    P0105 = "Capteur de pression absolue du collecteur d'admission/capteur de pression atmosphérique - panne du circuit"
-    P0106 = "Capteur de pression absolue du collecteur d'admission/capteur de pression atmosphérique - problème de " \
-            "performance/de limites "
-    P0107 = "Capteur de pression absolue du collecteur d'admission/capteur de pression atmosphérique - valeur " \
-            "d'entrée trop basse "
-    P0108 = "Capteur de pression absolue du collecteur d'admission/capteur de pression atmosphérique - valeur " \
-            "d'entrée trop haute "
-    P0109 = "Capteur de pression absolue du collecteur d'admission/capteur de pression atmosphérique - circuit " \
-            "intermittent "
-    P0110 = "Sonde de température d'air d'admission - panne du circuit - Plus de détails..."
-    P0111 = "Sonde de température d'air d'admission - problème de performance/de limites"
-    P0112 = "Sonde de température d'air d'admission - valeur d'entrée trop basse"
-    P0113 = "Sonde de température d'air d'admission - valeur d'entrée trop haute"
-    P0114 = "Sonde de température d'air d'admission - circuit intermittent"
-    P0115 = "Sonde de température du liquide de refroidissement - panne du circuit"
-    P0116 = "Sonde de température du liquide de refroidissement - problème de performance/de limites"
-    P0117 = "Sonde de température du liquide de refroidissement - valeur d'entrée trop basse"
-    P0118 = "Sonde de température du liquide de refroidissement - valeur d'entrée trop haute"
-    P0119 = "Sonde de température du liquide de refroidissement - circuit intermittent"
-    P0120 = "Capteur de position de papillon A/capteur de position de la pédale d'accélérateur A - panne du circuit"
-    P0121 = "Capteur de position de papillon A/capteur de position de la pédale d'accélérateur A - problème de " \
-            "performance/de limites "
-    P0122 = "Capteur de position de papillon A/capteur de position de la pédale d'accélérateur A - valeur d'entrée " \
-            "trop basse "
-    P0123 = "Capteur de position de papillon A/capteur de position de la pédale d'accélérateur A - valeur d'entrée " \
-            "trop haute "
-    P0124 = "Capteur de position de papillon A/capteur de position de la pédale d'accélérateur A - circuit intermittent"
-    P0125 = "Température du liquide de refroidissement insuffisante pour commande en boucle fermée"
-    P0126 = "Température du liquide de refroidissement insuffisante pour un fonctionnement stable"
-    P0127 = "Température d'air d'admission trop haute"
-    P0128 = "Thermostat du liquide de refroidissement - température du liquide de refroidissement inférieure à la " \
-            "température de régulation du thermostat "
-    P0129 = "Pression atmosphérique trop basse"
-    P0130 = "Sonde Lambda 1, ligne 1 - panne du circuit"
-    P0131 = "Sonde Lambda 1, ligne 1 - signal bas"
-    P0132 = "Sonde Lambda 1, ligne 1 - signal haut"
-    P0133 = "Sonde Lambda 1, ligne 1 - réponse lente"
-    P0134 = "Sonde Lambda 1, ligne 1 - pas d'activité détectée"
-    P0135 = "Sonde Lambda 1, ligne 1 - commande de chauffage - panne de circuit"
-    P0136 = "Sonde Lambda 2, ligne 1 - panne du circuit"
-    P0137 = "Sonde Lambda 2, ligne 1 - signal bas"
-    P0138 = "Sonde Lambda 2, ligne 1 - signal haut"
-    P0139 = "Sonde Lambda 2, ligne 1 - réponse lente"
-    P0140 = "Sonde Lambda 2, ligne 1 - pas d'activité détectée"
-    P0141 = "Sonde Lambda 2, ligne 1 - commande de chauffage - panne de circuit"
-    P0142 = "Sonde Lambda 3, ligne 1 - panne du circuit"
-    P0143 = "Sonde Lambda 3, ligne 1 - signal bas"
-    P0144 = "Sonde Lambda 3, ligne 1 - signal haut"
-    P0145 = "Sonde Lambda 3, ligne 1 - réponse lente"
-    P0146 = "Sonde Lambda 3, ligne 1 - pas d'activité détectée"
-    P0147 = "Sonde Lambda 3, ligne 1 - commande de chauffage - panne de circuit"
-    P0148 = "Erreur de débit de carburant"
-    P0149 = "Erreur de calage d'injection"
-    P0150 = "Sonde Lambda 1, ligne 2 - panne du circuit"
-    P0151 = "Sonde Lambda 1, ligne 2 - signal bas"
-    P0152 = "Sonde Lambda 1, ligne 2 - signal haut"
-    P0153 = "Sonde Lambda 1, ligne 2 - réponse lente"
-    P0154 = "Sonde Lambda 1, ligne 2 - pas d'activité détectée"
-    P0155 = "Sonde Lambda 1, ligne 2 - commande de chauffage - panne de circuit"
-    P0156 = "Sonde Lambda 2, ligne 2 - panne du circuit"
-    P0157 = "Sonde Lambda 2, ligne 2 - signal bas"
-    P0158 = "Sonde Lambda 2, ligne 2 - signal haut"
-    P0159 = "Sonde Lambda 2, ligne 2 - réponse lente"
-    P0160 = "Sonde Lambda 2, ligne 2 - pas d'activité détectée"
-    P0161 = "Sonde Lambda 2, ligne 2 - commande de chauffage - panne de circuit"
-    P0162 = "Sonde Lambda 3, ligne 2 - panne du circuit"
-    P0163 = "Sonde Lambda 3, ligne 2 - signal bas"
-    P0164 = "Sonde Lambda 3, ligne 2 - signal haut"
-    P0165 = "Sonde Lambda 3, ligne 2 - réponse lente"
-    P0166 = "Sonde Lambda 3, ligne 2 - pas d'activité détectée"
-    P0167 = "Sonde Lambda 3, ligne 2 - commande de chauffage - panne de circuit"
-    P0168 = "Température du carburant trop haute"
-    P0169 = "Erreur de composition du carburant"
-    P0170 = "Ajustement du carburant, ligne 1 - panne"
-    P0171 = "Mélange trop pauvre, ligne 1"
-    P0172 = "Mélange trop riche, ligne 1"
-    P0173 = "Ajustement du carburant, ligne 2 - panne"
-    P0174 = "Mélange trop pauvre, ligne 2"
-    P0175 = "Mélange trop riche, ligne 2"
-    P0176 = "Capteur de composition du carburant - panne du circuit"
-    P0177 = "Capteur de composition du carburant - problème de performance/de limites"
-    P0178 = "Capteur de composition du carburant - valeur d'entrée trop basse"
-    P0179 = "Capteur de composition du carburant - valeur d'entrée trop haute"
-    P0180 = "Sonde de température du carburant A - panne du circuit"
-    P0181 = "Sonde de température du carburant A - problème de performance/de limites"
-    P0182 = "Sonde de température du carburant A - valeur d'entrée trop basse"
-    P0183 = "Sonde de température du carburant A - valeur d'entrée trop haute"
-    P0184 = "Sonde de température du carburant A - circuit intermittent"
-    P0185 = "Sonde de température du carburant B - panne du circuit"
-    P0186 = "Sonde de température du carburant B - problème de performance/de limites"
-    P0187 = "Sonde de température du carburant B - valeur d'entrée trop basse"
-    P0188 = "Sonde de température du carburant B - valeur d'entrée trop haute"
-    P0189 = "Sonde de température du carburant B - circuit intermittent"
-    P0190 = "Capteur de pression de la rampe de distribution - panne du circuit"
-    P0191 = "Capteur de pression de la rampe de distribution - problème de performance/de limites"
-    P0192 = "Capteur de pression de la rampe de distribution - valeur d'entrée trop basse"
-    P0193 = "Capteur de pression de la rampe de distribution - valeur d'entrée trop haute"
-    P0194 = "Capteur de pression de la rampe de distribution - circuit intermittent"
-    P0195 = "Sonde de température d'huile moteur - panne du circuit"
-    P0196 = "Sonde de température d'huile moteur - problème de performance/de limites"
-    P0197 = "Sonde de température d'huile moteur - valeur d'entrée trop basse"
-    P0198 = "Sonde de température d'huile moteur - valeur d'entrée trop haute"
-    P0199 = "Sonde de température d'huile moteur - circuit intermittent"
-    P0200 = "Injecteur - panne du circuit"
-    P0201 = "Injecteur 1 - panne du circuit"
-    P0202 = "Injecteur 2 - panne du circuit"
-    P0203 = "Injecteur 3 - panne du circuit"
-    P0204 = "Injecteur 4 - panne du circuit"
-    P0205 = "Injecteur 5 - panne du circuit"
-    P0206 = "Injecteur 6 - panne du circuit"
-    P0207 = "Injecteur 7 - panne du circuit"
-    P0208 = "Injecteur 8 - panne du circuit"
-    P0209 = "Injecteur 9 - panne du circuit"
-    P0210 = "Injecteur 10 - panne du circuit"
-    P0211 = "Injecteur 11 - panne du circuit"
-    P0212 = "Injecteur 12 - panne du circuit"
-    P0213 = "Injecteur de départ à froid 1 - panne du circuit"
-    P0214 = "Injecteur de départ à froid 2 - panne du circuit"
-    P0215 = "électrovanne de coupure de carburant - panne du circuit"
-    P0216 = "Commande de calage d'injection - panne du circuit"
-    P0217 = "Surchauffe du moteur"
-    P0218 = "Surchauffe de la transmission"
-    P0219 = "Régime excessif"
-    P0220 = "Capteur de position de papillon B/capteur de position de la pédale d'accélérateur B - panne du circuit"
-    P0221 = "Capteur de position de papillon B/capteur de position de la pédale d'accélérateur B - problème de " \
-            "performance/de limites "
-    P0222 = "Capteur de position de papillon B/capteur de position de la pédale d'accélérateur B- valeur d'entrée " \
-            "trop basse "
-    P0223 = "Capteur de position de papillon B/capteur de position de la pédale d'accélérateur B - valeur d'entrée " \
-            "trop haute "
-    P0224 = "Capteur de position de papillon B/capteur de position de la pédale d'accélérateur B - circuit intermittent"
-    P0225 = "Capteur de position de papillon C/capteur de position de la pédale d'accélérateur C - panne du circuit"
-    P0226 = "Capteur de position de papillon C/capteur de position de la pédale d'accélérateur C - problème de " \
-            "performance/de limites "
-    P0227 = "Capteur de position de papillon C/capteur de position de la pédale d'accélérateur C - valeur d'entrée " \
-            "trop basse "
-    P0228 = "Capteur de position de papillon C/capteur de position de la pédale d'accélérateur C- valeur d'entrée " \
-            "trop haute "
-    P0229 = "Capteur de position de papillon C/capteur de position de la pédale d'accélérateur C- circuit intermittent"
-    P0230 = "Circuit primaire de pompe à carburant - panne du circuit"
-    P0231 = "Circuit secondaire de pompe à carburant - circuit trop bas"
-    P0232 = "Circuit secondaire de pompe à carburant - circuit trop haut"
-    P0233 = "Circuit secondaire de pompe à carburant - circuit intermittent"
-    P0234 = "Condition de suralimentation du moteur - limite dépassée"
-    P0235 = "Capteur de pression absolue du collecteur d'admission A, circuit du turbocompresseur - panne du circuit"
-    P0236 = "Capteur de pression absolue du collecteur d'admission A, circuit du turbocompresseur - problème de " \
-            "performance/de limites "
-    P0237 = "Capteur de pression absolue du collecteur d'admission A, circuit du turbocompresseur - valeur d'entrée " \
-            "trop basse "
-    P0238 = "Capteur de pression absolue du collecteur d'admission A, circuit du turbocompresseur - valeur d'entrée " \
-            "trop haute "
-    P0239 = "Capteur de pression absolue du collecteur d'admission B, circuit du turbocompresseur - panne du circuit"
-    P0240 = "Capteur de pression absolue du collecteur d'admission B, circuit du turbocompresseur - problème de " \
-            "performance/de limites "
-    P0241 = "Capteur de pression absolue du collecteur d'admission B, circuit du turbocompresseur - valeur d'entrée " \
-            "trop basse "
-    P0242 = "Capteur de pression absolue du collecteur d'admission B, circuit du turbocompresseur - valeur d'entrée " \
-            "trop haute "
-    P0243 = "électrovanne de décharge du turbocompresseur A - panne du circuit"
-    P0244 = "électrovanne de décharge du turbocompresseur A - problème de performance/de limites"
-    P0245 = "électrovanne de décharge du turbocompresseur A - circuit trop bas"
-    P0246 = "électrovanne de décharge du turbocompresseur A - circuit trop haut"
-    P0247 = "électrovanne de décharge du turbocompresseur B - panne du circuit"
-    P0248 = "électrovanne de décharge du turbocompresseur B - problème de performance/de limites"
-    P0249 = "électrovanne de décharge du turbocompresseur B - circuit trop bas"
-    P0250 = "électrovanne de décharge du turbocompresseur B - circuit trop haut"
-    P0251 = "Pompe d'injection A, rotor/cames - panne du circuit"
-    P0252 = "Pompe d'injection A, rotor/cames - problème de performance/de limites"
-    P0253 = "Pompe d'injection A, rotor/cames - circuit trop bas"
-    P0254 = "Pompe d'injection A, rotor/cames - circuit trop haut"
-    P0255 = "Pompe d'injection A, rotor/cames - circuit intermittent"
-    P0256 = "Pompe d'injection B, rotor/cames - panne du circuit"
-    P0257 = "Pompe d'injection B, rotor/cames - problème de performance/de limites"
-    P0258 = "Pompe d'injection B, rotor/cames - circuit trop bas"
-    P0259 = "Pompe d'injection B, rotor/cames - circuit trop haut"
-    P0260 = "Pompe d'injection B, rotor/cames - circuit intermittent"
-    P0261 = "Injecteur 1 - circuit trop bas"
-    P0262 = "Injecteur 1 - circuit trop haut"
-    P0263 = "Cylindre 1 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0264 = "Injecteur 2 - circuit trop bas"
-    P0265 = "Injecteur 2 - circuit trop haut"
-    P0266 = "Cylindre 2 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0267 = "Injecteur 3 - circuit trop bas"
-    P0268 = "Injecteur 3 - circuit trop haut"
-    P0269 = "Cylindre 3 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0270 = "Injecteur 4 - circuit trop bas"
-    P0271 = "Injecteur 4 - circuit trop haut"
-    P0272 = "Cylindre 4 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0273 = "Injecteur 5 - circuit trop bas"
-    P0274 = "Injecteur 5 - circuit trop haut"
-    P0275 = "Cylindre 5 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0276 = "Injecteur 6 - circuit trop bas"
-    P0277 = "Injecteur 6 - circuit trop haut"
-    P0278 = "Cylindre 6 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0279 = "Injecteur 7 - circuit trop bas"
-    P0280 = "Injecteur 7 - circuit trop haut"
-    P0281 = "Cylindre 7 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0282 = "Injecteur 8 - circuit trop bas"
-    P0283 = "Injecteur 8 - circuit trop haut"
-    P0284 = "Cylindre 8 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0285 = "Injecteur 9 - circuit trop bas"
-    P0286 = "Injecteur 9 - circuit trop haut"
-    P0287 = "Cylindre 9 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0288 = "Injecteur 10 - circuit trop bas"
-    P0289 = "Injecteur 10 - circuit trop haut"
-    P0290 = "Cylindre 10 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0291 = "Injecteur 11 - circuit trop bas"
-    P0292 = "Injecteur 11 - circuit trop haut"
-    P0293 = "Cylindre 11 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0294 = "Injecteur 12 - circuit trop bas"
-    P0295 = "Injecteur 12 - circuit trop haut"
-    P0296 = "Cylindre 12 - Quantité de fuel injecté - défaut d'équilibrage"
-    P0297 = "Vitesse excessive véhicule"
-    P0298 = "Température d'huile moteur trop haute"
-    P0299 = "Compresseur/turbocompresseur - pression de suralimentation faible"
-    P0300 = "Cylindre(s) multiple(s) - ratés d'allumage aléatoire détectés"
-    P0301 = "Cylindre 1 - ratés d'allumage détectés - Plus de détails..."
-    P0302 = "Cylindre 2 - ratés d'allumage détectés"
-    P0303 = "Cylindre 3 - ratés d'allumage détectés"
-    P0304 = "Cylindre 4 - ratés d'allumage détectés"
-    P0305 = "Cylindre 5 - ratés d'allumage détectés"
-    P0306 = "Cylindre 6 - ratés d'allumage détectés"
-    P0307 = "Cylindre 7 - ratés d'allumage détectés"
-    P0308 = "Cylindre 8 - ratés d'allumage détectés"
-    P0309 = "Cylindre 9 - ratés d'allumage détectés"
-    P0310 = "Cylindre 10 - ratés d'allumage détectés"
-    P0311 = "Cylindre 11 - ratés d'allumage détectés"
-    P0312 = "Cylindre 12 - ratés d'allumage détectés"
-    P0313 = "Ratés d'allumage détectés avec niveau de carburant trop bas"
-    P0314 = "Raté d'allumage dans un seul cylindre - cylindre non spécifié"
-    P0315 = "Système position du vilebrequin - variation non apprise"
-    P0316 = "Ratés d'allumage détectés au démarrage - dans les 1000 premiers tours moteur"
-    P0317 = "Composant détecteur de route accidentée absent"
-    P0318 = "Signal du détecteur de route accidentée A - panne du circuit"
-    P0319 = "Signal du détecteur de route accidentée B - panne du circuit"
-    P0320 = "Capteur de vilebrequin/de régime - panne du circuit"
-    P0321 = "Capteur de vilebrequin/de régime - problème de performance/de limites"
-    P0322 = "Capteur de vilebrequin/de régime - aucun signal"
-    P0323 = "Capteur de vilebrequin/de régime - circuit intermittent"
-    P0324 = "Erreur de système anti-cliquetis"
-    P0325 = "Détecteur de cliquetis 1 (ligne 2 ou capteur unique) - panne du circuit"
-    P0326 = "Détecteur de cliquetis 1 (ligne 2 ou capteur unique) - problème de performance/de limites"
-    P0327 = "Détecteur de cliquetis 1 (ligne 2 ou capteur unique) - valeur d'entrée trop basse"
-    P0328 = "Détecteur de cliquetis 1 (ligne 2 ou capteur unique) - valeur d'entrée trop haute"
-    P0329 = "Détecteur de cliquetis 1 (ligne 2 ou capteur unique) - circuit intermittent"
-    P0330 = "Détecteur de cliquetis 2, ligne 2 - panne du circuit"
-    P0331 = "Détecteur de cliquetis 2, ligne 2 - problème de performance/de limites"
-    P0332 = "Détecteur de cliquetis 2, ligne 2 - valeur d'entrée trop basse"
-    P0333 = "Détecteur de cliquetis 2, ligne 2 - valeur d'entrée trop haute"
-    P0334 = "Détecteur de cliquetis 2, ligne 2 - circuit intermittent"
-    P0335 = "Capteur de vilebrequin - panne du circuit"
-    P0336 = "Capteur de vilebrequin - problème de performance/de limites"
-    P0337 = "Capteur de vilebrequin - valeur d'entrée trop basse"
-    P0338 = "Capteur de vilebrequin - valeur d'entrée trop haute"
-    P0339 = "Capteur de vilebrequin - circuit intermittent"
-    P0340 = "Capteur d'arbre à cames A ligne 1 - panne du circuit"
-    P0341 = "Capteur d'arbre à cames A ligne 1 - problème de performance/de limites"
-    P0342 = "Capteur d'arbre à cames A ligne 1 - valeur d'entrée trop basse"
-    P0343 = "Capteur d'arbre à cames A ligne 1 - valeur d'entrée trop haute"
-    P0344 = "Capteur d'arbre à cames A ligne 1 - circuit intermittent"
-    P0345 = "Capteur d'arbre à cames A ligne 2 - panne du circuit"
-    P0346 = "Capteur d'arbre à cames A ligne 2 - problème de performance/de limites"
-    P0347 = "Capteur d'arbre à cames A ligne 2 - valeur d'entrée trop basse"
-    P0348 = "Capteur d'arbre à cames A ligne 2 - valeur d'entrée trop haute"
-    P0349 = "Capteur d'arbre à cames A ligne 2 - circuit intermittent"
-    P0350 = "Bobine d'allumage, primaire/secondaire - panne du circuit"
-    P0351 = "Bobine d'allumage A, primaire/secondaire - panne du circuit"
-    P0352 = "Bobine d'allumage B, primaire/secondaire - panne du circuit"
-    P0353 = "Bobine d'allumage C, primaire/secondaire - panne du circuit"
-    P0354 = "Bobine d'allumage D, primaire/secondaire - panne du circuit"
-    P0355 = "Bobine d'allumage E, primaire/secondaire - panne du circuit"
-    P0356 = "Bobine d'allumage F, primaire/secondaire - panne du circuit"
-    P0357 = "Bobine d'allumage G, primaire/secondaire - panne du circuit"
-    P0358 = "Bobine d'allumage H, primaire/secondaire - panne du circuit"
-    P0359 = "Bobine d'allumage I, primaire/secondaire - panne du circuit"
-    P0360 = "Bobine d'allumage J, primaire/secondaire - panne du circuit"
-    P0361 = "Bobine d'allumage K, primaire/secondaire - panne du circuit"
-    P0362 = "Bobine d'allumage L, primaire/secondaire - panne du circuit"
-    P0363 = "Ratés d'allumage détectés - alimentation en carburant désactivée"
-    P0364 = "Bobine d'allumage L, primaire/secondaire - panne du circuit"
-    P0365 = "Capteur d'arbre à cames B, ligne 1 - panne du circuit"
-    P0366 = "Capteur d'arbre à cames B, ligne 1 - plage de mesure/performance du circuit"
-    P0367 = "Capteur d'arbre à cames B, ligne 1 - signal d'entrée du circuit trop bas"
-    P0368 = "Capteur d'arbre à cames B, ligne 1 - signal d'entrée du circuit trop haut"
-    P0369 = "Capteur d'arbre à cames B, ligne 1 - circuit intermittent"
-    P0370 = "Référence de calage, signal haute résolution A - panne"
-    P0371 = "Référence de calage, signal haute résolution A - trop de signaux"
-    P0372 = "Référence de calage, signal haute résolution A - trop peu de signaux"
-    P0373 = "Référence de calage, signal haute résolution A - signaux irréguliers intermittents"
-    P0374 = "Référence de calage, signal haute résolution A - pas de signaux"
-    P0375 = "Référence de calage, signal haute résolution B - panne"
-    P0376 = "Référence de calage, signal haute résolution B - trop de signaux"
-    P0377 = "Référence de calage, signal haute résolution B - trop peu de signaux"
-    P0378 = "Référence de calage, signal haute résolution B - signaux irréguliers intermittents"
-    P0379 = "Référence de calage, signal haute résolution B - pas de signaux"
-    P0380 = "Bougies de préchauffage, circuit A - panne - Plus de détails..."
-    P0381 = "Lampe témoin bougies de préchauffage - panne du circuit"
-    P0382 = "Bougies de préchauffage, circuit B - panne"
-    P0383 = "Lampe témoin bougies de préchauffage"
-    P0384 = "Bougies de préchauffage, circuit B"
-    P0385 = "Capteur de vilebrequin B - panne du circuit"
-    P0386 = "Capteur de vilebrequin B - problème de performance/de limites"
-    P0387 = "Capteur de vilebrequin B - valeur d'entrée trop basse"
-    P0388 = "Capteur de vilebrequin B - valeur d'entrée trop haute"
-    P0389 = "Capteur de vilebrequin B - circuit intermittent"
-    P0390 = "Capteur d'arbre à cames B, ligne 2 - panne du circuit"
-    P0391 = "Capteur d'arbre à cames B, ligne 2 - plage de mesure/performance du circuit"
-    P0392 = "Capteur d'arbre à cames B, ligne 2 - signal d'entrée du circuit trop bas"
-    P0393 = "Capteur d'arbre à cames B, ligne 2 - signal d'entrée du circuit trop haut"
-    P0394 = "Capteur d'arbre à cames B, ligne 2 - circuit intermittent"
-    P0395 = "Capteur d'arbre à cames B, ligne 2 - signal d'entrée du circuit trop haut"
-    P0396 = "Capteur d'arbre à cames B, ligne 2 - circuit intermittent"
-    # P0397
-    # P0398
-    # P0399
-    P0400 = "Système EGR - problème de débit"
-    P0401 = "Système EGR - débit insuffisant détecté"
-    P0402 = "Système EGR - débit excessif détecté"
-    P0403 = "Recyclage des gaz d'échappement - panne du circuit"
-    P0404 = "Système EGR - problème de performance/de limites"
-    P0405 = "Capteur de position de la valve EGR A - valeur d'entrée trop basse"
-    P0406 = "Capteur de position de la valve EGR A - valeur d'entrée trop haute"
-    P0407 = "Capteur de position de la valve EGR B - valeur d'entrée trop basse"
-    P0408 = "Capteur de position de la valve EGR B - valeur d'entrée trop haute"
-    P0409 = "Capteur EGR A - panne du circuit"
-    P0410 = "Système d'injection d'air secondaire - panne"
-    P0411 = "Système d'injection d'air secondaire - débit incorrect détecté"
-    P0412 = "électrovanne d'injection d'air secondaire A - panne du circuit"
-    P0413 = "électrovanne d'injection d'air secondaire A - circuit ouvert"
-    P0414 = "électrovanne d'injection d'air secondaire A - court circuit"
-    P0415 = "électrovanne d'injection d'air secondaire B - panne du circuit"
-    P0416 = "électrovanne d'injection d'air secondaire B - circuit ouvert"
-    P0417 = "Électrovanne d'injection d'air secondaire B - court circuit"
-    P0418 = "Relais de la pompe d'injection d'air secondaire A - panne du circuit"
-    P0419 = "Relais de la pompe d'injection d'air secondaire B - panne du circuit"
-    P0420 = "Circuit de catalyseur, ligne 1 - rendement inférieur au - Plus de détails..."
-    P0421 = "Pré-catalyseur, ligne 1 - rendement inférieur au seuil"
-    P0422 = "Catalyseur principal, ligne 1 - rendement inférieur au seuil"
-    P0423 = "Catalyseur chauffé, ligne 1 - rendement inférieur au seuil"
-    P0424 = "Catalyseur chauffé, ligne 1 - température inférieur au seuil"
-    P0425 = "Sonde de température du catalyseur 1, ligne 1"
-    P0426 = "Sonde de température du catalyseur 1, ligne 1 - plage de mesure/performance"
-    P0427 = "Sonde de température du catalyseur 1, ligne 1 - valeur d'entrée trop basse"
-    P0428 = "Sonde de température du catalyseur 1, ligne 1 - valeur d'entrée trop haute"
-    P0429 = "Chauffage catalyseur, ligne 1 - panne du circuit de commande"
-    P0430 = "Circuit de catalyseur, ligne 2 - rendement inférieur au seuil"
-    P0431 = "Pré-catalyseur, ligne 2 - rendement inférieur au seuil"
-    P0432 = "Catalyseur principal, ligne 2 - rendement inférieur au seuil"
-    P0433 = "Catalyseur chauffé, ligne 2 - rendement inférieur au seuil"
-    P0434 = "Catalyseur chauffé, ligne 2 - température inférieur au seuil"
-    P0435 = "Sonde de température du catalyseur 1, ligne 2"
-    P0436 = "Sonde de température du catalyseur 1, ligne 2 - plage de mesure/performance"
-    P0437 = "Sonde de température du catalyseur 1, ligne 2 - valeur d'entrée trop basse"
-    P0438 = "Sonde de température du catalyseur 1, ligne 2 - valeur d'entrée trop haute"
-    P0439 = "Chauffage catalyseur, ligne 2 - panne du circuit"
-    P0440 = "Système de purge canister - panne"
-    P0441 = "Système de purge canister - débit incorrect détecté"
-    P0442 = "Système de purge canister - petite fuite détectée"
-    P0443 = "électrovanne de purge canister - panne du circuit"
-    P0444 = "électrovanne de purge canister - circuit ouvert"
-    P0445 = "électrovanne de purge canister - court circuit"
-    P0446 = "Système de purge canister, commande de ventilation - panne du circuit"
-    P0447 = "Système de purge canister, commande de ventilation - circuit ouvert"
-    P0448 = "Système de purge canister, commande de ventilation - court-circuit"
-    P0449 = "Système de purge canister, soupape de ventilation - panne du circuit"
-    P0450 = "Capteur de pression de purge canister - panne du circuit"
-    P0451 = "Capteur de pression de purge canister - problème de performance/de limites"
-    P0452 = "Capteur de pression de purge canister - valeur d'entrée trop basse"
-    P0453 = "Capteur de pression de purge canister - valeur d'entrée trop haute"
-    P0454 = "Capteur de pression de purge canister - circuit intermittent"
-    P0455 = "Système de purge canister - fuite importante détectée"
-    P0456 = "Système de purge canister - très petite fuite détectée"
-    P0457 = "Système de purge canister - fuite détectée"
-    P0458 = "Système de purge canister, électrovanne de purge canister - circuit trop bas"
-    P0459 = "Système de purge canister, électrovanne de purge canister - circuit trop haut"
-    P0460 = "Sonde de niveau du réservoir de carburant - panne du circuit"
-    P0461 = "Sonde de niveau du réservoir de carburant - problème de performance/de limites"
-    P0462 = "Sonde de niveau du réservoir de carburant - valeur d'entrée trop basse"
-    P0463 = "Sonde de niveau du réservoir de carburant - valeur d'entrée trop haute"
-    P0464 = "Sonde de niveau du réservoir de carburant - circuit intermittent"
-    P0465 = "Capteur de flux de purge canister - panne du circuit"
-    P0466 = "Capteur de flux de purge canister - problème de performance/de limites"
-    P0467 = "Capteur de flux de purge canister - valeur d'entrée trop basse"
-    P0468 = "Capteur de flux de purge canister - valeur d'entrée trop haute"
-    P0469 = "Capteur de flux de purge canister - circuit intermittent"
-    P0470 = "Capteur de pression des gaz d'échappement - panne du circuit"
-    P0471 = "Capteur de pression des gaz d'échappement - problème de performance/de limites"
-    P0472 = "Capteur de pression des gaz d'échappement - valeur d'entrée trop basse"
-    P0473 = "Capteur de pression des gaz d'échappement - valeur d'entrée trop haute"
-    P0474 = "Capteur de pression des gaz d'échappement - circuit intermittent"
-    P0475 = "électrovanne de commande de pression des gaz d'échappement-panne du circuit"
-    P0476 = "électrovanne de commande de pression des gaz d'échappement-problème de performance/de limites"
-    P0477 = "électrovanne de commande de pression des gaz d'échappement - valeur d'entrée trop basse"
-    P0478 = "électrovanne de commande de pression des gaz d'échappement - valeur d'entrée trop haute"
-    P0479 = "électrovanne de commande de pression des gaz d'échappement- circuit intermittent"
-    P0480 = "Motoventilateur de refroidissement 1 - panne du circuit"
-    P0481 = "Motoventilateur de refroidissement 2 - panne du circuit"
-    P0482 = "Motoventilateur de refroidissement 3 - panne du circuit"
-    P0483 = "Motoventilateur de refroidissement, contrôle de rationalité - panne"
-    P0484 = "Motoventilateur de refroidissement - surcharge du circuit"
-    P0485 = "Motoventilateur de refroidissement, alimentation/masse - panne du circuit"
-    P0486 = "Capteur de position de la valve EGR B - panne du circuit"
-    P0487 = "Système EGR, commande de position du papillon - panne du circuit"
-    P0488 = "Système EGR, commande de position du papillon - plage de mesure/performance"
-    P0489 = "Système EGR - circuit trop bas"
-    P0490 = "Système EGR - circuit trop haut"
-    P0491 = "Système d'injection d'air secondaire, ligne 1 - panne"
-    P0492 = "Système d'injection d'air secondaire, ligne 2 - panne"
-    P0493 = "Vitesse motoventilateur de refroidissement moteur - excessive"
-    P0494 = "Vitesse motoventilateur de refroidissement moteur - basse"
-    P0495 = "Vitesse motoventilateur de refroidissement moteur - haute"
-    P0496 = "Système de purge canister - flux de purge élevé"
-    P0497 = "Système de purge canister - flux de purge faible"
-    P0498 = "Système de purge canister, commande de ventilation - circuit trop bas"
-    P0499 = "Système de purge canister, commande de ventilation - circuit trop haut"
-    P0500 = "Capteur de vitesse du véhicule - panne du circuit"
-    P0501 = "Capteur de vitesse du véhicule - problème de performance/de limites"
-    P0502 = "Capteur de vitesse du véhicule - valeur d'entrée trop basse"
-    P0503 = "Capteur de vitesse du véhicule - valeur d'entrée intermittente/irrégulière/trop haute"
-    P0504 = "Contacteur de freinage - corrélation A/B"
-    P0505 = "Commande du ralenti - panne"
-    P0506 = "Commande du ralenti - régime plus lent que prévu"
-    P0507 = "Commande du ralenti - régime plus rapide que prévu"
-    P0508 = "Commande d'air au ralenti - circuit trop bas"
-    P0509 = "Commande d'air au ralenti - circuit trop haut"
-    P0510 = "Contacteur de position fermée de papillon - panne du circuit"
-    P0511 = "Commande d'air au ralenti - panne du circuit"
-    P0512 = "Circuit de commande du démarreur - panne"
-    P0513 = "Clé de l'antidémarrage incorrecte"
-    P0514 = "Sonde de température batterie - plage de mesure/performance du circuit"
-    P0515 = "Sonde de température batterie - panne du circuit"
-    P0516 = "Sonde de température batterie - circuit trop bas"
-    P0517 = "Sonde de température batterie - circuit trop haut"
-    P0518 = "Commande d'air au ralenti - circuit intermittent"
-    P0519 = "Commande d'air au ralenti - performance circuit"
-    P0520 = "Capteur de pression/pressostat d'huile moteur - panne du circuit"
-    P0521 = "Capteur de pression/pressostat d'huile moteur - problème de performance/de limites"
-    P0522 = "Capteur de pression/pressostat d'huile moteur - basse tension"
-    P0523 = "Capteur de pression/pressostat d'huile moteur - haute tension"
-    P0524 = "Pression d'huile moteur trop basse"
-    P0525 = "Régulateur de vitesse, commande d'actuateur - plage de mesure/performance du circuit"
-    P0526 = "Capteur de vitesse du motoventilateur de refroidissement moteur- panne du circuit"
-    P0527 = "Capteur de vitesse du motoventilateur de refroidissement moteur - plage de mesure/performance du circuit"
-    P0528 = "Capteur de vitesse du motoventilateur de refroidissement moteur - aucun signal"
-    P0529 = "Capteur de vitesse du motoventilateur de refroidissement moteur - circuit intermittent"
-    P0530 = "Capteur de pression du réfrigérant de la climatisation - panne du circuit"
-    P0531 = "Capteur de pression du réfrigérant de la climatisation - problème de performance/de limites"
-    P0532 = "Capteur de pression du réfrigérant de la climatisation - valeur d'entrée trop basse"
-    P0533 = "Capteur de pression du réfrigérant de la climatisation - valeur d'entrée trop haute"
-    P0534 = "Perte de charge du réfrigérant de la climatisation"
-    P0535 = "Sonde de température de l'évaporateur climatisation - panne du circuit"
-    P0536 = "Sonde de température de l'évaporateur climatisation - plage de mesure/performance du circuit"
-    P0537 = "Sonde de température de l'évaporateur climatisation - circuit trop bas"
-    P0538 = "Sonde de température de l'évaporateur climatisation - circuit trop haut"
-    P0539 = "Sonde de température de l'évaporateur climatisation - circuit intermittent"
-    P0540 = "Chauffage d'air d'admission A - panne du circuit"
-    P0541 = "Chauffage d'air d'admission A - circuit trop bas"
-    P0542 = "Chauffage d'air d'admission A - circuit trop haut"
-    P0543 = "Chauffage d'air d'admission A - circuit ouvert"
-    P0544 = "Sonde de température EGR, ligne 1 - panne du circuit"
-    P0545 = "Sonde de température EGR, ligne 1 - valeur d'entrée trop basse"
-    P0546 = "Sonde de température EGR, ligne 1 - valeur d'entrée trop haute"
-    P0547 = "Sonde de température des gaz d'échappement, ligne 2 capteur 1 - panne du circuit"
-    P0548 = "Sonde de température des gaz d'échappement, ligne 2 capteur 1 - circuit trop bas"
-    P0549 = "Sonde de température des gaz d'échappement, ligne 2 capteur 1 - circuit trop haut"
-    P0550 = "Capteur/pressostat de direction assistée - panne du circuit"
-    P0551 = "Capteur/pressostat de direction assistée - problème de performance/de limites"
-    P0552 = "Capteur/pressostat de direction assistée - valeur d'entrée trop basse"
-    P0553 = "Capteur/pressostat de direction assistée - valeur d'entrée trop haute"
-    P0554 = "Capteur/pressostat de direction assistée - circuit intermittent"
-    P0555 = "Capteur de pression du servofrein - panne du circuit"
-    P0556 = "Capteur de pression du servofrein - plage de mesure/performance du circuit"
-    P0557 = "Capteur de pression du servofrein - signal d'entrée du circuit trop bas"
-    P0558 = "Capteur de pression du servofrein - signal d'entrée du circuit trop haut"
-    P0559 = "Capteur de pression du servofrein - circuit intermittent"
-    P0560 = "Tension du système - panne"
-    P0561 = "Tension du système - instable"
-    P0562 = "Tension du système - basse"
-    P0563 = "Tension du système - haute"
-    P0564 = "Régulateur de vitesse, signal d'entrée A du contacteur multifonction - panne du circuit"
-    P0565 = "Commutateur principal du régulateur de vitesse, signal de marche (ON) - panne"
-    P0566 = "Commutateur principal du régulateur de vitesse, signal d'arrêt (OFF) - panne"
-    P0567 = "Sélecteur de reprise du régulateur de vitesse - panne"
-    P0568 = "Commutateur principal du régulateur de vitesse, signal SET - panne"
-    P0569 = "Sélecteur du régulateur de vitesse, signal COAST - panne"
-    P0570 = "Régulateur de vitesse, signal du capteur de position de la pédale - panne"
-    P0571 = "Contacteur de régulateur de vitesse/de freinage A - panne du circuit"
-    P0572 = "Contacteur de régulateur de vitesse/de freinage A - circuit trop bas"
-    P0573 = "Contacteur de régulateur de vitesse/de freinage A - circuit trop haut"
-    P0574 = "Régulateur de vitesse - vitesse trop haute"
-    P0575 = "Régulateur de vitesse - panne du circuit d'entrée"
-    P0576 = "Régulateur de vitesse - circuit d'entrée trop faible"
-    P0577 = "Régulateur de vitesse - circuit d'entrée trop fort"
-    P0578 = "Régulateur de vitesse, signal d'entrée A du contacteur multifonction - circuit bloqué"
-    P0579 = "Régulateur de vitesse, signal d'entrée A du contacteur multifonction - plage de mesure/performance du " \
-            "circuit "
-    P0580 = "Régulateur de vitesse, signal d'entrée A du contacteur multifonction - circuit trop bas"
-    P0581 = "Régulateur de vitesse, signal d'entrée A du contacteur multifonction - circuit trop haut"
-    P0582 = "Régulateur de vitesse, commande par dépression - circuit ouvert"
-    P0583 = "Régulateur de vitesse, commande par dépression - circuit trop bas"
-    P0584 = "Régulateur de vitesse, commande par dépression - circuit trop haut"
-    P0585 = "Régulateur de vitesse, signal d'entrée A/B du contacteur multifonction - corrélation"
-    P0586 = "Régulateur de vitesse, commande de ventilation - circuit ouvert"
-    P0587 = "Régulateur de vitesse, commande de ventilation - circuit trop bas"
-    P0588 = "Régulateur de vitesse, commande de ventilation - circuit trop haut"
-    P0589 = "Régulateur de vitesse, signal d'entrée B du contacteur multifonction - panne du circuit"
-    P0590 = "Régulateur de vitesse, signal d'entrée B du contacteur multifonction - circuit bloqué"
-    P0591 = "Régulateur de vitesse, signal d'entrée B du contacteur multifonction - plage de mesure/performance du " \
-            "circuit "
-    P0592 = "Régulateur de vitesse, signal d'entrée B du contacteur multifonction - circuit trop bas"
-    P0593 = "Régulateur de vitesse, signal d'entrée B du contacteur multifonction - circuit trop haut"
-    P0594 = "Régulateur de vitesse, commande d'actuateur - circuit ouvert"
-    P0595 = "Régulateur de vitesse, commande d'actuateur - circuit trop bas"
-    P0596 = "Régulateur de vitesse, commande d'actuateur - circuit trop haut"
-    P0597 = "Dispositif de commande du chauffage à thermostat - circuit ouvert"
-    P0598 = "Dispositif de commande du chauffage à thermostat - circuit trop bas"
-    P0599 = "Dispositif de commande du chauffage à thermostat - circuit trop haut"
-    P0600 = "Bus de données CAN - panne"
-    P0601 = "Calculateur de gestion moteur - erreur du total de contrôle de mémoire"
-    P0602 = "Calculateur de gestion moteur - erreur de programmation"
-    P0603 = "Calculateur de gestion moteur - erreur KAM"
-    P0604 = "Calculateur de gestion moteur - erreur RAM"
-    P0605 = "Calculateur de gestion moteur - erreur ROM"
-    P0606 = "Calculateur de gestion moteur/calculateur combiné moteur-transmission"
-    P0607 = "Calculateur/boîtier électronique - problème de performance - panne de processeur"
-    P0608 = "Calculateur de gestion moteur, signal de sortie du capteur de vitesse du véhicule A - panne"
-    P0609 = "Calculateur de gestion moteur, signal de sortie du capteur de vitesse du véhicule B - panne"
-    P0610 = "Calculateur/boîtier électronique - erreur options véhicule"
-    P0611 = "Boîtier électronique d'injecteur de carburant - problème de performance"
-    P0612 = "Boîtier électronique d'injecteur carburant - circuit du relais de commande"
-    P0613 = "Calculateur de transmission - erreur de processeur"
-    P0614 = "Calculateur de gestion moteur/calculateur de transmission - désaccord"
-    P0615 = "Relais du démarreur - panne du circuit de gestion moteur"
-    P0616 = "Relais du démarreur - circuit trop bas de gestion moteur"
-    P0617 = "Relais du démarreur - circuit trop haut calculateur de gestion moteur"
-    P0618 = "Boîtier électronique carburant alternatif - erreur KAM"
-    P0619 = "Boîtier électronique carburant alternatif - erreur RAM/ROM"
-    P0620 = "Alternateur, commande - panne du circuit"
-    P0621 = "Alternateur - lampe témoin de charge L - panne du circuit"
-    P0622 = "Alternateur - lampe témoin de charge F - panne du circuit"
-    P0623 = "Lampe témoin de charge - panne du circuit"
-    P0624 = "Lampe témoin trappe du réservoir de carburant - panne du circuit"
-    P0625 = "Borne champ du générateur - circuit trop bas"
-    P0626 = "Borne champ du générateur - circuit trop haut"
-    P0627 = "Commande de pompe à carburant A - circuit ouvert"
-    P0628 = "Commande de pompe à carburant A - circuit trop bas"
-    P0629 = "Commande de pompe à carburant A - circuit trop haut"
-    P0630 = "VIN non programmé ou désaccord d'identification - calculateur de gestion moteur/calculateur " \
-            "transmission/gestion moteur "
-    P0631 = "VIN non programmé ou désaccord d'identification - calculateur de transmission"
-    P0632 = "Compteur kilométrique non programmé - calculateur de gestion moteur/calculateur transmission/gestion " \
-            "moteur "
-    P0633 = "Clé de l'antidémarrage non programmée - calculateur de gestion moteur/calculateur transmission/gestion " \
-            "moteur "
-    P0634 = "Calculateur transmission/gestion moteur/calculateur de gestion moteur/calculateur de transmission - " \
-            "température interne trop haute "
-    P0635 = "Commande direction assistée - panne du circuit"
-    P0636 = "Commande direction assistée - circuit trop bas"
-    P0637 = "Commande direction assistée - circuit trop haut"
-    P0638 = "Commande d'actuateur de papillon, ligne 1 - problème de performance/de limites"
-    P0639 = "Commande d'actuateur de papillon, ligne 2 - plage mesure/performance"
-    P0640 = "Commande de chauffage d'air d'admission - panne du circuit"
-    P0641 = "Tension de référence du capteur A - circuit ouvert"
-    P0642 = "Calculateur de gestion moteur, anti-cliquetis - défectueux"
-    P0643 = "Tension de référence du capteur A - circuit trop haut"
-    P0644 = "Affichage conducteur, communication de séries de données - panne du circuit"
-    P0645 = "Relais d'embrayage du compresseur de climatisation"
-    P0646 = "Relais embrayage du compresseur de climatisation - circuit trop bas"
-    P0647 = "Relais embrayage du compresseur de climatisation - circuit trop haut"
-    P0648 = "Lampe témoin antidémarrage - panne du circuit"
-    P0649 = "Lampe témoin régulateur de vitesse - circuit moteur"
-    P0650 = "Lampe témoin d'affichage des défauts - panne du circuit"
-    P0651 = "Tension de référence du capteur B - circuit ouvert"
-    P0652 = "Tension de référence du capteur B - circuit trop bas"
-    P0653 = "Tension de référence du capteur B - circuit trop haut"
-    P0654 = "Régime moteur, sortie - panne du circuit"
-    P0655 = "Signal de sortie du témoin de surchauffe du moteur - panne du circuit"
-    P0656 = "Signal de sortie de niveau de carburant - panne du circuit"
-    P0657 = "Tension d'alimentation d'actuateur - circuit ouvert"
-    P0658 = "Tension d'alimentation d'actuateur - circuit trop bas"
-    P0659 = "Tension d'alimentation d'actuateur - circuit trop haut"
-    P0660 = "électrovanne d'admission d'air dans le collecteur, ligne 1 - circuit ouvert"
-    P0661 = "électrovanne d'admission d'air dans le collecteur, ligne 1 - circuit trop bas"
-    P0662 = "électrovanne d'admission d'air dans le collecteur, ligne 1 - circuit trop haut"
-    P0663 = "électrovanne d'admission d'air dans le collecteur, ligne 2 - circuit ouvert"
-    P0664 = "électrovanne d'admission d'air dans le collecteur, ligne 2 - circuit trop bas"
-    P0665 = "électrovanne d'admission d'air dans le collecteur, ligne 2 - circuit trop haut"
-    P0666 = "Sonde de température interne calculateur combiné moteur-transmission/ calculateur de gestion " \
-            "moteur/calculateur de transmission - panne du circuit "
-    P0667 = "Sonde de température interne calculateur combiné moteur-transmission/ calculateur de gestion " \
-            "moteur/calculateur de transmission - plage de mesure/performance "
-    P0668 = "Sonde de température interne calculateur combiné moteur-transmission/ calculateur de gestion " \
-            "moteur/calculateur de transmission - circuit trop bas "
-    P0669 = "Sonde de température interne calculateur combiné moteur-transmission/calculateur de gestion " \
-            "moteur/calculateur de transmission - circuit trop haut "
-    P0670 = "Boîtier électronique des bougies de préchauffage - panne du circuit - Plus de détails..."
-    P0671 = "Bougies de préchauffage, cylindre 1 - panne du circuit"
-    P0672 = "Bougies de préchauffage, cylindre 2 - panne du circuit"
-    P0673 = "Bougies de préchauffage, cylindre 3 - panne du circuit"
-    P0674 = "Bougies de préchauffage, cylindre 4 - panne du circuit"
-    P0675 = "Bougies de préchauffage, cylindre 5 - panne du circuit"
-    P0676 = "Bougies de préchauffage, cylindre 6 - panne du circuit"
-    P0677 = "Bougies de préchauffage, cylindre 7 - panne du circuit"
-    P0678 = "Bougies de préchauffage, cylindre 8 - panne du circuit"
-    P0679 = "Bougies de préchauffage, cylindre 9 - panne du circuit"
-    P0680 = "Bougies de préchauffage, cylindre 10 - panne du circuit"
-    P0681 = "Bougies de préchauffage, cylindre 11 - panne du circuit"
-    P0682 = "Bougies de préchauffage, cylindre 12 - panne du circuit"
-    P0683 = "Communication boîtier électronique des bougies de préchauffage/ calculateur de gestion " \
-            "moteur/calculateur combiné moteur-transmission - panne "
-    P0684 = "Communication boîtier électronique des bougies de préchauffage/calculateur de gestion moteur/calculateur" \
-            " combiné moteur-transmission - plage de mesure/performance "
-    P0685 = "Relais d'alimentation électrique calculateur de gestion moteur/calculateur combiné transmission-gestion " \
-            "moteur - circuit ouvert "
-    P0686 = "Relais d'alimentation électrique calculateur de gestion moteur/calculateur combiné transmission-gestion " \
-            "moteur - circuit trop bas "
-    P0687 = "Relais de gestion du moteur - court-circuit sur la masse"
-    P0688 = "Relais de gestion du moteur - court-circuit sur l'alimentation"
-    P0689 = "Relais d'alimentation électrique calculateur de gestion moteur/calculateur combiné transmission-gestion " \
-            "moteur - circuit de sondage trop faible "
-    P0690 = "Relais d'alimentation électrique calculateur de gestion moteur/calculateur combiné transmission-gestion " \
-            "moteur - circuit de sondage trop fort "
-    P0691 = "Motoventilateur de refroidissement 1 - circuit trop bas"
-    P0692 = "Motoventilateur de refroidissement 1 - circuit trop haut"
-    P0693 = "Motoventilateur de refroidissement 2 - circuit trop bas"
-    P0694 = "Motoventilateur de refroidissement 2 - circuit trop haut"
-    P0695 = "Motoventilateur de refroidissement 3 - circuit trop bas"
-    P0696 = "Motoventilateur de refroidissement 3 - circuit trop haut"
-    P0697 = "Tension de référence du capteur C - circuit ouvert"
-    P0698 = "Tension de référence du capteur C - circuit trop bas"
-    P0699 = "Tension de référence du capteur C - circuit trop haut"
-    P0700 = "Commande de la transmission - panne"
-    P0701 = "Commande de la transmission - problème de performance/de limites"
-    P0702 = "Commande de la transmission - électrique"
-    P0703 = "Convertisseur de couple/contacteur de freinage B - panne du circuit"
-    P0704 = "Contacteur de position de la pédale d'embrayage - panne du circuit"
-    P0705 = "Contacteur/capteur de position du levier de vitesse, signal d'entrée PIRMIDL - panne du circuit"
-    P0706 = "Contacteur/capteur de position du levier de vitesse - problème de performance/de limites"
-    P0707 = "Contacteur/capteur de position du levier de vitesse - valeur d'entrée trop basse"
-    P0708 = "Contacteur/capteur de position du levier de vitesse - valeur d'entrée trop haute"
-    P0709 = "Contacteur/capteur de position du levier de vitesse - circuit intermittent"
-    P0710 = "Sonde de température d'huile de transmission - panne du circuit"
-    P0711 = "Sonde de température d'huile de transmission - problème de performance/de limites"
-    P0712 = "Sonde de température d'huile de transmission - valeur d'entrée trop basse"
-    P0713 = "Sonde de température d'huile de transmission - valeur d'entrée trop haute"
-    P0714 = "Sonde de température d'huile de transmission - circuit intermittent"
-    P0715 = "Capteur de vitesse d'arbre de turbine - panne du circuit"
-    P0716 = "Capteur de vitesse d'arbre de turbine - problème de performance/de limites"
-    P0717 = "Capteur de vitesse d'arbre de turbine - aucun signal"
-    P0718 = "Capteur de vitesse d'arbre de turbine - circuit intermittent"
-    P0719 = "Convertisseur de couple/contacteur de freinage B - circuit trop bas"
-    P0720 = "Capteur de vitesse du véhicule - panne du circuit"
-    P0721 = "Capteur de vitesse du véhicule - problème de performance/de limites"
-    P0722 = "Capteur de vitesse du véhicule - aucun signal"
-    P0723 = "Capteur de vitesse du véhicule - circuit intermittent"
-    P0724 = "Convertisseur de couple/contacteur de freinage B - circuit trop haut"
-    P0725 = "Entrée du régime moteur - panne du circuit"
-    P0726 = "Entrée du régime moteur - problème de performance/de limites"
-    P0727 = "Entrée du régime moteur - aucun signal"
-    P0728 = "Entrée du régime moteur - circuit intermittent"
-    P0729 = "Vitesse 6 - rapport incorrect"
-    P0730 = "Rapport de démultiplication de la vitesse incorrect"
-    P0731 = "Vitesse 1 - ratio incorrect"
-    P0732 = "Vitesse 2 - ratio incorrect"
-    P0733 = "Vitesse 3 - ratio incorrect"
-    P0734 = "Vitesse 4 - ratio incorrect"
-    P0735 = "Vitesse 5 - ratio incorrect"
-    P0736 = "Marche arrière - rapport incorrect"
-    P0737 = "Régime moteur calculateur de transmission - circuit de sortie"
-    P0738 = "Régime moteur calculateur de transmission - circuit de sortie faible"
-    P0739 = "Référence de temps à haute résolution signal B - aucun pulse"
-    P0740 = "Électrovanne du convertisseur de couple - panne du circuit"
-    P0741 = "Électrovanne du convertisseur de couple - performance ou blocage"
-    P0742 = "Électrovanne du convertisseur de couple - blocage"
-    P0743 = "Électrovanne du convertisseur de couple - électrique"
-    P0744 = "Électrovanne du convertisseur de couple - circuit intermittent"
-    P0745 = "Électrovanne du convertisseur de couple - panne du circuit"
-    P0746 = "Électrovanne du convertisseur de couple - performance ou blocage"
-    P0747 = "Électrovanne du convertisseur de couple - blocage"
-    P0748 = "Électrovanne du convertisseur de couple - électrique"
-    P0749 = "Électrovanne du convertisseur de couple - circuit intermittent"
-    P0750 = "Électrovanne de changement de vitesse A - panne du circuit"
-    P0751 = "Électrovanne de changement de vitesse A - performance ou blocage"
-    P0752 = "Électrovanne de changement de vitesse A - blocage"
-    P0753 = "Électrovanne de changement de vitesse A - électrique"
-    P0754 = "Électrovanne de changement de vitesse A - circuit intermittent"
-    P0755 = "Électrovanne de changement de vitesse B - panne du circuit"
-    P0756 = "Électrovanne de changement de vitesse B - performance ou blocage"
-    P0757 = "Électrovanne de changement de vitesse B - blocage"
-    P0758 = "Électrovanne de changement de vitesse B - électrique"
-    P0759 = "Électrovanne de changement de vitesse B - circuit intermittent"
-    P0760 = "Électrovanne de changement de vitesse C - panne du circuit"
-    P0761 = "Électrovanne de changement de vitesse C - performance ou blocage"
-    P0762 = "Électrovanne de changement de vitesse C - blocage"
-    P0763 = "Électrovanne de changement de vitesse C - électrique"
-    P0764 = "Électrovanne de changement de vitesse C - circuit intermittent"
-    P0765 = "Électrovanne de changement de vitesse D - panne du circuit"
-    P0766 = "Électrovanne de changement de vitesse D - performance ou blocage"
-    P0767 = "Électrovanne de changement de vitesse D - blocage"
-    P0768 = "Électrovanne de changement de vitesse D - électrique"
-    P0769 = "Électrovanne de changement de vitesse D - circuit intermittent"
-    P0770 = "Électrovanne de changement de vitesse E - panne du circuit"
-    P0771 = "Électrovanne de changement de vitesse E - performance ou blocage"
-    P0772 = "Électrovanne de changement de vitesse E - blocage"
-    P0773 = "Électrovanne de changement de vitesse E - électrique"
-    P0774 = "Électrovanne de changement de vitesse E - circuit intermittent"
-    P0775 = "Électrovanne de commande de pression B - panne"
-    P0776 = "Électrovanne de commande de pression B - performance ou blocage"
-    P0777 = "Électrovanne de commande de pression B - blocage"
-    P0778 = "Électrovanne de commande de pression B - problème électrique"
-    P0779 = "Électrovanne de commande de pression B - circuit intermittent"
-    P0780 = "Sélection de la vitesse - problème de changement de vitesse"
-    P0781 = "Sélection de la vitesse, 1-2 - problème de changement de vitesse"
-    P0782 = "Sélection de la vitesse, 2-3 - problème de changement de vitesse"
-    P0783 = "Sélection de la vitesse, 3-4 - problème de changement de vitesse"
-    P0784 = "Sélection de la vitesse, 4-5 - problème de changement de vitesse"
-    P0785 = "Électrovanne de changement de vitesse A - panne du circuit"
-    P0786 = "Électrovanne de changement de vitesse A - problème de performance/de limites"
-    P0787 = "Électrovanne de changement de vitesse A - basse"
-    P0788 = "Électrovanne de changement de vitesse A - haute"
-    P0789 = "Électrovanne de changement de vitesse A - intermittent"
-    P0790 = "Commutateur sélection de mode de transmission - panne du circuit"
-    P0791 = "Capteur de vitesse de l'arbre intermédiaire de transmission - panne du circuit"
-    P0792 = "Capteur de vitesse de l'arbre intermédiaire de transmission - problème de mesure/performance"
-    P0793 = "Capteur de vitesse de l'arbre intermédiaire de transmission - aucun signal"
-    P0794 = "Capteur de vitesse de l'arbre intermédiaire de transmission - panne intermittente du circuit"
-    P0795 = "Électrovanne de pression d'huile de transmission C - panne du circuit"
-    P0796 = "Électrovanne de pression d'huile de transmission C - performance ou blocage"
-    P0797 = "Électrovanne de pression d'huile de transmission C - blocage"
-    P0798 = "Électrovanne de pression d'huile de transmission C - problème électrique"
-    P0799 = "Électrovanne de pression d'huile de transmission C - panne intermittente du circuit"
-    P0800 = "Système de commande de la boîte de transfert, commande de lampe témoin d'affichage des défauts - panne"
-    P0801 = "Circuit de blocage de marche arrière - panne"
-    P0802 = "Commande de la transmission, commande de lampe témoin d'affichage des défauts - circuit ouvert"
-    P0803 = "Électrovanne de montée des vitesse 1-4 (saut de vitesses) - panne du circuit"
-    P0804 = "Lampe témoin de montée des vitesses 1-4 (saut de vitesses) - panne de circuit"
-    P0805 = "Capteur de la position de la pédale d'embrayage - panne du circuit"
-    P0806 = "Capteur de la position de la pédale d'embrayage - problème de mesure/performance"
-    P0807 = "Capteur de la position de la pédale d'embrayage - valeur d'entrée trop basse"
-    P0808 = "Capteur de la position de la pédale d'embrayage - valeur d'entrée trop élevée"
-    P0809 = "Capteur de la position de la pédale d'embrayage - panne intermittente du circuit"
-    P0810 = "Erreur de commande de position de la pédale d'embrayage"
-    P0811 = "Patinage excessif de l'embrayage"
-    P0812 = "Marche arrière - panne du circuit d'entrée"
-    P0813 = "Marche arrière - panne du circuit de sortie"
-    P0814 = "Affichage de position du levier de vitesses - panne du circuit"
-    P0815 = "Contacteur de montée des vitesses - panne du circuit"
-    P0816 = "Contacteur de descente des vitesses - panne du circuit"
-    P0817 = "Circuit de mise hors service du démarreur - panne"
-    P0818 = "Interrupteur de fil d'attaque - panne du circuit"
-    P0819 = "Corrélation entre le contacteur montée/descente des vitesses et la position du levier de vitesses"
-    P0820 = "Capteur de position X-Y du levier de vitesses - panne du circuit"
-    P0821 = "Capteur de position X du levier de vitesses - panne du circuit"
-    P0822 = "Capteur de position Y du levier de vitesses - panne du circuit"
-    P0823 = "Capteur de position X du levier de vitesses - circuit intermittent"
-    P0824 = "Capteur de position Y du levier de vitesses - circuit intermittent"
-    P0825 = "Commutateur à pression et tirage du levier de vitesses - panne du circuit"
-    P0826 = "Contacteur montée/descente des vitesses - circuit d'entrée"
-    P0827 = "Contacteur montée/descente des vitesses - circuit d'entrée trop faible"
-    P0828 = "Contacteur montée/descente des vitesses - circuit d'entrée trop fort"
-    P0829 = "Montée des vitesses 5-6"
-    P0830 = "Contacteur de position de la pédale d'embrayage A - panne du circuit"
-    P0831 = "Contacteur de position de la pédale d'embrayage A - valeur d'entrée trop basse"
-    P0832 = "Contacteur de position de la pédale d'embrayage A - valeur d'entrée trop haute"
-    P0833 = "Contacteur de position de la pédale d'embrayage B - panne du circuit"
-    P0834 = "Contacteur de position de la pédale d'embrayage B - valeur d'entrée trop basse"
-    P0835 = "Contacteur de position de la pédale d'embrayage B - valeur d'entrée trop haute"
-    P0836 = "Contacteur 4 roues motrices - panne du circuit"
-    P0837 = "Contacteur 4 roues motrices - problème de mesure/performance"
-    P0838 = "Contacteur 4 roues motrices - valeur d'entrée trop basse"
-    P0839 = "Contacteur 4 roues motrices - valeur d'entrée trop élevée"
-    P0840 = "Pressostat/capteur de pression d'huile de transmission A - panne du circuit"
-    P0841 = "Pressostat/capteur de pression d'huile de transmission A - problème de mesure/performance"
-    P0842 = "Pressostat/capteur de pression d'huile de transmission A - valeur d'entrée trop basse"
-    P0843 = "Pressostat/capteur de pression d'huile de transmission A - valeur d'entrée trop haute"
-    P0844 = "Pressostat/capteur de pression d'huile de transmission A - panne intermittente du circuit"
-    P0845 = "Pressostat/capteur de pression d'huile de transmission B - panne du circuit"
-    P0846 = "Pressostat/capteur de pression d'huile de transmission B - problème de mesure/performance"
-    P0847 = "Pressostat/capteur de pression d'huile de transmission B - valeur d'entrée trop basse"
-    P0848 = "Pressostat/capteur de pression d'huile de transmission B - valeur d'entrée trop haute"
-    P0849 = "Pressostat/capteur de pression d'huile de transmission B - panne intermittente du circuit"
-    P0850 = "Contacteur de position Neutre/parking - panne du circuit d'entrée"
-    P0851 = "Contacteur de position Neutre/Parking - circuit d'entrée trop faible"
-    P0852 = "Contacteur de position Neutre/Parking - circuit d'entrée trop fort"
-    P0853 = "Contacteur de position Drive - panne du circuit d'entrée"
-    P0854 = "Contacteur de position Drive - circuit d'entrée trop faible"
-    P0855 = "Contacteur de position Drive - circuit d'entrée trop fort"
-    P0856 = "Signal d'entrée anti-patinage - panne"
-    P0857 = "Signal d'entrée anti-patinage - problème de mesure/performance"
-    P0858 = "Signal d'entrée anti-patinage - faible"
-    P0859 = "Signal d'entrée anti-patinage - haut"
-    P0860 = "Circuit de communication du boîtier électronique de changement de vitesses - panne"
-    P0861 = "Circuit de communication du boîtier électronique de changement de vitesses - valeur d'entrée trop basse"
-    P0862 = "Circuit de communication du boîtier électronique de changement de vitesses - valeur d'entrée trop haute"
-    P0863 = "Circuit de communication du calculateur de transmission - panne"
-    P0864 = "Circuit de communication du calculateur de transmission - problème de mesure/performance"
-    P0865 = "Circuit de communication du calculateur de transmission - valeur d'entrée trop basse"
-    P0866 = "Circuit de communication du calculateur de transmission - valeur d'entrée trop haute"
-    P0867 = "Capteur de pression d'huile de transmission"
-    P0868 = "Capteur de pression d'huile de transmission - faible"
-    P0869 = "Capteur de pression d'huile de transmission - haut"
-    P0870 = "Capteur de pression d'huile de transmission C - panne du circuit"
-    P0871 = "Capteur de pression d'huile de transmission C - plage de mesure/performance"
-    P0872 = "Capteur de pression d'huile de transmission C - circuit trop bas"
-    P0873 = "Capteur de pression d'huile de transmission C - circuit trop haut"
-    P0874 = "Capteur de pression d'huile de transmission C - panne intermittente du circuit"
-    P0875 = "Capteur de pression d'huile de transmission D - panne du circuit"
-    P0876 = "Capteur de pression d'huile de transmission D - plage de mesure/performance"
-    P0877 = "Capteur de pression d'huile de transmission D - circuit trop bas"
-    P0878 = "Capteur de pression d'huile de transmission D - circuit trop haut"
-    P0879 = "Capteur de pression d'huile de transmission D - panne intermittente du circuit"
-    P0880 = "Calculateur de transmission - panne du signal d'entrée de l'alimentation électrique"
-    P0881 = "Calculateur de transmission - plage de mesure/performance du signal d'entrée de l'alimentation électrique"
-    P0882 = "Calculateur de transmission - signal d'entrée de l'alimentation électrique trop faible"
-    P0883 = "Calculateur de transmission - signal d'entrée de l'alimentation électrique trop fort"
-    P0884 = "Calculateur de transmission - panne intermittente du signal d'entrée de l'alimentation électrique"
-    P0885 = "Relais d'alimentation électrique du calculateur de transmission - circuit de commande ouvert"
-    P0886 = "Relais d'alimentation électrique du calculateur de transmission - circuit de commande trop faible"
-    P0887 = "Relais d'alimentation électrique du calculateur de transmission - circuit de commande trop fort"
-    P0888 = "Relais d'alimentation électrique du calculateur de transmission - panne du circuit de sondage"
-    P0889 = "Relais d'alimentation électrique du calculateur de transmission - plage de mesure/performance du circuit" \
-            " de sondage "
-    P0890 = "Relais d'alimentation électrique du calculateur de transmission - circuit de sondage trop faible"
-    P0891 = "Relais d'alimentation électrique du calculateur de transmission - circuit de sondage trop fort"
-    P0892 = "Relais d'alimentation électrique du calculateur de transmission - panne intermittente du circuit de " \
-            "sondage "
-    P0893 = "Plusieurs vitesses engagées"
-    P0894 = "Patinage d'un composant de la transmission"
-    P0895 = "Durée de changement de vitesse trop courte"
-    P0896 = "Durée de changement de vitesse trop longue"
-    P0897 = "Huile de transmission dégradée"
-    P0898 = "Commande de transmission - commande de lampe témoin d'affichage des défauts - circuit trop bas"
-    P0899 = "Commande de transmission - commande de lampe témoin d'affichage des défauts - circuit trop haut"
-    P0900 = "Capteur d'embrayage - circuit ouvert"
-    P0901 = "Capteur d'embrayage - plage de mesure/performance du circuit"
-    P0902 = "Capteur d'embrayage - circuit trop bas"
-    P0903 = "Capteur d'embrayage - circuit trop haut"
-    P0904 = "Circuit de sélection de coulisse de transmission - panne"
-    P0905 = "Circuit de sélection de coulisse de transmission - plage de mesure/performance"
-    P0906 = "Circuit de sélection de coulisse de transmission - basse"
-    P0907 = "Circuit de sélection de coulisse de transmission - haute"
-    P0908 = "Circuit de sélection de coulisse de transmission - panne intermittente du circuit"
-    P0909 = "Erreur de commande de sélection de coulisse de transmission"
-    P0910 = "Capteur de sélection de coulisse de transmission - circuit ouvert"
-    P0911 = "Capteur de sélection de coulisse de transmission - plage de mesure/performance"
-    P0912 = "Capteur de sélection de coulisse de transmission - circuit trop bas"
-    P0913 = "Capteur de sélection de coulisse de transmission - circuit trop haut"
-    P0914 = "Circuit de position de changement de vitesses - panne"
-    P0915 = "Circuit de position de changement de vitesses - plage de mesure/performance"
-    P0916 = "Circuit de position de changement de vitesses - basse"
-    P0917 = "Circuit de position de changement de vitesses - haute"
-    P0918 = "Circuit de position de changement de vitesses - panne intermittente"
-    P0919 = "Commande de position de changement de vitesses - erreur"
-    P0920 = "Capteur de changement de vitesses vers l'avant - circuit ouvert"
-    P0921 = "Capteur de changement de vitesses vers l'avant - plage de mesure/performance"
-    P0922 = "Capteur de changement de vitesses vers l'avant - circuit trop bas"
-    P0923 = "Capteur de changement de vitesses vers l'avant - circuit trop haut"
-    P0924 = "Capteur de changement de vitesses vers l'arrière - circuit ouvert"
-    P0925 = "Capteur de changement de vitesses vers l'arrière - plage de mesure/performance"
-    P0926 = "Capteur de changement de vitesses vers l'arrière - circuit trop bas"
-    P0927 = "Capteur de changement de vitesses vers l'arrière - circuit trop haut"
-    P0928 = "Électrovanne de blocage de changement de vitesse - circuit ouvert"
-    P0929 = "Électrovanne de blocage de changement de vitesse - plage de mesure/performance du circuit"
-    P0930 = "Électrovanne de blocage de changement de vitesse - circuit trop bas"
-    P0931 = "Électrovanne de blocage de changement de vitesse - circuit trop haut"
-    P0932 = "Capteur de pression hydraulique - panne du circuit"
-    P0933 = "Capteur de pression hydraulique - plage de mesure/performance du circuit"
-    P0934 = "Capteur de pression hydraulique - signal d'entrée du circuit trop bas"
-    P0935 = "Capteur de pression hydraulique - signal d'entrée du circuit trop haut"
-    P0936 = "Capteur de pression hydraulique - circuit intermittent"
-    P0937 = "Sonde de température du fluide hydraulique - panne du circuit"
-    P0938 = "Sonde de température du fluide hydraulique - plage de mesure/performance"
-    P0939 = "Sonde de température du fluide hydraulique - signal d'entrée du circuit trop bas"
-    P0940 = "Sonde de température du fluide hydraulique - signal d'entrée du circuit trop haut"
-    P0941 = "Sonde de température du fluide hydraulique - circuit intermittent"
-    P0942 = "Module de pression hydraulique"
-    P0943 = "Module de pression hydraulique - durée de cycle trop courte"
-    P0944 = "Module de pression hydraulique - perte de pression"
-    P0945 = "Relais de la pompe hydraulique - circuit ouvert"
-    P0946 = "Relais de la pompe hydraulique - plage de mesure/performance du circuit"
-    P0947 = "Relais de la pompe hydraulique - circuit trop bas"
-    P0948 = "Relais de la pompe hydraulique - circuit trop haut"
-    P0949 = "Boite de vitesse à passage automatique - apprentissage adaptatif non effectué"
-    P0950 = "Circuit de commande boite de vitesses à passage automatique"
-    P0951 = "Circuit de commande boite de vitesses à passage automatique - plage de mesure/performance"
-    P0952 = "Circuit de commande boite de vitesses à passage automatique - basse"
-    P0953 = "Circuit de commande boite de vitesses à passage automatique - haute"
-    P0954 = "Circuit de commande boite de vitesses à passage automatique - panne intermittente du circuit"
-    P0955 = "Circuit de programme boite de vitesses à passage automatique - panne"
-    P0956 = "Circuit de programme boite de vitesses à passage automatique - plage de mesure/performance"
-    P0957 = "Circuit de programme boite de vitesses à passage automatique - basse"
-    P0958 = "Circuit de programme boite de vitesses à passage automatique - haute"
-    P0959 = "Circuit de programme boite de vitesses à passage automatique - panne intermittente du circuit"
-    P0960 = "Électrovanne de régulation de pression A - circuit de commande ouvert"
-    P0961 = "Électrovanne de régulation de pression A - plage de mesure/performance du circuit de commande"
-    P0962 = "Électrovanne de régulation de pression A - circuit de commande trop faible"
-    P0963 = "Électrovanne de régulation de pression A - circuit de commande trop fort"
-    P0964 = "Électrovanne de régulation de pression B - circuit de commande ouvert"
-    P0965 = "Électrovanne de régulation de pression B - plage de mesure/performance du circuit de commande"
-    P0966 = "Électrovanne de régulation de pression B - circuit de commande trop faible"
-    P0967 = "Électrovanne de régulation de pression B - circuit de commande trop fort"
-    P0968 = "Électrovanne de régulation de pression C - circuit de commande ouvert"
-    P0969 = "Électrovanne de régulation de pression C - plage de mesure/performance du circuit de commande"
-    P0970 = "Électrovanne de régulation de pression C - circuit de commande trop faible"
-    P0971 = "Électrovanne de régulation de pression C - circuit de commande trop fort"
-    P0972 = "Électrovanne de changement de vitesse A - plage de mesure/performance du circuit de commande"
-    P0973 = "Électrovanne de changement de vitesse A - circuit de commande trop faible"
-    P0974 = "Électrovanne de changement de vitesse A - circuit de commande trop fort"
-    P0975 = "Électrovanne de changement de vitesse B - plage de mesure/performance du circuit de commande"
-    P0976 = "Électrovanne de changement de vitesse B - circuit de commande trop faible"
-    P0977 = "Électrovanne de changement de vitesse B - circuit de commande trop fort"
-    P0978 = "Électrovanne de changement de vitesse C - plage de mesure/performance du circuit de commande"
-    P0979 = "Électrovanne de changement de vitesse C - circuit de commande trop faible"
-    P0980 = "Électrovanne de changement de vitesse C - circuit de commande trop fort"
-    P0981 = "Électrovanne de changement de vitesse D - plage de mesure/performance du circuit de commande"
-    P0982 = "Électrovanne de changement de vitesse D - circuit de commande trop faible"
-    P0983 = "Électrovanne de changement de vitesse D - circuit de commande trop fort"
-    P0984 = "Électrovanne de changement de vitesse E - plage de mesure/performance du circuit de commande"
-    P0985 = "Électrovanne de changement de vitesse E - circuit de commande trop faible"
-    P0986 = "Électrovanne de changement de vitesse E - circuit de commande trop fort"
-    P0987 = "Capteur de pression d'huile de transmission E - panne du circuit"
-    P0988 = "Capteur de pression d'huile de transmission E - plage de mesure/performance du circuit"
-    P0989 = "Capteur de pression d'huile de transmission E - circuit trop bas"
-    P0990 = "Capteur de pression d'huile de transmission E - circuit trop haut"
-    P0991 = "Capteur de pression d'huile de transmission E - circuit intermittent"
-    P0992 = "Capteur de pression d'huile de transmission F - panne du circuit"
-    P0993 = "Capteur de pression d'huile de transmission F - plage de mesure/performance du circuit"
-    P0994 = "Capteur de pression d'huile de transmission F - circuit trop bas"
-    P0995 = "Capteur de pression d'huile de transmission F - circuit trop haut"
-    P0996 = "Capteur de pression d'huile de transmission F - circuit intermittent"
-    P0997 = "Électrovanne de changement de vitesse F - plage de mesure/performance du circuit de commande"
-    P0998 = "Électrovanne de changement de vitesse F - circuit de commande trop faible"
-    P0999 = "Électrovanne de changement de vitesse F - circuit de commande trop fort"
+    def __init__(self, path: str = os.path.join(DATA_DIR, 'dtc_fr.bin')):
+        self.path = path
+        self._mmap: Optional[mmap.mmap] = None
+        self._directory = None
+        self._pages = None
+        self._offsets = None
+        self._text = None
+        self._count = 0
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if view[:4] != _MAGIC:
+            raise ValueError(f"{self.path} is not a DTC database")
+
+        self._count, pages = self._array(view[4:_HEADER_SIZE], 'I')
+        start = _HEADER_SIZE
+        stops = (('H', _PAGE_SIZE), ('H', pages * _PAGE_SIZE), ('I', self._count + 1))
+        tables = []
+        for typecode, length in stops:
+            size = length * array(typecode).itemsize
+            tables.append(self._array(view[start:start + size], typecode))
+            start += size
+        self._directory, self._pages, self._offsets = tables
+        self._text = view[start:]
+
+    @staticmethod
+    def _array(view: memoryview, typecode: str):
+        if sys.byteorder == 'little':
+            return view.cast(typecode)
+        ret = array(typecode, view)
+        ret.byteswap()
+        return ret
+
+    def _index(self, raw: int) -> int:
+        """
+        Number of the code in the database (0 if it is not in it)
+        """
+        if self._mmap is None:
+            self._open()
+        page = self._directory[raw >> 8]
+        if not page:
+            return 0
+        return self._pages[(page - 1) * _PAGE_SIZE + (raw & 0xFF)]
+
+    def description(self, dtc: Union[int, str]) -> Optional[str]:
+        """
+        Description of a DTC given by its raw value or its code (None if it is unknown)
+        """
+        i = self._index(dtc_to_raw(dtc) if isinstance(dtc, str) else dtc)
+        if not i:
+            return None
+        return bytes(self._text[self._offsets[i - 1]:self._offsets[i]]).decode('utf-8')
+
+    def descriptions(self, raws: Iterable[int]) -> List[Optional[str]]:
+        """
+        Descriptions of several DTC given by their raw values
+        """
+        description = self.description
+        return [description(raw) for raw in raws]
+
+    def describe(self, raw: int) -> str:
+        """
+        Description of a DTC, or the kind of code when it is not in the database
+        """
+        ret = self.description(raw)
+        if ret is None:
+            kind = "Code constructeur" if is_manufacturer_specific(raw) else "Code inconnu"
+            ret = f"{kind} ({CATEGORY_NAMES[DTC_CATEGORIES[raw >> 14]]})"
+        return ret
+
+    def decode(self, raws: Iterable[int]) -> List[Tuple[str, str]]:
+        """
+        Codes and descriptions of several DTC given by their raw values
+        """
+        describe = self.describe
+        return [(raw_to_dtc(raw), describe(raw)) for raw in raws]
+
+    def __getitem__(self, code: str) -> str:
+        ret = self.description(code)
+        if ret is None:
+            raise KeyError(code)
+        return ret
+
+    def __contains__(self, dtc: Union[int, str]) -> bool:
+        return self._index(dtc_to_raw(dtc) if isinstance(dtc, str) else dtc) != 0
+
+    def __len__(self) -> int:
+        if self._mmap is None:
+            self._open()
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Codes of the database
+        """
+        if self._mmap is None:
+            self._open()
+        for page_high, page in enumerate(self._directory):
+            if page:
+                for low in range(_PAGE_SIZE):
+                    if self._pages[(page - 1) * _PAGE_SIZE + low]:
+                        yield raw_to_dtc(page_high << 8 | low)
+
+    @staticmethod
+    def build(source: str, path: str):
+        """
+        Packs a text table (code, tab, description per line) into a database file.
+        """
+        entries = []
+        with open(source, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    code, description = line.rstrip('\n').split('\t', 1)
+                    entries.append((dtc_to_raw(code), description.encode('utf-8')))
+        entries.sort()
+
+        directory = array('H', [0] * _PAGE_SIZE)
+        pages = array('H')
+        offsets = array('I', [0])
+        text = bytearray()
+        for i, (raw, description) in enumerate(entries, 1):
+            if not directory[raw >> 8]:
+                pages.extend([0] * _PAGE_SIZE)
+                directory[raw >> 8] = len(pages) // _PAGE_SIZE
+            pages[(directory[raw >> 8] - 1) * _PAGE_SIZE + (raw & 0xFF)] = i
+            text += description
+            offsets.append(len(text))
+
+        header = array('I', [len(entries), len(pages) // _PAGE_SIZE])
+        tables = (header, directory, pages, offsets)
+        if sys.byteorder != 'little':
+            for t in tables:
+                t.byteswap()
+        with open(path, 'wb') as f:
+            f.write(_MAGIC)
+            for t in tables:
+                f.write(t.tobytes())
+            f.write(text)
+
+
+# List of OBD error codes
+# Extracted from https://www.outilsobdfacile.fr/code-defaut-standard-obd.php
+OBDErrorCodes = DTCDatabase()
+
+
+if __name__ == '__main__':
+    # rebuild the database from its text table
+    DTCDatabase.build(os.path.join(DATA_DIR, 'dtc_fr.tsv'), OBDErrorCodes.path)
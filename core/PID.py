@@ -0,0 +1,141 @@
+"""
+Definitions of the standard OBD PIDs (SAE J1979)
+"""
+from collections import namedtuple
+from typing import Dict
+
+# number of data bytes answered for each Mode 01 PID
+MODE01_PID_SIZES = {
+    0x00: 4, 0x01: 4, 0x02: 2, 0x03: 2, 0x04: 1, 0x05: 1, 0x06: 1, 0x07: 1,
+    0x08: 1, 0x09: 1, 0x0A: 1, 0x0B: 1, 0x0C: 2, 0x0D: 1, 0x0E: 1, 0x0F: 1,
+    0x10: 2, 0x11: 1, 0x12: 1, 0x13: 1, 0x14: 2, 0x15: 2, 0x16: 2, 0x17: 2,
+    0x18: 2, 0x19: 2, 0x1A: 2, 0x1B: 2, 0x1C: 1, 0x1D: 1, 0x1E: 1, 0x1F: 2,
+    0x20: 4, 0x21: 2, 0x22: 2, 0x23: 2, 0x24: 4, 0x25: 4, 0x26: 4, 0x27: 4,
+    0x28: 4, 0x29: 4, 0x2A: 4, 0x2B: 4, 0x2C: 1, 0x2D: 1, 0x2E: 1, 0x2F: 1,
+    0x30: 1, 0x31: 2, 0x32: 2, 0x33: 1, 0x34: 4, 0x35: 4, 0x36: 4, 0x37: 4,
+    0x38: 4, 0x39: 4, 0x3A: 4, 0x3B: 4, 0x3C: 2, 0x3D: 2, 0x3E: 2, 0x3F: 2,
+    0x40: 4, 0x41: 4, 0x42: 2, 0x43: 2, 0x44: 2, 0x45: 1, 0x46: 1, 0x47: 1,
+    0x48: 1, 0x49: 1, 0x4A: 1, 0x4B: 1, 0x4C: 1, 0x4D: 2, 0x4E: 2, 0x4F: 4,
+    0x50: 4, 0x51: 1, 0x52: 1, 0x53: 2, 0x54: 2, 0x55: 2, 0x56: 2, 0x57: 2,
+    0x58: 2, 0x59: 2, 0x5A: 1, 0x5B: 1, 0x5C: 1, 0x5D: 2, 0x5E: 2, 0x5F: 1,
+    0x60: 4, 0x61: 1, 0x62: 1, 0x63: 2, 0x64: 5, 0x65: 2, 0x66: 5, 0x67: 3,
+    0x80: 4, 0xA0: 4, 0xC0: 4,
+}
+
+PIDField = namedtuple('PIDField', ['name', 'unit', 'formula'])
+
+
+def _percent(a, *_):
+    return a * 100 / 255
+
+
+def _trim(a, *_):
+    return a * 100 / 128 - 100
+
+
+def _temperature(a, *_):
+    return a - 40
+
+
+def _word(a, b, *_):
+    return a * 256 + b
+
+
+def _signed_word(a, b, *_):
+    v = a * 256 + b
+    return v - 65536 * (v >= 32768)
+
+
+def _o2_sensor(n):
+    return (PIDField(f'o2_s{n}_voltage', 'V', lambda a, b, *_: a / 200),
+            PIDField(f'o2_s{n}_trim', '%', lambda a, b, *_: b * 100 / 128 - 100))
+
+
+def _wide_o2_voltage(n):
+    return (PIDField(f'o2_s{n}_wide_ratio', '', lambda a, b, *_: _word(a, b) * 2 / 65536),
+            PIDField(f'o2_s{n}_wide_voltage', 'V', lambda a, b, c, d: _word(c, d) * 8 / 65536))
+
+
+def _wide_o2_current(n):
+    return (PIDField(f'o2_s{n}_wide_current_ratio', '', lambda a, b, *_: _word(a, b) * 2 / 65536),
+            PIDField(f'o2_s{n}_wide_current', 'mA', lambda a, b, c, d: _word(c, d) / 256 - 128))
+
+
+# fields of the Mode 01 PIDs having numeric values (SAE J1979), their names are unique
+# the formulas take the data bytes A, B, C, D (ints, or arrays of them to decode many samples at once)
+MODE01_PIDS = {
+    0x04: (PIDField('engine_load', '%', _percent),),
+    0x05: (PIDField('coolant_temperature', '°C', _temperature),),
+    0x06: (PIDField('short_fuel_trim_bank1', '%', _trim),),
+    0x07: (PIDField('long_fuel_trim_bank1', '%', _trim),),
+    0x08: (PIDField('short_fuel_trim_bank2', '%', _trim),),
+    0x09: (PIDField('long_fuel_trim_bank2', '%', _trim),),
+    0x0A: (PIDField('fuel_pressure', 'kPa', lambda a, *_: a * 3),),
+    0x0B: (PIDField('intake_manifold_pressure', 'kPa', lambda a, *_: a),),
+    0x0C: (PIDField('engine_speed', 'rpm', lambda a, b, *_: _word(a, b) / 4),),
+    0x0D: (PIDField('vehicle_speed', 'km/h', lambda a, *_: a),),
+    0x0E: (PIDField('timing_advance', '°', lambda a, *_: a / 2 - 64),),
+    0x0F: (PIDField('intake_air_temperature', '°C', _temperature),),
+    0x10: (PIDField('maf_rate', 'g/s', lambda a, b, *_: _word(a, b) / 100),),
+    0x11: (PIDField('throttle_position', '%', _percent),),
+    **{0x14 + n: _o2_sensor(n + 1) for n in range(8)},
+    0x1F: (PIDField('run_time', 's', _word),),
+    0x21: (PIDField('distance_with_mil', 'km', _word),),
+    0x22: (PIDField('fuel_rail_pressure', 'kPa', lambda a, b, *_: _word(a, b) * 0.079),),
+    0x23: (PIDField('fuel_rail_gauge_pressure', 'kPa', lambda a, b, *_: _word(a, b) * 10),),
+    **{0x24 + n: _wide_o2_voltage(n + 1) for n in range(8)},
+    0x2C: (PIDField('commanded_egr', '%', _percent),),
+    0x2D: (PIDField('egr_error', '%', _trim),),
+    0x2E: (PIDField('commanded_evaporative_purge', '%', _percent),),
+    0x2F: (PIDField('fuel_level', '%', _percent),),
+    0x30: (PIDField('warm_ups_since_cleared', '', lambda a, *_: a),),
+    0x31: (PIDField('distance_since_cleared', 'km', _word),),
+    0x32: (PIDField('evap_vapor_pressure', 'Pa', lambda a, b, *_: _signed_word(a, b) / 4),),
+    0x33: (PIDField('barometric_pressure', 'kPa', lambda a, *_: a),),
+    **{0x34 + n: _wide_o2_current(n + 1) for n in range(8)},
+    0x3C: (PIDField('catalyst_temperature_b1s1', '°C', lambda a, b, *_: _word(a, b) / 10 - 40),),
+    0x3D: (PIDField('catalyst_temperature_b2s1', '°C', lambda a, b, *_: _word(a, b) / 10 - 40),),
+    0x3E: (PIDField('catalyst_temperature_b1s2', '°C', lambda a, b, *_: _word(a, b) / 10 - 40),),
+    0x3F: (PIDField('catalyst_temperature_b2s2', '°C', lambda a, b, *_: _word(a, b) / 10 - 40),),
+    0x42: (PIDField('control_module_voltage', 'V', lambda a, b, *_: _word(a, b) / 1000),),
+    0x43: (PIDField('absolute_load', '%', lambda a, b, *_: _word(a, b) * 100 / 255),),
+    0x44: (PIDField('commanded_equivalence_ratio', '', lambda a, b, *_: _word(a, b) * 2 / 65536),),
+    0x45: (PIDField('relative_throttle_position', '%', _percent),),
+    0x46: (PIDField('ambient_air_temperature', '°C', _temperature),),
+    0x47: (PIDField('throttle_position_b', '%', _percent),),
+    0x48: (PIDField('throttle_position_c', '%', _percent),),
+    0x49: (PIDField('accelerator_pedal_position_d', '%', _percent),),
+    0x4A: (PIDField('accelerator_pedal_position_e', '%', _percent),),
+    0x4B: (PIDField('accelerator_pedal_position_f', '%', _percent),),
+    0x4C: (PIDField('commanded_throttle_actuator', '%', _percent),),
+    0x4D: (PIDField('time_with_mil', 'min', _word),),
+    0x4E: (PIDField('time_since_cleared', 'min', _word),),
+    0x52: (PIDField('ethanol_fuel', '%', _percent),),
+    0x53: (PIDField('absolute_evap_vapor_pressure', 'kPa', lambda a, b, *_: _word(a, b) / 200),),
+    0x54: (PIDField('evap_vapor_pressure_wide', 'Pa', _signed_word),),
+    0x55: (PIDField('short_secondary_o2_trim_bank1', '%', _trim),
+           PIDField('short_secondary_o2_trim_bank3', '%', lambda a, b, *_: _trim(b))),
+    0x56: (PIDField('long_secondary_o2_trim_bank1', '%', _trim),
+           PIDField('long_secondary_o2_trim_bank3', '%', lambda a, b, *_: _trim(b))),
+    0x57: (PIDField('short_secondary_o2_trim_bank2', '%', _trim),
+           PIDField('short_secondary_o2_trim_bank4', '%', lambda a, b, *_: _trim(b))),
+    0x58: (PIDField('long_secondary_o2_trim_bank2', '%', _trim),
+           PIDField('long_secondary_o2_trim_bank4', '%', lambda a, b, *_: _trim(b))),
+    0x59: (PIDField('fuel_rail_absolute_pressure', 'kPa', lambda a, b, *_: _word(a, b) * 10),),
+    0x5A: (PIDField('relative_accelerator_pedal_position', '%', _percent),),
+    0x5B: (PIDField('hybrid_battery_remaining_life', '%', _percent),),
+    0x5C: (PIDField('engine_oil_temperature', '°C', _temperature),),
+    0x5D: (PIDField('fuel_injection_timing', '°', lambda a, b, *_: _word(a, b) / 128 - 210),),
+    0x5E: (PIDField('engine_fuel_rate', 'L/h', lambda a, b, *_: _word(a, b) / 20),),
+    0x61: (PIDField('driver_demand_torque', '%', lambda a, *_: a - 125),),
+    0x62: (PIDField('actual_torque', '%', lambda a, *_: a - 125),),
+    0x63: (PIDField('reference_torque', 'Nm', _word),),
+}
+
+
+def decode(pid: int, data: bytes) -> Dict[str, float]:
+    """
+    Values of the fields of a Mode 01 PID, from its data bytes
+    """
+    args = tuple(data[:4]) + (0,) * (4 - min(len(data), 4))
+    return {field.name: field.formula(*args) for field in MODE01_PIDS[pid]}
@@ -0,0 +1,255 @@
+import asyncio
+import logging
+from typing import Awaitable, Dict, Iterable, List, Optional, Tuple, Union
+
+from core.collectors.ELM327 import ELM327Base, ELM327Error, NoDataError
+from core.connection.async_abstract_conn import AsyncAbstractConnection
+from core.connection.async_usb_serial import AsyncUSBSerial
+
+
+class AsyncELM327(ELM327Base):
+    """
+    Driver of the ELM327 Interface product, for asyncio connections.
+    It has the same commands as ELM327, as coroutines. The connection to the adapter is done by connect().
+    """
+
+    def __init__(self, connection: AsyncAbstractConnection, settings: Optional[Dict[bytes, bytes]] = None):
+        """
+        The given AT settings (e.g. ELM327Base.THROUGHPUT_PROFILE) are applied at connection.
+        """
+        super().__init__()
+        self.logger = logging.getLogger('MCL.AsyncELM327')
+
+        self._conn: AsyncAbstractConnection = connection
+        self.settings = dict(settings or {})
+
+    async def get_protocol(self) -> int:
+        """
+        Number of the OBD protocol in use (0 if it is not determined yet)
+        """
+        if self._protocol is None:
+            return self._parse_protocol(await self.send_command(b'AT DPN'))
+        return self._protocol
+
+    async def multi_pid(self) -> bool:
+        """
+        True if several PIDs can be requested in a single message (needs ELM327 v1.3+ and a CAN protocol)
+        """
+        return self._supports_multi_pid(await self.get_protocol())
+
+    async def set_baudrate(self, value):
+        if not isinstance(self._conn, AsyncUSBSerial):
+            raise AttributeError(f"No baudrate defined when connection is {type(self._conn)} (AsyncUSBSerial needed)")
+
+        self._check_baudrate(value)
+
+        old = self._conn.baudrate
+        try:
+            await self._change_baudrate(value)
+        except ConnectionError:
+            # the adapter goes back to the previous baudrate by itself when the handshake fails
+            await self._resync((old, value[1]))
+            raise
+
+        self._baudrate = value[1]
+        self.logger.info("Baudrate set to %s (not permanent)", value[1])
+
+    async def _brd_read(self, read: Awaitable[bytes], value) -> bytes:
+        """
+        Read of the baudrate change handshake, raising a ConnectionError if it is not done after BAUDRATE_TIMEOUT
+        """
+        try:
+            return await asyncio.wait_for(read, self.BAUDRATE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"Problem when testing the new baudrate ({value[1]})") from None
+
+    async def _change_baudrate(self, value):
+        """
+        Baudrate change handshake (AT BRD)
+        """
+        cmd = b'AT BRD ' + value[0]
+        await self._conn.write(cmd + self._suffix)
+
+        rep = await self._brd_read(self._conn.read_until(self._suffix), value)
+        if rep == cmd + self._suffix:  # echo
+            rep = await self._brd_read(self._conn.read_until(self._suffix), value)
+        try:
+            self._check_brd(rep, value)
+        except ELM327Error:
+            await self._read()
+            raise
+
+        self._conn.baudrate = value[1]
+
+        rep = await self._brd_read(self._conn.read_until(self._suffix), value)
+        if not rep.endswith(self._ati + self._suffix):
+            raise ConnectionError(f"Problem when testing the new baudrate ({value[1]})")
+
+        await self._conn.write(b'\r')
+
+        rep = await self._brd_read(self._conn.read(2), value)
+        if not rep == b'OK':
+            raise ConnectionError(f"Problem when testing the new baudrate ({value[1]})")
+
+        await self._brd_read(self._conn.read_until(b'>'), value)
+
+    async def _resync(self, rates: Iterable[int]):
+        """
+        Finds which of the given baudrates the adapter uses after a failed baudrate change.
+        """
+        expected = self._ati + self._suffix * 2 + b'>'
+        for rate in rates:
+            self._conn.baudrate = rate
+            await asyncio.sleep(self.BAUDRATE_TIMEOUT)
+            await self._conn.read_all()
+            await self._conn.write(b'AT I' + self._suffix)
+            try:
+                rep = await asyncio.wait_for(self._conn.read_until(b'>'), self.BAUDRATE_TIMEOUT)
+            except asyncio.TimeoutError:
+                continue
+            if rep.endswith(expected):
+                self._baudrate = rate
+                self.logger.warning("Baudrate back to %s", rate)
+                return
+        raise ConnectionError("Communication with the adapter lost after a baudrate change")
+
+    async def connect(self):
+        await self._conn.flush()
+        await self.reset()
+        for cmd in self._settings_to_apply():
+            await self.send_command(cmd)
+
+    async def reset(self):
+        self.logger.info("reset")
+        cmd = b'AT Z'
+        await self._conn.write(cmd + (self._suffix or b'\r\n'))
+        if isinstance(self._conn, AsyncUSBSerial) and self._baudrate != self.DEFAULT_BAUDRATE:
+            # the adapter answers at its default baudrate
+            self._conn.baudrate = self._baudrate = self.DEFAULT_BAUDRATE
+        ver = (await self._read()).split(self._suffix)[-1]
+        self._track(cmd)
+        self._parse_ati(ver)
+
+    async def send_command(self, cmd: Union[bytes, str]):
+        cmd = self._command(cmd)
+
+        await self._conn.write(cmd + (self._suffix or b'\r\n'))
+        ret = (await self._read()).split(self._suffix)[-1]
+        self._track(cmd)
+        return ret
+
+    async def send_request(self, cmd: Union[bytes, str]) -> List[bytes]:
+        """
+        Sends an OBD request (not an AT command) and returns the lines of the answer, without echo and status lines.
+        """
+        cmd, sent = self._prepare_request(cmd)
+
+        await self._conn.write(sent + (self._suffix or b'\r\n'))
+        lines = self._parse_request(cmd, sent, await self._read())
+        if self._protocol is None and self._counted(cmd) and await self.get_protocol():
+            # the protocol is found by the first request: its number of lines is learned for it
+            self._learn(cmd, sent, lines)
+        return lines
+
+    async def query(self, mode: int, pid: int) -> bytes:
+        """
+        Requests a PID of the given mode and returns its data bytes (as answered by the first ECU).
+        """
+        return self._parse_query(mode, pid, await self.send_request(b'%02X%02X' % (mode, pid)))
+
+    async def query_pids(self, pids: Iterable[int]) -> Dict[int, bytes]:
+        """
+        Requests several Mode 01 PIDs and returns the data bytes of each PID answered (by the first ECU).
+        The PIDs are packed by 6 in multi-PID requests when possible, else they are requested one by one.
+        """
+        pids = list(dict.fromkeys(pids))
+        ret = {}
+
+        if len(pids) > 1 and await self.multi_pid():
+            requests, single = self._pack_pids(pids)
+            for request in requests:
+                try:
+                    ret.update(self._split_pids(self._messages(await self.send_request(request))[0]))
+                except ELM327Error as e:
+                    self.logger.debug("Request %s failed: %s", request, e)
+        else:
+            single = pids
+
+        for pid in single:
+            try:
+                ret[pid] = await self.query(0x01, pid)
+            except ELM327Error as e:
+                self.logger.debug("PID %02X failed: %s", pid, e)
+
+        return ret
+
+    async def read_dtcs(self, mode: int = 0x03) -> List[List[Tuple[str, str]]]:
+        """
+        Reads the stored (Mode 03), pending (07) or permanent (0A) DTC and returns the codes and descriptions reported
+        by each ECU.
+        """
+        try:
+            lines = await self.send_request(b'%02X' % mode)
+        except NoDataError:
+            return []
+        return self._parse_dtcs(mode, lines, await self.get_protocol())
+
+    async def scan_dtcs(self, modes: Iterable[int] = ELM327Base.DTC_MODES) -> Dict[int, List[List[Tuple[str, str]]]]:
+        """
+        Reads the DTC of several modes (stored, pending and permanent by default).
+        """
+        return {mode: await self.read_dtcs(mode) for mode in modes}
+
+    async def request_messages(self, cmd: Union[bytes, str]) -> List[Tuple[Optional[int], bytes]]:
+        """
+        Sends a request and returns the messages answered (multi-frame ones reassembled), with the CAN ID of the ECU
+        sending each one (None when the headers are off).
+        """
+        return self._ecu_messages(await self.send_request(cmd))
+
+    async def read_vehicle_info(self, pid: int) -> List[Tuple[Optional[int], bytes]]:
+        """
+        Vehicle information of a Mode 09 PID answered by each ECU (see ELM327.read_vehicle_info)
+        """
+        try:
+            return self._parse_info(pid, await self.request_messages(b'09%02X' % pid))
+        except NoDataError:
+            return []
+
+    async def read_did(self, did: int) -> bytes:
+        """
+        Reads a data identifier (UDS ReadDataByIdentifier) of the ECU the requests are sent to (see AT SH).
+        """
+        return self._parse_did(did, self._messages(await self.send_request(b'22%04X' % did)))
+
+    async def read_dids(self, dids: Iterable[int]) -> Dict[int, bytes]:
+        """
+        Reads several data identifiers. The ones refused or not answered are left out.
+        """
+        ret = {}
+        for did in dids:
+            try:
+                ret[did] = await self.read_did(did)
+            except ELM327Error as e:
+                self.logger.debug("DID %04X failed: %s", did, e)
+        return ret
+
+    async def _read(self):
+        return self._strip(await self._conn.read_until(b'>'))
+
+
+if __name__ == '__main__':
+    from core.utils.log import setup_log, set_console_log_level
+
+    async def main():
+        conn = AsyncUSBSerial()
+        await conn.connect()
+        obd = AsyncELM327(conn)
+        await obd.connect()
+        print(await obd.send_command('I'))
+        print(await obd.send_command('RV'))
+        await obd.set_baudrate(obd.BAUD57_6K)
+
+    setup_log()
+    set_console_log_level(logging.DEBUG)
+    asyncio.run(main())
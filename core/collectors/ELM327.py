@@ -1,17 +1,48 @@
 import logging
-from typing import Union
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+from core.OBD import OBDErrorCodes, unpack_dtcs
+from core.collectors.capabilities import CapabilityCache
+from core.collectors.isotp import (ISOTPError, frame_count, negative_response, parse_flow_control, parse_line,
+                                   reassemble, segment)
+from core.collectors.monitor import MONITOR_END, MONITOR_ERRORS, CANFrame, id_digits, parse_frame, plan_filters
+from core.PID import MODE01_PID_SIZES
 from core.connection.abstract_conn import AbstractConnection
+from core.connection.framing import FrameReader
 from core.connection.usb_serial import USBSerial
+from core.utils.metrics import REGISTRY, AdapterMetrics, Registry
 
 
 class ELM327Error(Exception):
     pass
 
 
-class ELM327:
+class NoDataError(ELM327Error):
     """
-    Driver of the ELM327 Interface product.
+    No ECU answered the request
+    """
+
+
+class _FlowControlWait(ELM327Error):
+    """
+    The adapter returned at a flow control WAIT frame, before the flow control telling to go on
+    """
+
+
+# lines sent by the ELM327 before the data of an OBD answer
+_STATUS_LINES = (b'SEARCHING...', b'BUS INIT: ...', b'BUS INIT: ...OK')
+
+# messages sent by the ELM327 instead of the data of an OBD answer
+_ERROR_LINES = (b'?', b'NO DATA', b'UNABLE TO CONNECT', b'CAN ERROR', b'BUS ERROR', b'BUS BUSY', b'DATA ERROR',
+                b'FB ERROR', b'BUFFER FULL', b'STOPPED', b'BUS INIT: ...ERROR', b'LV RESET', b'ACT ALERT')
+
+
+class ELM327Base:
+    """
+    Protocol logic of the ELM327 Interface product, shared by the synchronous and asynchronous drivers.
     """
     BAUD9_6K = (b'00', 9_600)
     BAUD19_2K = (b'D0', 19_200)
@@ -20,106 +51,1203 @@ class ELM327:
     BAUD115_2K = (b'23', 115_200)
     BAUD230_4K = (b'11', 230_400)
     BAUD500K = (b'08', 500_000)
+    BAUDRATES = (BAUD9_6K, BAUD19_2K, BAUD38_4K, BAUD57_6K, BAUD115_2K, BAUD230_4K, BAUD500K)
+
+    # baudrate after a reset (AT Z)
+    DEFAULT_BAUDRATE = 38_400
+    # timeout of the reads during a baudrate change (the adapter waits 75 ms for the host by default)
+    BAUDRATE_TIMEOUT = 0.5
+
+    # best baudrate found by negotiate_baudrate() for each adapter (AT I string, serial number of its USB port or name
+    # of its connection when it has none)
+    negotiated_baudrates: Dict[Tuple[bytes, str], Tuple[bytes, int]] = {}
+
+    # ISO 15765-4 protocol numbers (AT DPN), the only ones accepting multi-PID requests
+    CAN_PROTOCOLS = (6, 7, 8, 9)
+    MAX_PIDS_PER_REQUEST = 6
+
+    # modes reading the stored, pending and permanent DTC
+    DTC_MODES = (0x03, 0x07, 0x0A)
+
+    # settings after a reset (AT Z, AT WS, AT D): echo, spaces, headers, CAN auto-formatting, responses, adaptive
+    # timing and timeout (the linefeeds depend on the adapter)
+    DEFAULT_SETTINGS = {b'E': b'1', b'S': b'1', b'H': b'0', b'CAF': b'1', b'R': b'1', b'AT': b'1', b'ST': b'32'}
+    # settings for the highest sample rate: no echo, spaces nor linefeeds (half the bytes of a default answer),
+    # aggressive adaptive timing and a 100 ms timeout (ECUs answer within 50 ms, ISO 15765-4)
+    THROUGHPUT_PROFILE = {b'E': b'0', b'S': b'0', b'L': b'0', b'H': b'0', b'AT': b'2', b'ST': b'19'}
+    # timeout of the probes looking for an adapter already running
+    PROBE_TIMEOUT = 0.2
+    # a learned number of answer lines is checked every COUNT_CHECK requests (sent once without it)
+    COUNT_CHECK = 100
+    # flow control WAIT frames accepted from an ECU during the sending of a message (ISO 15765-2 N_WFTmax)
+    MAX_FC_WAITS = 10
+
+    def __init__(self):
+        self.logger = logging.getLogger('MCL.ELM327')
+
+        self._ati = None
+        self.version_major: int = -1
+        self.version_minor: int = -1
+
+        self._baudrate = self.DEFAULT_BAUDRATE
+        self._suffix = None
+        self._protocol: Optional[int] = None
+        self._header: Optional[bytes] = None
+
+        # number of answer lines of each OBD request, learned for each (protocol, header) once the protocol is known
+        self.response_counts: Dict[Tuple[int, Optional[bytes]], Dict[bytes, int]] = {}
+        # requests sent with their learned number of lines since it was checked, for each (protocol, header, request)
+        self._count_uses: Dict[Tuple[int, Optional[bytes], bytes], int] = {}
+
+        self.metrics: Optional[AdapterMetrics] = None
+
+        # AT settings to apply at connection, e.g. {b'E': b'0', b'ST': b'19'} for AT E0 and AT ST 19 (see
+        # THROUGHPUT_PROFILE)
+        self.settings: Dict[bytes, bytes] = {}
+        # settings of the adapter, as far as they are known
+        self._state: Dict[bytes, bytes] = {}
+
+        # vehicle capabilities: VIN and supported PIDs bitmaps (answers to Mode 01 PIDs 00, 20, 40...)
+        self.vin: Optional[str] = None
+        self.pid_bitmaps: Dict[int, bytes] = {}
+
+        # an ECU answered flow control WAIT frames: the adapter waits for the next flow control frames
+        self._fc_waits = False
+
+    def _check_baudrate(self, value):
+        if value not in self.BAUDRATES:
+            raise ValueError(f"Baudrate must be one of the BAUDxxK constants")
+
+    def _parse_ati(self, ver: bytes):
+        self._ati = ver
+        ver = ver.decode('ascii', 'ignore')
+        if not ver.startswith("ELM327"):
+            raise ConnectionError(f"Bad reset message received: {ver}")
+        else:
+            self.version_major, self.version_minor = (int(v) for v in ver[8:].split('.'))
+            self.logger.info("AT I string: %s", self._ati)
+            self.logger.info("version: %s.%s", self.version_major, self.version_minor)
+
+    def _parse_protocol(self, rep: bytes) -> int:
+        protocol = int(rep.decode('ascii', 'ignore').lstrip('A') or '0', 16)
+        if protocol != 0:  # else automatic search not done yet, ask again next time
+            self._protocol = protocol
+        return protocol
+
+    def _supports_multi_pid(self, protocol: int) -> bool:
+        return (self.version_major, self.version_minor) >= (1, 3) and protocol in self.CAN_PROTOCOLS
+
+    @staticmethod
+    def _command(cmd: Union[bytes, str]) -> bytes:
+        if isinstance(cmd, str):
+            cmd = bytes(cmd, 'ASCII')
+
+        if not cmd.startswith(b'AT'):
+            cmd = b'AT ' + cmd
+        return cmd
+
+    def _track(self, cmd: bytes):
+        """
+        Keeps track of the settings changed by an AT command.
+        """
+        cmd = cmd.replace(b' ', b'').upper()
+        if cmd in (b'ATZ', b'ATWS', b'ATD'):
+            self._protocol = None
+            self._header = None
+            self._state = dict(self.DEFAULT_SETTINGS)
+        elif len(cmd) == 4 and cmd[2:3] in (b'E', b'L', b'S', b'H') and cmd[3:] in (b'0', b'1'):
+            self._state[cmd[2:3]] = cmd[3:]
+        elif cmd.startswith(b'ATST'):
+            self._state[b'ST'] = cmd[4:]
+        elif cmd.startswith(b'ATAT') and len(cmd) == 5:
+            self._state[b'AT'] = cmd[4:]
+        elif cmd in (b'ATCAF0', b'ATCAF1'):
+            self._state[b'CAF'] = cmd[5:]
+        elif cmd in (b'ATR0', b'ATR1'):
+            self._state[b'R'] = cmd[3:]
+        elif cmd.startswith(b'ATSP') or cmd.startswith(b'ATTP'):
+            self._protocol = None
+        elif cmd.startswith(b'ATSH'):
+            self._header = cmd[4:]
+
+    def _counted(self, cmd: bytes) -> bool:
+        """
+        True if the number of answer lines of a request can be learned (it does not change from one request to another)
+        """
+        # the answers to the DTC requests grow with the number of DTC
+        return cmd[:2] not in (b'%02X' % mode for mode in self.DTC_MODES)
+
+    def _settings_to_apply(self) -> List[bytes]:
+        """
+        AT commands setting the wanted settings that the adapter does not have (or may not have)
+        """
+        self._state[b'L'] = b'1' if self._suffix == b'\r\n' else b'0'
+        return [b'AT ' + key + value for key, value in self.settings.items() if self._state.get(key) != value]
+
+    def _observe_format(self, lines: List[bytes]):
+        """
+        Learns the spaces and headers settings from the data lines of an answer to a Mode 01 request.
+        """
+        line = lines[0]
+        self._state[b'S'] = b'1' if b' ' in line else b'0'
+        self._state[b'H'] = b'0' if line.replace(b' ', b'').startswith(b'41') else b'1'
+
+    def _prepare_request(self, cmd: Union[bytes, str], responses: Optional[int] = None) -> Tuple[bytes, bytes]:
+        """
+        Returns the request and the bytes to send for it (with the number of responses if it is given or known).
+        """
+        if isinstance(cmd, str):
+            cmd = bytes(cmd, 'ASCII')
+
+        count = responses
+        if count is None and self._protocol is not None and self._counted(cmd):
+            count = self.response_counts.get((self._protocol, self._header), {}).get(cmd)
+            if count is not None:
+                key = (self._protocol, self._header, cmd)
+                uses = self._count_uses.get(key, 0) + 1
+                if uses >= self.COUNT_CHECK:
+                    # an ECU slow to answer when the count was learned, or answering again, is missed until then
+                    uses, count = 0, None
+                self._count_uses[key] = uses
+        if count is not None and count <= 0xF and (self.version_major, self.version_minor) >= (1, 3):
+            return cmd, cmd + b'%X' % count
+        return cmd, cmd
+
+    def _parse_request(self, cmd: bytes, sent: bytes, data: bytes, learn: bool = True) -> List[bytes]:
+        """
+        Returns the lines of the answer to a request, without echo and status lines, and learns their number (if
+        learn).
+        """
+        lines = data.split(self._suffix)
+
+        if lines and lines[0] == sent:  # echo
+            lines = lines[1:]
+        if self.metrics is not None:
+            self._count_answers(lines)
+        lines = [line for line in lines if line and line not in _STATUS_LINES]
+
+        for line in lines:
+            if line == b'NO DATA':
+                raise NoDataError(f"No data answered to {cmd}")
+            if line in _ERROR_LINES or line.startswith(b'ERR'):
+                raise ELM327Error(f"Error answered to {cmd}: {line.decode('ascii', 'ignore')}")
+        if not lines:
+            raise ELM327Error(f"No answer to {cmd}")
+
+        if learn and self._protocol is not None and self._counted(cmd):
+            self._learn(cmd, sent, lines)
+
+        return lines
+
+    def _learn(self, cmd: bytes, sent: bytes, lines: List[bytes]):
+        """
+        Learns the number of lines answered to a request sent without it. A learned number is dropped when fewer lines
+        are received with it (the adapter waited for its timeout).
+        """
+        counts = self.response_counts.setdefault((self._protocol, self._header), {})
+        # the length lines of CAN multi-frame messages are not received lines
+        count = sum(1 for line in lines if len(line) != 3)
+        if sent == cmd:
+            if count <= 0xF:
+                counts[cmd] = count
+            else:
+                counts.pop(cmd, None)
+        elif counts.get(cmd) == int(sent[len(cmd):], 16) and count < counts[cmd]:
+            self.logger.debug("%s answered by %s lines instead of %s, learned again", cmd, count, counts[cmd])
+            del counts[cmd]
+
+    def _count_answers(self, lines: List[bytes]):
+        for line in lines:
+            if line in _STATUS_LINES or line in _ERROR_LINES or line.startswith(b'ERR'):
+                self.metrics.answer(line.decode('ascii', 'ignore'))
+
+    def _parse_query(self, mode: int, pid: int, lines: List[bytes]) -> bytes:
+        data = self._messages(lines)[0]
+        if data[0] != mode + 0x40 or data[1] != pid:
+            raise ELM327Error(f"Unexpected answer to {mode:02X} {pid:02X}: {data.hex()}")
+        return data[2:]
+
+    def _parse_dtcs(self, mode: int, lines: List[bytes], protocol: int) -> List[List[Tuple[str, str]]]:
+        """
+        Codes and descriptions of the DTC answered to a Mode 03, 07 or 0A request, for each ECU.
+        """
+        ecus = []
+        for message in self._messages(lines):
+            if not message or message[0] != mode + 0x40:
+                raise ELM327Error(f"Unexpected answer to {mode:02X}: {message.hex()}")
+            if protocol in self.CAN_PROTOCOLS:
+                # one message per ECU, starting with the number of DTC
+                ecus.append(unpack_dtcs(message[2:2 + 2 * message[1]]))
+            else:
+                # messages of 3 DTC (padded with 0000), that cannot be told apart without the headers
+                if not ecus:
+                    ecus.append([])
+                ecus[0] += unpack_dtcs(message[1:])
+        return [OBDErrorCodes.decode(raws) for raws in ecus]
+
+    def _pack_pids(self, pids: List[int]) -> Tuple[List[bytes], List[int]]:
+        """
+        Packs Mode 01 PIDs by 6 in multi-PID requests. Returns the requests and the PIDs to request one by one.
+        """
+        # PIDs whose size is unknown cannot be split from a combined answer
+        single = [pid for pid in pids if pid not in MODE01_PID_SIZES]
+        packed = [pid for pid in pids if pid in MODE01_PID_SIZES]
+        requests = []
+        for i in range(0, len(packed), self.MAX_PIDS_PER_REQUEST):
+            chunk = packed[i:i + self.MAX_PIDS_PER_REQUEST]
+            if len(chunk) == 1:
+                single += chunk
+            else:
+                requests.append(b'01' + b''.join(b'%02X' % pid for pid in chunk))
+        return requests, single
+
+    def _messages(self, lines: List[bytes]) -> List[bytes]:
+        """
+        Converts the lines of an answer into the messages they contain (multi-frame messages are reassembled).
+        """
+        return [message for _, message in self._ecu_messages(lines)]
+
+    def _ecu_messages(self, lines: List[bytes]) -> List[Tuple[Optional[int], bytes]]:
+        """
+        Messages of an answer with the CAN ID of the ECU sending each one (None when the headers are off)
+        """
+        # the frames of the other protocols cannot be parsed with the headers on
+        can = self._protocol is None or self._protocol in self.CAN_PROTOCOLS
+        try:
+            return reassemble(lines, can and self._state.get(b'H') == b'1', not can or self._state.get(b'CAF') != b'0')
+        except ISOTPError as e:
+            raise ELM327Error(f"Bad answer: {e}") from e
+
+    @staticmethod
+    def _split_pids(data: bytes) -> Dict[int, bytes]:
+        """
+        Splits the answer to a multi-PID Mode 01 request into the data of each PID.
+        """
+        if data[0] != 0x41:
+            raise ELM327Error(f"Unexpected answer to a multi-PID request: {data.hex()}")
+        ret = {}
+        i = 1
+        while i < len(data):
+            pid = data[i]
+            if pid not in MODE01_PID_SIZES:
+                raise ELM327Error(f"Unexpected PID {pid:02X} in multi-PID answer: {data.hex()}")
+            size = MODE01_PID_SIZES[pid]
+            ret[pid] = data[i + 1:i + 1 + size]
+            i += 1 + size
+        return ret
+
+    def _parse_vin(self, lines: List[bytes]) -> Optional[str]:
+        """
+        VIN answered to a Mode 09 PID 02 request
+        """
+        messages = [m for m in self._messages(lines) if m[:2] == b'\x49\x02']
+        if not messages:
+            raise ELM327Error(f"Unexpected answer to 0902: {lines}")
+        if len(messages[0]) > 7:  # CAN: a single message with the number of data items, then the VIN
+            data = messages[0][3:]
+        else:  # other protocols: messages of 4 bytes numbered by their third byte
+            data = b''.join(m[3:] for m in sorted(messages, key=lambda m: m[2]))
+        return data.lstrip(b'\x00').decode('ascii', 'replace') or None
+
+    @staticmethod
+    def _parse_info(pid: int, messages: List[Tuple[Optional[int], bytes]]) -> List[Tuple[Optional[int], bytes]]:
+        """
+        Data of each ECU answering a Mode 09 request
+        """
+        return [(ecu, m[2:]) for ecu, m in messages if m[:2] == bytes((0x49, pid))]
+
+    @staticmethod
+    def _parse_uds(request: bytes, messages: List[bytes]) -> bytes:
+        """
+        Positive response to a UDS request (the 'response pending' answers are skipped)
+        """
+        messages = [m for m in messages if m[:3] != b'\x7F' + request[:1] + b'\x78']
+        if not messages:
+            raise ELM327Error(f"No answer to {request.hex().upper()}")
+        nrc = negative_response(messages[0])
+        if nrc is not None:
+            raise ELM327Error(f"Negative response to {request.hex().upper()}: {nrc}")
+        if messages[0][:1] != bytes((request[0] + 0x40,)):
+            raise ELM327Error(f"Unexpected answer to {request.hex().upper()}: {messages[0].hex()}")
+        return messages[0]
+
+    def _parse_did(self, did: int, messages: List[bytes]) -> bytes:
+        """
+        Data answered to a UDS ReadDataByIdentifier (22) request
+        """
+        request = b'\x22' + did.to_bytes(2, 'big')
+        message = self._parse_uds(request, messages)
+        if message[1:3] != request[1:]:
+            raise ELM327Error(f"Unexpected answer to 22{did:04X}: {message.hex()}")
+        return message[3:]
+
+    @staticmethod
+    def _bitmap_pids(base: int, bitmap: bytes) -> List[int]:
+        """
+        PIDs marked as supported in the answer to a "supported PIDs" request (PID base)
+        """
+        value = int.from_bytes(bitmap[:4], 'big')
+        return [base + i + 1 for i in range(32) if value & (1 << (31 - i))]
+
+    def _capabilities(self) -> dict:
+        """
+        Vehicle capabilities learned, as stored in a CapabilityCache
+        """
+        return {
+            'protocol': self._protocol,
+            'pid_bitmaps': {'%02X' % base: bitmap.hex() for base, bitmap in self.pid_bitmaps.items()},
+            'response_counts': [[protocol, header.decode('ascii') if header else None,
+                                 {cmd.decode('ascii'): count for cmd, count in counts.items()}]
+                                for (protocol, header), counts in self.response_counts.items()],
+        }
+
+    def _restore_capabilities(self, vehicle: dict):
+        self._protocol = vehicle.get('protocol')
+        self.pid_bitmaps = {int(base, 16): bytes.fromhex(bitmap)
+                            for base, bitmap in vehicle.get('pid_bitmaps', {}).items()}
+        for protocol, header, counts in vehicle.get('response_counts', []):
+            if protocol is None:  # learned before the protocol was known
+                continue
+            key = (protocol, header.encode('ascii') if header is not None else None)
+            self.response_counts.setdefault(key, {}).update(
+                {cmd.encode('ascii'): count for cmd, count in counts.items()})
+
+    def _check_brd(self, rep: bytes, value):
+        """
+        Checks the first answer line to AT BRD (after the echo, if any)
+        """
+        if rep == b'?' + self._suffix:
+            raise ELM327Error(f"This ELM327 does not support the baudrate changing command (it is too old)")
+        if rep != b'OK' + self._suffix:
+            raise ConnectionError(f"Problem when testing the new baudrate ({value[1]})")
+
+    def _strip(self, data: Union[bytes, memoryview]) -> bytes:
+        """
+        Deletes the suffix and the prompt at the end of a received answer.
+        """
+        # define the suffix if its the first time a answer is got, or if the linefeeds setting changed (AT L)
+        if self._suffix is None or data[-len(self._suffix) - 1:] != self._suffix + b'>':
+            if data[-5:] == b'\r\n\r\n>':
+                self._suffix = b'\r\n'
+            elif data[-3:] == b'\r\r>':
+                self._suffix = b'\r'
+            else:
+                raise ELM327Error(r"Suffix not recognized ('\r\n\r\n' and '\r\r' tested)")
+
+        end = len(self._suffix) + 1
+        return bytes(data[:-(end + len(self._suffix))])
+
+    def _last_line(self, data: bytes) -> bytes:
+        return data[data.rfind(self._suffix) + len(self._suffix):] if self._suffix in data else data
+
+
+class ELM327(ELM327Base):
+    """
+    Driver of the ELM327 Interface product.
+    """
+
+    @property
+    def protocol(self) -> int:
+        """
+        Number of the OBD protocol in use (0 if it is not determined yet)
+        """
+        if self._protocol is None:
+            return self._parse_protocol(self.send_command(b'AT DPN'))
+        return self._protocol
+
+    @property
+    def multi_pid(self) -> bool:
+        """
+        True if several PIDs can be requested in a single message (needs ELM327 v1.3+ and a CAN protocol)
+        """
+        return self._supports_multi_pid(self.protocol)
+
+    @property
+    def _serial(self) -> bool:
+        """
+        True if the connection is a serial link whose baudrate can be changed (USBSerial, ELM327Simulator)
+        """
+        return hasattr(self._conn, 'baudrate') and hasattr(self._conn, 'timeout')
 
     @property
     def baudrate(self):
-        if not isinstance(self._conn, USBSerial):
-            return self._baudrate
+        if not self._serial:
+            raise AttributeError(f"No baudrate defined when connection is {type(self._conn)} (serial link needed)")
 
-        raise AttributeError(f"No baudrate defined when connection is {type(self._conn)} (USBSerial needed)")
+        return self._baudrate
 
     @baudrate.setter
     def baudrate(self, value):
-        if not isinstance(self._conn, USBSerial):
-            raise AttributeError(f"No baudrate defined when connection is {type(self._conn)} (USBSerial needed)")
+        if not self._serial:
+            raise AttributeError(f"No baudrate defined when connection is {type(self._conn)} (serial link needed)")
 
-        if value not in (self.BAUD9_6K, self.BAUD19_2K, self.BAUD38_4K, self.BAUD57_6K,
-                         self.BAUD115_2K, self.BAUD230_4K, self.BAUD500K):
-            raise ValueError(f"Baudrate must be one of the BAUDxxK constants")
+        self._check_baudrate(value)
 
-        self._conn.write(b'AT BRD ' + value[0] + self._suffix)
+        old = self._conn.baudrate
+        timeout = self._conn.timeout
+        self._conn.timeout = self.BAUDRATE_TIMEOUT
+        try:
+            self._change_baudrate(value)
+        except ConnectionError:
+            # the adapter goes back to the previous baudrate by itself when the handshake fails
+            self._resync((old, value[1]))
+            raise
+        finally:
+            self._conn.timeout = timeout
 
-        # time.sleep(0.03)
-        # rep = self._conn.read_all().split(self._suffix)
-        rep = self._conn.read_until(self._suffix)
-        rep += self._conn.read_until(self._suffix)
-        rep = rep.split(self._suffix)
-        if rep[1] == b'?':
-            raise ELM327Error(f"This ELM327 does not support the baudrate changing command (it is too old)")
-        if not rep[1] == b'OK':
-            raise ConnectionError(f"Problem when testing the new baudrate ({value[1]})")
+        self._baudrate = value[1]
+        self.logger.info("Baudrate set to %s (not permanent)", value[1])
+
+    def _change_baudrate(self, value):
+        """
+        Baudrate change handshake (AT BRD)
+        """
+        cmd = b'AT BRD ' + value[0]
+        self._write(cmd + self._suffix)
+
+        rep = bytes(self._reader.read_until(self._suffix))
+        if rep == cmd + self._suffix:  # echo
+            rep = bytes(self._reader.read_until(self._suffix))
+        try:
+            self._check_brd(rep, value)
+        except ELM327Error:
+            self._read()
+            raise
 
         self._conn.baudrate = value[1]
 
-        rep = self._conn.read_until(self._suffix)
-        if not rep.endswith(self._ati + self._suffix):
+        rep = self._reader.read_until(self._suffix)
+        if not bytes(rep).endswith(self._ati + self._suffix):
             raise ConnectionError(f"Problem when testing the new baudrate ({value[1]})")
 
-        self._conn.write(b'\r')
+        self._write(b'\r')
 
-        rep = self._conn.read(2)
+        rep = self._reader.read(2)
         if not rep == b'OK':
             raise ConnectionError(f"Problem when testing the new baudrate ({value[1]})")
 
         self._read()
 
-        self.logger.info(f"Baudrate set to {value[1]} (not permanent)")
+    def _resync(self, rates: Iterable[int]):
+        """
+        Finds which of the given baudrates the adapter uses after a failed baudrate change.
+        """
+        for rate in rates:
+            self._conn.baudrate = rate
+            time.sleep(self.BAUDRATE_TIMEOUT)
+            self._reader.read_all()
+            if self._probe(1)[0] == 0:
+                self._baudrate = rate
+                self.logger.warning("Baudrate back to %s", rate)
+                return
+        raise ConnectionError("Communication with the adapter lost after a baudrate change")
 
-    def __init__(self, connection):
-        self.logger = logging.getLogger('MCL.ELM327')
+    def _probe(self, count: int) -> Tuple[int, float]:
+        """
+        Sends AT I several times. Returns the number of bad answers and the throughput (received bytes per second).
+        """
+        expected = self._ati + self._suffix * 2 + b'>'
+        timeout = self._conn.timeout
+        self._conn.timeout = self.BAUDRATE_TIMEOUT
+        errors = 0
+        received = 0
+        start = time.perf_counter()
+        try:
+            for _ in range(count):
+                self._write(b'AT I' + self._suffix)
+                rep = self._reader.read_until(b'>')
+                received += len(rep)
+                if rep[-len(expected):] != expected:
+                    errors += 1
+                    time.sleep(self.BAUDRATE_TIMEOUT)
+                    self._reader.read_all()
+        finally:
+            self._conn.timeout = timeout
+        return errors, received / (time.perf_counter() - start)
 
-        self._ati = None
-        self.version_major: int = -1
-        self.version_minor: int = -1
+    def negotiate_baudrate(self, probes: int = 20, force: bool = False) -> Tuple[bytes, int]:
+        """
+        Steps up through the baudrates and settles on the fastest one at which probes (AT I) are answered without
+        error. The result is remembered for the adapter and applied directly next time (unless force is True).
+        Returns the chosen baudrate constant.
+        """
+        key = self._baudrate_key
+        known = self.negotiated_baudrates.get(key)
+        if known is not None and not force:
+            if known[1] != self.baudrate:
+                self.baudrate = known
+            return known
 
-        self._baudrate = 38400
-        self._suffix = None
+        good = next((b for b in self.BAUDRATES if b[1] == self.baudrate), self.BAUD38_4K)
+        for candidate in self.BAUDRATES:
+            if candidate[1] <= good[1]:
+                continue
+
+            try:
+                self.baudrate = candidate
+            except (ConnectionError, ELM327Error) as e:
+                self.logger.info("Baudrate %s refused: %s", candidate[1], e)
+                break
+
+            errors, throughput = self._probe(probes)
+            self.logger.info("Baudrate %s: %s/%s errors, %.0f B/s", candidate[1], errors, probes, throughput)
+            if errors:
+                self.baudrate = good
+                break
+            good = candidate
+
+        self.negotiated_baudrates[key] = good
+        self.logger.info("Negotiated baudrate: %s", good[1])
+        self.save_capabilities()
+        return good
+
+    def __init__(self, connection, name: Optional[str] = None, registry: Registry = REGISTRY,
+                 cache: Optional[CapabilityCache] = None, warm: bool = False,
+                 settings: Optional[Dict[bytes, bytes]] = None):
+        """
+        The metrics of the adapter are labelled by its name (by default, the name of the connection).
+        The given AT settings (e.g. THROUGHPUT_PROFILE) are applied at connection.
+        With a cache, the capabilities of the adapter and of the vehicle are loaded from it at connection, or
+        discovered and stored in it (see connect()).
+        With warm, an adapter still running is reused as it is (see warm_connect()), else it is reset.
+        """
+        super().__init__()
 
         self._conn: AbstractConnection = connection
-        self.connect()
+        self.metrics = AdapterMetrics(name or connection.name, registry)
+        self.cache = cache
+        self.settings = dict(settings or {})
+        self._reader = FrameReader(connection, metrics=self.metrics)
+        if warm:
+            self.warm_connect()
+        else:
+            self.connect()
 
     def connect(self):
+        """
+        Resets the adapter. With a cache, the known baudrate is set back, and the vehicle is checked by its VIN on the
+        known protocol (tried first, without search): if it is the same vehicle its protocol, supported PIDs and
+        response counts are reused, else they are discovered and stored.
+        """
         self._conn.flush()
+        self._reader.clear()
         self.reset()
+        self._apply_settings()
+        self._load_cache()
+
+    def warm_connect(self) -> bool:
+        """
+        Connects to an adapter that may still be running (e.g. after a restart of the program) without resetting it:
+        the adapter is looked for at the current, known and default baudrates (AT I), its protocol is kept (AT DPN),
+        and only the settings that differ from the wanted ones are sent. When the adapter does not answer, or answers
+        strangely, it is reset (connect()).
+        Returns True if the adapter was running.
+        """
+        self._conn.flush()
+        self._reader.clear()
+        if not self._find_adapter():
+            self.logger.info("No running adapter found, reset")
+            self.connect()
+            return False
+
+        try:
+            protocol = self._parse_protocol(self.send_command(b'AT DPN'))
+            if protocol:
+                # the format of an answer tells the spaces and headers settings
+                self._observe_format(self.send_request(b'0100'))
+        except (ELM327Error, ValueError) as e:
+            self.logger.info("Adapter in an unknown state (%s), warm start", e)
+            self.send_command(b'AT WS')
+        self._apply_settings()
+        self._load_cache()
+        return True
+
+    def _find_adapter(self) -> bool:
+        """
+        Looks for a running adapter, trying the possible baudrates. Learns its AT I string, echo and linefeeds.
+        """
+        rates = [None]
+        if self._serial:
+            adapter = self._conn.serial_number or self._conn.name
+            known = [b[1] for (_, a), b in self.negotiated_baudrates.items() if a == adapter]
+            if self.cache is not None:
+                known += self.cache.baudrates(self._conn.serial_number)
+            rates = list(dict.fromkeys([self._conn.baudrate] + known + [self.DEFAULT_BAUDRATE] +
+                                       sorted((b[1] for b in self.BAUDRATES), reverse=True)))
+            timeout = self._conn.timeout
+            self._conn.timeout = self.PROBE_TIMEOUT
+        try:
+            for rate in rates:
+                if rate is not None:
+                    self._conn.baudrate = self._baudrate = rate
+                # the first characters stop a command still running, the second try gets a clean answer
+                for _ in range(2):
+                    self._write(b'AT I\r')
+                    data = bytes(self._reader.read_until(b'>'))
+                    if data.endswith(b'>') and b'ELM327 v' in data:
+                        break
+                else:
+                    self._reader.read_all()
+                    continue
+
+                self._suffix = None
+                lines = self._strip(data).split(self._suffix)
+                self._state = {b'E': b'1' if lines[0] == b'AT I' else b'0'}
+                self._parse_ati(lines[-1])
+                self.logger.info("Running adapter found at %s bauds", rate)
+                return True
+        finally:
+            if self._serial:
+                self._conn.timeout = timeout
+        return False
+
+    def _apply_settings(self):
+        for cmd in self._settings_to_apply():
+            self.send_command(cmd)
+
+    def tune_timeout(self, probes: int = 10, margin: float = 2.0, minimum: float = 0.02) -> Optional[float]:
+        """
+        Measures the time taken by the vehicle to answer (Mode 01 PID 00 requests, returning at the first answer) and
+        sets the timeout (AT ST) to a margin over the longest one, so that the requests left unanswered do not wait
+        longer than needed. The timeout is kept in the settings applied at connection.
+        Returns the timeout set in seconds (None if the adapter cannot return at the first answer, before v1.3).
+        """
+        if (self.version_major, self.version_minor) < (1, 3):
+            return None
+        longest = 0.0
+        for _ in range(probes):
+            start = time.perf_counter()
+            self._write(b'01001' + (self._suffix or b'\r\n'))
+            self._read()
+            longest = max(longest, time.perf_counter() - start)
+        value = min(0xFF, max(1, math.ceil(max(longest * margin, minimum) / 0.004)))  # by 4 ms
+        self.settings[b'ST'] = b'%02X' % value
+        self._apply_settings()
+        self.logger.info("Timeout set to %s ms", value * 4)
+        return value * 0.004
+
+    def _load_cache(self):
+        if self.cache is not None:
+            try:
+                self._load_capabilities()
+            except ELM327Error as e:
+                self.logger.warning("Vehicle capabilities not found: %s", e)
+
+    @property
+    def _baudrate_key(self) -> Tuple[bytes, str]:
+        # identical adapters are told apart by the serial number of their USB port, else by their port
+        return self._ati, self._conn.serial_number or self._conn.name
+
+    @property
+    def _cache_key(self) -> str:
+        return self.cache.key(self._ati, self._conn.serial_number)
+
+    def _load_capabilities(self):
+        entry = self.cache.adapter(self._cache_key)
+        if entry.get('suffix', self._suffix.decode('ascii')) != self._suffix.decode('ascii'):
+            self.logger.info("Adapter settings changed, cache entry dropped")
+            entry = {}
+
+        if entry.get('baudrate') is not None:
+            code, rate = entry['baudrate']
+            key = self._baudrate_key
+            self.negotiated_baudrates[key] = (code.encode('ascii'), rate)
+            if self._serial:
+                try:
+                    self.negotiate_baudrate()
+                except (ConnectionError, ELM327Error) as e:
+                    # e.g. another adapter with the same AT I string and serial number, or a slower USB port: the
+                    # adapter is back at its previous baudrate (raises if not), the known baudrate is forgotten
+                    self.logger.warning("Known baudrate %s not usable, dropped from the cache: %s", rate, e)
+                    self.negotiated_baudrates.pop(key, None)
+                    del entry['baudrate']
+                    self.cache.store(self._cache_key, entry)
+                    if self._probe(1)[0]:
+                        raise ConnectionError("Communication with the adapter lost after a baudrate change") from e
+
+        vehicle = entry.get('vehicles', {}).get(entry.get('vin'))
+        if vehicle is not None and vehicle.get('protocol'):
+            if self._protocol != vehicle['protocol']:
+                # tried first, then searched (AT TP does not change the protocol stored in the adapter, unlike AT SP)
+                self.send_command(b'AT TP A%X' % vehicle['protocol'])
+            # else kept running by a warm connection: AT TP would close the session (a new init on ISO 9141/KWP)
+            try:
+                vin = self.read_vin() or ''
+            except ELM327Error:
+                vin = None
+            if vin == entry['vin']:
+                self.vin = vin or None
+                self._restore_capabilities(vehicle)
+                self.logger.info("Vehicle %s known (protocol %s)", vin, self._protocol)
+                return
+            self.logger.info("Vehicle changed (VIN %s), discovering its capabilities", vin)
+        self.discover()
+
+    def discover(self):
+        """
+        Finds the VIN, protocol and supported PIDs of the vehicle, and stores them in the cache (if any).
+        """
+        self.pid_bitmaps = {}
+        self.response_counts.clear()
+        self._count_uses.clear()
+        self.vin = self.read_vin()  # the first request triggers the protocol search
+        self.logger.info("Vehicle %s on protocol %s", self.vin, self.protocol)
+        self.supported_pids()
+        self.save_capabilities()
+
+    def save_capabilities(self):
+        """
+        Stores what was learned about the adapter and the vehicle (e.g. the response counts, after polling) in the
+        cache.
+        """
+        if self.cache is None:
+            return
+        key = self._cache_key
+        entry = self.cache.adapter(key)
+        entry['suffix'] = self._suffix.decode('ascii')
+        baudrate = self.negotiated_baudrates.get(self._baudrate_key)
+        if baudrate is not None:
+            entry['baudrate'] = [baudrate[0].decode('ascii'), baudrate[1]]
+        entry['vin'] = self.vin or ''
+        entry.setdefault('vehicles', {})[entry['vin']] = self._capabilities()
+        self.cache.store(key, entry)
 
     def reset(self):
-        self.logger.info(f"reset")
-        ver = self.send_command(b'AT Z')
-        self._ati = ver
-        ver = ver.decode('ascii', 'ignore')
-        if not ver.startswith("ELM327"):
-            raise ConnectionError(f"Bad reset message received: {ver}")
-        else:
-            self.version_major, self.version_minor = (int(v) for v in ver[8:].split('.'))
-            self.logger.info(f"AT I string: {self._ati}")
-            self.logger.info(f"version: {self.version_major}.{self.version_minor}")
+        self.logger.info("reset")
+        cmd = b'AT Z'
+        self._write(cmd + (self._suffix or b'\r\n'))
+        if self._serial and self._baudrate != self.DEFAULT_BAUDRATE:
+            # the adapter answers at its default baudrate
+            self._conn.baudrate = self._baudrate = self.DEFAULT_BAUDRATE
+        ver = self._last_line(self._read())
+        self._track(cmd)
+        self._parse_ati(ver)
 
     def send_command(self, cmd: Union[bytes, str]):
-        if isinstance(cmd, str):
-            cmd = bytes(cmd, 'ASCII')
+        cmd = self._command(cmd)
 
-        if not cmd.startswith(b'AT'):
-            cmd = b'AT ' + cmd
+        start, wait = time.perf_counter(), self.metrics.wait_seconds.value
+        self._write(cmd + (self._suffix or b'\r\n'))
+        ret = self._last_line(self._read())
+        self._track(cmd)
+        if ret == b'?':
+            self.metrics.answer('?')
+        self.metrics.command('at', time.perf_counter() - start, self.metrics.wait_seconds.value - wait)
+        return ret
 
-        self._conn.write(cmd + (self._suffix or b'\r\n'))
-        return self._read().split(self._suffix)[-1]
+    def send_request(self, cmd: Union[bytes, str], responses: Optional[int] = None, learn: bool = True) -> List[bytes]:
+        """
+        Sends an OBD request (not an AT command) and returns the lines of the answer, without echo and status lines.
 
-    def _read(self):
-        data = self._conn.read_until(b'>')
+        The number of lines answered to each request is learned (unless learn is False), then sent with the next
+        identical requests (ELM327 v1.3+) so that the adapter returns as soon as they are received instead of waiting
+        for its timeout. It can also be given (responses, 15 at most).
+        """
+        cmd, sent = self._prepare_request(cmd, responses)
 
-        # define the suffix if its the first time a answer is got
-        if self._suffix is None:
-            if data.endswith(b'\r\n\r\n>'):
-                self._suffix = b'\r\n'
-            elif data.endswith(b'\r\r>'):
-                self._suffix = b'\r'
-            else:
-                raise ELM327Error(r"Suffix not recognized ('\r\n\r\n' and '\r\r' tested)")
+        start, wait = time.perf_counter(), self.metrics.wait_seconds.value
+        self._write(sent + (self._suffix or b'\r\n'))
+        try:
+            lines = self._parse_request(cmd, sent, self._read(), learn)
+        finally:
+            self.metrics.command('obd', time.perf_counter() - start, self.metrics.wait_seconds.value - wait)
+        if learn and self._protocol is None and self._counted(cmd) and self.protocol:
+            # the protocol is found by the first request: its number of lines is learned for it
+            self._learn(cmd, sent, lines)
+        return lines
+
+    def query(self, mode: int, pid: int) -> bytes:
+        """
+        Requests a PID of the given mode and returns its data bytes (as answered by the first ECU).
+        """
+        return self._parse_query(mode, pid, self.send_request(b'%02X%02X' % (mode, pid)))
+
+    def query_pids(self, pids: Iterable[int]) -> Dict[int, bytes]:
+        """
+        Requests several Mode 01 PIDs and returns the data bytes of each PID answered (by the first ECU).
+        The PIDs are packed by 6 in multi-PID requests when possible, else they are requested one by one.
+        """
+        pids = list(dict.fromkeys(pids))
+        ret = {}
+
+        if len(pids) > 1 and self.multi_pid:
+            requests, single = self._pack_pids(pids)
+            for request in requests:
+                try:
+                    ret.update(self._split_pids(self._messages(self.send_request(request))[0]))
+                except ELM327Error as e:
+                    self.logger.debug("Request %s failed: %s", request, e)
+        else:
+            single = pids
+
+        for pid in single:
+            try:
+                ret[pid] = self.query(0x01, pid)
+            except ELM327Error as e:
+                self.logger.debug("PID %02X failed: %s", pid, e)
+
+        return ret
+
+    def read_vin(self) -> Optional[str]:
+        """
+        Vehicle identification number (Mode 09 PID 02), None if the vehicle does not give it
+        """
+        try:
+            return self._parse_vin(self.send_request(b'0902'))
+        except NoDataError:
+            return None
+
+    def request_messages(self, cmd: Union[bytes, str]) -> List[Tuple[Optional[int], bytes]]:
+        """
+        Sends a request and returns the messages answered (multi-frame ones reassembled), with the CAN ID of the ECU
+        sending each one (None when the headers are off).
+        """
+        return self._ecu_messages(self.send_request(cmd))
+
+    def read_vehicle_info(self, pid: int) -> List[Tuple[Optional[int], bytes]]:
+        """
+        Vehicle information of a Mode 09 PID (02 VIN, 04 calibration IDs, 06 CVN, 0A ECU name...) answered by each
+        ECU, with its CAN ID (None when the headers are off). On CAN, the data starts with the number of items.
+        """
+        try:
+            return self._parse_info(pid, self.request_messages(b'09%02X' % pid))
+        except NoDataError:
+            return []
+
+    def read_did(self, did: int) -> bytes:
+        """
+        Reads a data identifier (UDS ReadDataByIdentifier) of the ECU the requests are sent to (see AT SH).
+        """
+        return self._parse_did(did, self._messages(self.send_request(b'22%04X' % did)))
+
+    def read_dids(self, dids: Iterable[int]) -> Dict[int, bytes]:
+        """
+        Reads several data identifiers. The ones refused or not answered are left out.
+        """
+        ret = {}
+        for did in dids:
+            try:
+                ret[did] = self.read_did(did)
+            except ELM327Error as e:
+                self.logger.debug("DID %04X failed: %s", did, e)
+        return ret
+
+    def set_header(self, can_id: int):
+        """
+        Sets the CAN ID of the frames sent (AT SH, with AT CP for the priority of 29 bits IDs).
+        """
+        if can_id > 0x7FF:
+            self._configure(b'AT CP %02X' % (can_id >> 24))
+            self._configure(b'AT SH %06X' % (can_id & 0xFFFFFF))
+        else:
+            self._configure(b'AT SH %03X' % can_id)
+
+    def set_receive_address(self, can_id: Optional[int] = None):
+        """
+        Only receives the frames of the given CAN ID (AT CRA), or goes back to the automatic filters if None.
+        """
+        if can_id is None:
+            self._configure(b'AT CRA')
+        else:
+            self._configure(b'AT CRA %0*X' % (8 if can_id > 0x7FF else 3, can_id))
+
+    def set_flow_control(self, block_size: Optional[int] = 0, st_min: int = 0, header: Optional[int] = None):
+        """
+        Sets the flow control frames sent by the adapter when an ECU sends a multi-frame message: the number of
+        consecutive frames sent by the ECU before waiting for the next flow control (0: none) and the separation time
+        between them (STmin, 0 for the bus speed), with the CAN ID header (by default, the one chosen by the adapter).
+        With block_size None, the flow control of the adapter is set back (AT FC SM 0).
+        """
+        if block_size is None:
+            self._configure(b'AT FC SM 0')
+            return
+        if header is not None:
+            self._configure(b'AT FC SH %0*X' % (8 if header > 0x7FF else 3, header))
+        self._configure(b'AT FC SD 30 %02X %02X' % (block_size, st_min))
+        self._configure(b'AT FC SM %d' % (2 if header is None else 1))
 
-        assert data.endswith(self._suffix + b'>')
-        data = data[:-(len(self._suffix) * 2 + 1)]  # delete the suffix at the end of received answer
+    def send_frame(self, frame: bytes, responses: Optional[int] = None) -> List[Tuple[Optional[int], bytes]]:
+        """
+        Sends a raw CAN frame (PCI byte included, the CAN auto-formatting is turned off) and returns the frames
+        answered, with the CAN ID of the ECU sending each one (None when the headers are off).
+        responses is the number of frames answered, if known (the adapter then returns without waiting).
+        """
+        with self._raw_mode() as headers:
+            try:
+                return [parse_line(line, headers) for line in self._send_raw(frame, responses)]
+            except ISOTPError as e:
+                raise ELM327Error(f"Bad answer: {e}") from e
 
-        return data
+    def send_message(self, payload: bytes, responses: Optional[int] = None) -> List[Tuple[Optional[int], bytes]]:
+        """
+        Sends an ISO-TP message of any size to the ECU the frames are sent to (see set_header), and returns the
+        messages answered, with the CAN ID of the ECU sending each one (None when the headers are off).
+        The message is segmented here (the adapter only sends single frames, the CAN auto-formatting is turned off).
+        The consecutive frames that are not answered are sent back-to-back, the adapter not waiting for answers
+        (AT R0), as fast as the flow control of the ECU allows. responses is the number of frames of the answer, if
+        known.
+        """
+        frames = segment(payload)
+        with self._raw_mode() as headers:
+            try:
+                try:
+                    return self._send_frames(frames, responses, headers, not self._fc_waits)
+                except _FlowControlWait:
+                    # the adapter returned at the WAIT frame, the message is sent again with the adapter listening for
+                    # the next flow control frames until its timeout
+                    self.logger.info("The ECU asks to wait, flow control frames now awaited until the timeout")
+                    self._fc_waits = True
+                    return self._send_frames(frames, responses, headers, False)
+            except ISOTPError as e:
+                raise ELM327Error(f"Bad answer: {e}") from e
+
+    def _send_frames(self, frames: List[bytes], responses: Optional[int], headers: bool,
+                     counted: bool) -> List[Tuple[Optional[int], bytes]]:
+        """
+        Sends the frames of a segmented message. With counted, the adapter returns at the first flow control frame.
+        """
+        last = len(frames) - 1
+        if last:
+            fc_responses = 1 if counted else None
+            lines = self._send_raw(frames[0], fc_responses)
+            sent = 1
+            while True:
+                block_size, st_min = self._flow_control(lines, headers, counted)
+                # frame answered by the next flow control, or by the answer to the message
+                answered = last if not block_size else min(last, sent + block_size - 1)
+                if answered > sent:
+                    self._configure(b'AT R0')
+                    try:
+                        for frame in frames[sent:answered]:
+                            self._send_unanswered(frame)
+                            if st_min:
+                                time.sleep(st_min)
+                    finally:
+                        self._configure(b'AT R1')
+                if answered == last:
+                    break
+                lines = self._send_raw(frames[answered], fc_responses)
+                sent = answered + 1
+        return reassemble(self._send_raw(frames[last], responses), headers, False)
+
+    def uds(self, request: bytes, responses: Optional[int] = None) -> bytes:
+        """
+        Sends a UDS request to the ECU the frames are sent to (see send_message), and returns its positive response.
+        An ELM327Error is raised on a negative response.
+        """
+        return self._parse_uds(request, [message for _, message in self.send_message(request, responses)])
+
+    def upload(self, address: int, size: int, address_size: int = 4, length_size: int = 4) -> bytes:
+        """
+        Reads a memory region of the ECU the frames are sent to (UDS RequestUpload, TransferData blocks and
+        RequestTransferExit). The diagnostic session and the security access must be set up before.
+
+        The blocks are requested back-to-back. The adapter is given the number of frames of each block when it can (15
+        at most), so that it returns as soon as the block is received. The ECU sends the frames of a block as the flow
+        control of the adapter allows (by default, without block size nor separation time: at the bus speed, see
+        set_flow_control).
+        """
+        with self._raw_mode():
+            return self._upload(address, size, address_size, length_size)
+
+    def _upload(self, address: int, size: int, address_size: int, length_size: int) -> bytes:
+        request = bytes((0x35, 0x00, (length_size << 4) | address_size)) + \
+            address.to_bytes(address_size, 'big') + size.to_bytes(length_size, 'big')
+        answer = self.uds(request)
+        max_block = int.from_bytes(answer[2:2 + (answer[1] >> 4)], 'big')  # service and counter included
+        if max_block <= 2:
+            raise ELM327Error(f"Unexpected answer to RequestUpload: {answer.hex()}")
+
+        data = bytearray(size)
+        received = 0
+        counter = 1
+        start = time.perf_counter()
+        while received < size:
+            expected = min(max_block, size - received + 2)
+            block = self.uds(bytes((0x36, counter & 0xFF)), frame_count(expected))
+            chunk = block[2:2 + size - received]
+            if block[1] != counter & 0xFF or not chunk:
+                raise ELM327Error(f"Unexpected answer to TransferData {counter & 0xFF:02X}: {block[:2].hex()}")
+            data[received:received + len(chunk)] = chunk
+            received += len(chunk)
+            counter += 1
+        self.uds(b'\x37')
+        self.logger.info("%s bytes uploaded from %X in %.2f s", size, address, time.perf_counter() - start)
+        return bytes(data)
+
+    @contextmanager
+    def _raw_mode(self) -> Iterator[bool]:
+        """
+        Turns the CAN auto-formatting off for the time of the with block (it is turned back on after). Gives True if
+        the headers are on.
+        """
+        caf = self._state.get(b'CAF') != b'0'
+        if caf:
+            self._configure(b'AT CAF0')
+        try:
+            yield self._state.get(b'H') == b'1'
+        finally:
+            if caf:
+                self._configure(b'AT CAF1')
+
+    def _send_raw(self, frame: bytes, responses: Optional[int] = None) -> List[bytes]:
+        # the frames are not requests whose number of answers can be learned
+        return self.send_request(frame.hex().upper().encode('ascii'), responses, learn=False)
+
+    def _send_unanswered(self, frame: bytes):
+        self._write(frame.hex().upper().encode('ascii') + (self._suffix or b'\r\n'))
+        self._read()
+
+    def _flow_control(self, lines: List[bytes], headers: bool, counted: bool) -> Tuple[int, float]:
+        """
+        Block size and separation time given by the flow control frames answered by an ECU. The WAIT frames are
+        skipped (MAX_FC_WAITS at most); with counted, the adapter returned at the first frame, a WAIT raises a
+        _FlowControlWait.
+        """
+        waits = 0
+        for line in lines:
+            frame = parse_line(line, headers)[1]
+            if not frame[:1] or frame[0] >> 4 != 3:
+                continue
+            status, block_size, st_min = parse_flow_control(frame)
+            if status == 0:
+                return block_size, st_min
+            if status != 1:
+                reason = 'overflow' if status == 2 else 'reserved status'
+                raise ELM327Error(f"The ECU refused the message (flow status {status}: {reason})")
+            waits += 1
+            if waits > self.MAX_FC_WAITS:
+                raise ELM327Error(f"The ECU asked to wait more than {self.MAX_FC_WAITS} times")
+        if waits and counted:
+            raise _FlowControlWait("Flow control WAIT answered")
+        if waits:
+            raise ELM327Error("The ECU asked to wait until the timeout of the adapter")
+        raise ELM327Error(f"Flow control expected: {lines}")
+
+    def _configure(self, cmd: bytes):
+        if self.send_command(cmd) == b'?':
+            raise ELM327Error(f"Command refused: {cmd.decode('ascii')}")
+
+    def supported_pids(self) -> List[int]:
+        """
+        Mode 01 PIDs supported by the vehicle, read from the answers to PIDs 00, 20, 40... (kept in pid_bitmaps)
+        """
+        pids = []
+        base = 0x00
+        while True:
+            if base not in self.pid_bitmaps:
+                self.pid_bitmaps[base] = self.query(0x01, base)
+            pids += self._bitmap_pids(base, self.pid_bitmaps[base])
+            if base + 0x20 not in pids or base + 0x20 > 0xE0:
+                return pids
+            base += 0x20
+
+    def read_dtcs(self, mode: int = 0x03) -> List[List[Tuple[str, str]]]:
+        """
+        Reads the stored (Mode 03), pending (07) or permanent (0A) DTC and returns the codes and descriptions reported
+        by each ECU.
+        With the headers off, the multi-frame answers of several ECUs must not be interleaved.
+        """
+        try:
+            lines = self.send_request(b'%02X' % mode)
+        except NoDataError:
+            return []
+        return self._parse_dtcs(mode, lines, self.protocol)
+
+    def scan_dtcs(self, modes: Iterable[int] = ELM327Base.DTC_MODES) -> Dict[int, List[List[Tuple[str, str]]]]:
+        """
+        Reads the DTC of several modes (stored, pending and permanent by default).
+        """
+        return {mode: self.read_dtcs(mode) for mode in modes}
+
+    def monitor(self, ids: Optional[Iterable[int]] = None, restart: bool = True) -> Iterator[CANFrame]:
+        """
+        Monitors the CAN bus (AT MA) and yields the frames received (time.monotonic() of their reception, ID and data
+        bytes), until the generator is closed.
+
+        With ids, only the frames of these IDs are yielded: the adapter filters are set so that it drops the other
+        frames itself (see plan_filters), the ones it still lets through are dropped here.
+        When the bus traffic is more than the link can carry, the adapter buffer overflows and the monitoring stops:
+        the overflow is logged and counted in the metrics ('BUFFER FULL' answers), then the monitoring is restarted,
+        or an ELM327Error is raised if restart is False.
+        """
+        protocol = self.protocol
+        if protocol not in self.CAN_PROTOCOLS:
+            raise ELM327Error(f"The monitor mode needs a CAN protocol (protocol {protocol} in use, 0 if not determined "
+                              f"yet: set it by AT SP or send a request first)")
+        digits = id_digits(protocol)
+        plan = wanted = None
+        if ids is not None:
+            wanted = set(ids)
+            plan = plan_filters(wanted, digits, (self.version_major, self.version_minor) >= (1, 3))
+            if plan.exact:
+                wanted = None
+
+        headers = self._state.get(b'H')
+        if headers != b'1':
+            self.send_command(b'AT H1')
+        for cmd in plan.commands if plan is not None else ():
+            self.send_command(cmd)
+        running = False
+        try:
+            while True:
+                self._write(b'AT MA' + self._suffix)
+                running = True
+                end = len(self._suffix)
+                while True:
+                    line = self._reader.read_line(self._suffix)
+                    if line is None:  # quiet bus
+                        continue
+                    now = time.monotonic()
+                    line = bytes(line[:-end])
+                    frame = parse_frame(line, digits)
+                    if frame is not None:
+                        if wanted is None or frame[0] in wanted:
+                            yield CANFrame(now, frame[0], frame[1])
+                    elif line in MONITOR_END or line == b'?':
+                        break
+                    elif b'<' in line:  # frame received with errors ('<RX ERROR', '<DATA ERROR')
+                        self.metrics.answer(line[line.index(b'<') + 1:].decode('ascii', 'ignore'))
+                    elif line in MONITOR_ERRORS:
+                        self.metrics.answer(line.decode('ascii', 'ignore'))
+                        self.logger.debug("Monitor: %s", line)
+
+                self._reader.read_until(b'>')
+                running = False
+                self.metrics.answer(line.decode('ascii', 'ignore'))
+                if line != b'BUFFER FULL':
+                    raise ELM327Error(f"Monitoring stopped: {line.decode('ascii', 'ignore')}")
+                self.logger.warning("Monitor: adapter buffer full, frames lost")
+                if not restart:
+                    raise ELM327Error("Adapter buffer full while monitoring (too much traffic for the link)")
+        finally:
+            if running:
+                self._stop_monitor()
+            if plan is not None:
+                if (self.version_major, self.version_minor) >= (1, 4):
+                    self.send_command(b'AT CRA')  # back to the automatic receive filters
+                else:
+                    self.send_command(b'AT D')
+                    self._apply_settings()
+            if headers != b'1' and self._state.get(b'H') != (headers or b'0'):
+                self.send_command(b'AT H' + (headers or b'0'))
+
+    def _stop_monitor(self):
+        """
+        Stops the monitoring (any character does), the frames received until the prompt are dropped.
+        """
+        self._write(b'\r')
+        while True:
+            data = self._reader.read_until(b'>')
+            if not len(data) or data[-1:] == b'>':
+                return
+
+    def _write(self, data: bytes):
+        self._conn.write(data)
+        self.metrics.written(len(data))
+
+    def _read(self):
+        return self._strip(self._reader.read_until(b'>'))
 
 
 if __name__ == '__main__':
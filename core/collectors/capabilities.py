@@ -0,0 +1,87 @@
+import copy
+import json
+import logging
+import os
+import tempfile
+from typing import List, Optional
+
+
+def default_path() -> str:
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'mcl', 'capabilities.json')
+
+
+class CapabilityCache:
+    """
+    On-disk cache of what was learned about the adapters and the vehicles they are plugged in, so that a new connection
+    does not have to discover it again.
+
+    The entries are keyed by adapter (AT I string and serial number of the USB port). An entry holds the line suffix,
+    the best baudrate, the VIN of the last vehicle and, for each VIN, the protocol, the supported PIDs bitmaps and the
+    number of answer lines of the requests. The file is JSON, rewritten atomically, so several processes can share it.
+    """
+    VERSION = 1
+
+    def __init__(self, path: Optional[str] = None):
+        self.logger = logging.getLogger('MCL.CapabilityCache')
+        self.path = path or default_path()
+        self._data = self._load()
+
+    @staticmethod
+    def key(ati: bytes, serial_number: Optional[str]) -> str:
+        return f"{ati.decode('ascii', 'replace')}|{serial_number or ''}"
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning("Capability cache %s unreadable, ignored: %s", self.path, e)
+            return {}
+        if data.get('version') != self.VERSION:
+            return {}
+        return data.get('adapters', {})
+
+    def adapter(self, key: str) -> dict:
+        """
+        Entry of an adapter (empty if it is unknown). It is a copy, changes are saved by store().
+        """
+        return copy.deepcopy(self._data.get(key, {}))
+
+    def baudrates(self, serial_number: Optional[str]) -> List[int]:
+        """
+        Baudrates negotiated with the adapters having this serial number
+        """
+        suffix = f"|{serial_number or ''}"
+        return [entry['baudrate'][1] for key, entry in self._data.items()
+                if key.endswith(suffix) and entry.get('baudrate')]
+
+    def store(self, key: str, entry: dict):
+        """
+        Saves the entry of an adapter (the entries of the other adapters are re-read from the file, not overwritten).
+        """
+        self._data = self._load()
+        self._data[key] = copy.deepcopy(entry)
+        self._save()
+
+    def invalidate(self, key: Optional[str] = None):
+        """
+        Forgets an adapter (all of them if key is None).
+        """
+        self._data = {} if key is None else self._load()
+        self._data.pop(key, None)
+        self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.capabilities-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'adapters': self._data}, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,200 @@
+"""
+Pipelined sending of the commands of an ELM327: the commands are queued by any thread and sent by a worker thread
+owning the link, which writes the next one as soon as the prompt of the previous one is received, and only then
+parses the previous answer. The host work (parsing, resolving the futures, waking the callers) is done while the
+adapter processes the next command.
+
+The ELM327 stops what it is doing when it receives a character, so a command cannot be written before the prompt of
+the previous one (it would interrupt it). The turnaround is cut down instead: the bytes to send are ready when the
+prompt arrives, and a request identical to the previous one is sent as a single carriage return (the ELM327 repeats
+its last command).
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Union
+
+from core.collectors.ELM327 import ELM327
+
+# queue item stopping the worker
+_STOP = object()
+
+
+class _Command:
+    __slots__ = ('future', 'cmd', 'responses', 'at', 'sent', 'start', 'wait')
+
+    def __init__(self, cmd: bytes, responses: Optional[int]):
+        self.future = Future()
+        self.cmd = cmd
+        self.responses = responses
+        self.at = cmd.upper().startswith(b'AT')
+        self.sent = b''
+        self.start = self.wait = 0.0
+
+
+class CommandQueue:
+    """
+    Command queue of an ELM327, sending the commands from a worker thread and returning their answers as futures.
+
+    While the queue runs, every command must go through it (the worker owns the link). The OBD requests are answered
+    by the lines of the answer (as ELM327.send_request), the AT commands by their last line (as ELM327.send_command).
+    With repeat, a request identical to the previous one is sent as a carriage return alone.
+    """
+
+    def __init__(self, elm: ELM327, repeat: bool = True):
+        self.logger = logging.getLogger('MCL.CommandQueue')
+
+        self._elm = elm
+        self.repeat = repeat
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._last: Optional[bytes] = None  # bytes of the last request written, repeated by a carriage return
+        self.repeated = 0  # number of requests sent as a carriage return
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._last = None
+        self._thread = threading.Thread(target=self._run, name='MCL-CommandQueue', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Sends the commands already queued, then stops the worker.
+        """
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, cmd: Union[bytes, str], responses: Optional[int] = None) -> 'Future':
+        """
+        Queues a command. Returns the future of its answer: the lines of an OBD request, the last line of an AT
+        command. responses is the number of lines answered to an OBD request, if known (see ELM327.send_request).
+        """
+        if self._thread is None:
+            raise RuntimeError("The command queue is not started")
+        if isinstance(cmd, str):
+            cmd = bytes(cmd, 'ASCII')
+        item = _Command(cmd, responses)
+        self._queue.put(item)
+        return item.future
+
+    def map(self, cmds: List[Union[bytes, str]]) -> List[List[bytes]]:
+        """
+        Sends the commands back-to-back and returns their answers (the first error is raised).
+        """
+        return [future.result() for future in [self.submit(cmd) for cmd in cmds]]
+
+    def query(self, mode: int, pid: int) -> 'Future':
+        """
+        Queues the request of a PID. Returns the future of its data bytes (as ELM327.query).
+        """
+        return self._then(self.submit(b'%02X%02X' % (mode, pid)),
+                          lambda lines: self._elm._parse_query(mode, pid, lines))
+
+    @staticmethod
+    def _then(future: Future, parse: Callable) -> Future:
+        ret = Future()
+
+        def done(f):
+            try:
+                ret.set_result(parse(f.result()))
+            except BaseException as e:
+                ret.set_exception(e)
+
+        future.add_done_callback(done)
+        return ret
+
+    def _next(self, block: bool):
+        """
+        Next command to send (cancelled ones skipped), None if there is none and block is False
+        """
+        while True:
+            try:
+                item = self._queue.get(block)
+            except queue.Empty:
+                return None
+            if item is _STOP or item.future.set_running_or_notify_cancel():
+                return item
+
+    def _write(self, item: _Command):
+        elm = self._elm
+        item.start, item.wait = time.perf_counter(), elm.metrics.wait_seconds.value
+        if item.at:
+            item.cmd = elm._command(item.cmd)
+            item.sent = item.cmd
+            self._last = None
+            elm._write(item.cmd + (elm._suffix or b'\r\n'))
+            return
+        item.cmd, item.sent = elm._prepare_request(item.cmd, item.responses)
+        if self.repeat and item.sent == self._last and elm._suffix is not None:
+            self.repeated += 1
+            elm._write(elm._suffix)
+        else:
+            self._last = item.sent
+            elm._write(item.sent + (elm._suffix or b'\r\n'))
+
+    def _finish(self, item: _Command, data: bytes):
+        elm = self._elm
+        try:
+            if item.at:
+                ret = elm._last_line(data)
+                elm._track(item.cmd)
+                if ret == b'?':
+                    elm.metrics.answer('?')
+            else:
+                ret = elm._parse_request(item.cmd, item.sent, data)
+        except Exception as e:
+            item.future.set_exception(e)
+        else:
+            item.future.set_result(ret)
+        finally:
+            elm.metrics.command('at' if item.at else 'obd', time.perf_counter() - item.start,
+                                elm.metrics.wait_seconds.value - item.wait)
+
+    def _run(self):
+        item = self._next(True)
+        written = False
+        while item is not _STOP:
+            try:
+                if not written:
+                    self._write(item)
+                data = self._elm._read()
+            except Exception as e:
+                self.logger.warning("%s failed: %s", item.cmd, e)
+                self._last = None
+                item.future.set_exception(e)
+                item, written = self._next(True), False
+                continue
+
+            # the next request is written before parsing this answer (not after an AT command, which may change the
+            # way the next commands are sent)
+            following = None if item.at else self._next(False)
+            written = False
+            if following is not None and following is not _STOP:
+                try:
+                    self._write(following)
+                    written = True
+                except Exception as e:
+                    self._last = None
+                    following.future.set_exception(e)
+                    following = None
+            self._finish(item, data)
+            if following is None:
+                following = self._next(True)
+            item = following
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
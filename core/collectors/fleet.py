@@ -0,0 +1,191 @@
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.collectors.ELM327 import ELM327
+from core.collectors.pid_scheduler import PIDScheduler
+from core.connection.usb_serial import USBSerial, search_ports
+
+FleetSample = namedtuple('FleetSample', ['adapter', 'timestamp', 'pid', 'data'])
+
+
+def _poll_adapter(port: str, rates: Dict[int, float], samples, stop):
+    """
+    Worker of one adapter: connects to it and polls it until the stop event is set.
+    Sends ('sample', FleetSample), then ('rates', port, achieved rates) or ('error', port, message) on the queue.
+    """
+    logger = logging.getLogger('MCL.ELM327Fleet')
+    try:
+        conn = USBSerial(port)
+        try:
+            scheduler = PIDScheduler(ELM327(conn), rates)
+            threading.Thread(target=lambda: (stop.wait(), scheduler.stop()), daemon=True).start()
+            for sample in scheduler.samples():
+                samples.put(('sample', FleetSample(port, *sample)))
+            samples.put(('rates', port, scheduler.achieved_rates()))
+        finally:
+            conn.com.close()
+    except Exception as e:
+        logger.error("Adapter %s failed: %s", port, e)
+        samples.put(('error', port, str(e)))
+
+
+def _scan_adapter(port: str, modes: Iterable[int]) -> Dict[int, List[List[Tuple[str, str]]]]:
+    conn = USBSerial(port)
+    try:
+        return ELM327(conn).scan_dtcs(modes)
+    finally:
+        conn.com.close()
+
+
+def scan_dtcs(ports: Optional[List[str]] = None, modes: Iterable[int] = ELM327.DTC_MODES) \
+        -> Tuple[Dict[str, Dict[int, List[List[Tuple[str, str]]]]], Dict[str, str]]:
+    """
+    Reads the DTC of several adapters at once (all the ELM327-USB found by default), one thread per adapter.
+    Returns the DTC (as given by ELM327.scan_dtcs) and the error message of each adapter that failed.
+    """
+    logger = logging.getLogger('MCL.ELM327Fleet')
+    if ports is None:
+        ports = [port for port, _ in search_ports()]
+    modes = tuple(modes)
+
+    results, errors = {}, {}
+    if not ports:
+        return results, errors
+    with ThreadPoolExecutor(max_workers=len(ports), thread_name_prefix='ELM327Fleet') as executor:
+        futures = {port: executor.submit(_scan_adapter, port, modes) for port in ports}
+        for port, future in futures.items():
+            try:
+                results[port] = future.result()
+            except Exception as e:
+                logger.error("Adapter %s failed: %s", port, e)
+                errors[port] = str(e)
+    return results, errors
+
+
+class ELM327Fleet:
+    """
+    Polls several ELM327 at once, one worker (thread or process) per adapter, and merges their samples in a single
+    stream tagged by adapter (the port of the adapter).
+    """
+
+    def __init__(self, rates: Dict[int, float], ports: Optional[List[str]] = None, processes: bool = False):
+        self.logger = logging.getLogger('MCL.ELM327Fleet')
+
+        if ports is None:
+            ports = [port for port, _ in search_ports()]
+        if not ports:
+            raise ConnectionError("No ELM327-USB found!")
+
+        self.ports = ports
+        self.rates = rates
+        self._processes = processes
+
+        if processes:
+            self._samples = multiprocessing.Queue()
+            self._stop = multiprocessing.Event()
+        else:
+            self._samples = queue.Queue()
+            self._stop = threading.Event()
+        self._workers = []
+        self._running = set()
+
+        self.achieved_rates: Dict[str, Dict[int, float]] = {}
+        self.errors: Dict[str, str] = {}
+
+    def start(self):
+        """
+        Connects to every adapter in parallel and starts polling them.
+        """
+        self._stop.clear()
+        worker = multiprocessing.Process if self._processes else threading.Thread
+        self._workers = [worker(target=_poll_adapter, args=(port, self.rates, self._samples, self._stop),
+                                name=f"ELM327Fleet-{port}", daemon=True)
+                         for port in self.ports]
+        self._running = set(self.ports)
+        for w in self._workers:
+            w.start()
+        self.logger.info("Polling %s adapters", len(self.ports))
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Stops the polling and waits for the workers to report their achieved rates, timeout seconds at most. The
+        workers that end without reporting (e.g. a killed process) or do not stop in time (e.g. stuck connecting to
+        their adapter) are given up: they are recorded in errors, and terminated if they are processes.
+        """
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        workers = dict(zip(self.ports, self._workers))
+        while self._running:
+            try:
+                self._handle(self._samples.get(timeout=0.1))
+                continue
+            except queue.Empty:
+                pass
+            ended = [port for port in self._running if not workers[port].is_alive()]
+            if ended:
+                # their last messages may still be in transit
+                self._drain()
+                for port in ended:
+                    if port in self._running:
+                        self._give_up(port, "Worker ended without reporting")
+            if time.monotonic() >= deadline:
+                for port in list(self._running):
+                    self._give_up(port, "Worker did not stop in time")
+                    if self._processes:
+                        workers[port].terminate()
+        for w in self._workers:
+            w.join(max(0.0, deadline - time.monotonic()))
+        self._workers = []
+
+    def _drain(self):
+        try:
+            while True:
+                self._handle(self._samples.get(timeout=0.1))
+        except queue.Empty:
+            pass
+
+    def _give_up(self, port: str, reason: str):
+        self.logger.error("Adapter %s: %s", port, reason)
+        self.errors[port] = reason
+        self._running.discard(port)
+
+    def samples(self, duration: Optional[float] = None) -> Iterator[FleetSample]:
+        """
+        Yields the samples of all the adapters, forever or during the given duration (in seconds).
+        """
+        end = None if duration is None else time.monotonic() + duration
+        while self._running:
+            timeout = None if end is None else end - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                sample = self._handle(self._samples.get(timeout=timeout))
+            except queue.Empty:
+                break
+            if sample is not None:
+                yield sample
+
+    def _handle(self, message) -> Optional[FleetSample]:
+        kind, *content = message
+        if kind == 'sample':
+            return content[0]
+        port, result = content
+        if kind == 'rates':
+            self.achieved_rates[port] = result
+        else:
+            self.errors[port] = result
+        self._running.discard(port)
+        return None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
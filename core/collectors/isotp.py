@@ -0,0 +1,218 @@
+"""
+ISO 15765-2 (ISO-TP) reassembly of the multi-frame messages answered through an ELM327 (Mode 09, UDS reads...).
+
+The ELM327 shows the messages in two ways:
+
+- headers off and CAN auto-formatting on (the defaults): the data of single frames, and the multi-frame messages as a
+  length line followed by 'n:' lines (the PCI bytes are removed),
+- headers on or CAN auto-formatting off: one line per frame, PCI byte included (and padding with the formatting off),
+  after the CAN ID if the headers are on.
+
+The messages of the ECUs can only be told apart when the headers are on. A message is rebuilt in a buffer allocated
+once at its full size (given by its first frame), the frames are copied in place.
+"""
+import binascii
+from typing import Dict, List, Optional, Tuple
+
+# UDS (ISO 14229) negative response codes
+NEGATIVE_RESPONSES = {
+    0x10: 'general reject',
+    0x11: 'service not supported',
+    0x12: 'sub-function not supported',
+    0x13: 'incorrect message length or invalid format',
+    0x14: 'response too long',
+    0x21: 'busy, repeat request',
+    0x22: 'conditions not correct',
+    0x24: 'request sequence error',
+    0x31: 'request out of range',
+    0x33: 'security access denied',
+    0x35: 'invalid key',
+    0x70: 'upload/download not accepted',
+    0x71: 'transfer data suspended',
+    0x72: 'general programming failure',
+    0x73: 'wrong block sequence counter',
+    0x78: 'response pending',
+    0x7E: 'sub-function not supported in active session',
+    0x7F: 'service not supported in active session',
+}
+
+
+class ISOTPError(ValueError):
+    pass
+
+
+def negative_response(message: bytes) -> Optional[str]:
+    """
+    Description of a UDS negative response (7F, service, code), None if the message is not one
+    """
+    if len(message) < 3 or message[0] != 0x7F:
+        return None
+    return f"{NEGATIVE_RESPONSES.get(message[2], 'unknown')} (NRC {message[2]:02X})"
+
+
+class Reassembler:
+    """
+    Rebuilds the messages of several ECUs from their frames (PCI byte first), as they are received.
+    """
+
+    def __init__(self):
+        # ECU -> buffer of the message being received, bytes received, sequence number of the next frame
+        self._pending: Dict[Optional[int], List] = {}
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of messages not complete yet
+        """
+        return len(self._pending)
+
+    def feed(self, ecu: Optional[int], frame: bytes) -> Optional[bytes]:
+        """
+        Takes a frame of an ECU. Returns the message it completes, if any.
+        """
+        if not frame:
+            raise ISOTPError("Empty frame")
+        kind = frame[0] >> 4
+        if kind == 0:  # single frame
+            size, start = frame[0] & 0x0F, 1
+            if size == 0 and len(frame) > 1:  # CAN FD escape
+                size, start = frame[1], 2
+            if len(frame) < start + size:
+                raise ISOTPError(f"Single frame shorter than its length: {frame.hex()}")
+            self._pending.pop(ecu, None)
+            return bytes(frame[start:start + size])
+        if kind == 1:  # first frame
+            size, start = ((frame[0] & 0x0F) << 8) | frame[1], 2
+            if size == 0:  # more than 4095 bytes
+                size, start = int.from_bytes(frame[2:6], 'big'), 6
+            buffer = bytearray(size)
+            n = min(size, len(frame) - start)
+            buffer[:n] = frame[start:start + n]
+            self._pending[ecu] = [buffer, n, 1]
+            return None
+        if kind == 2:  # consecutive frame
+            state = self._pending.get(ecu)
+            if state is None:
+                raise ISOTPError(f"Consecutive frame without first frame (ECU {ecu}): {frame.hex()}")
+            buffer, received, seq = state
+            if frame[0] & 0x0F != seq & 0x0F:
+                del self._pending[ecu]
+                raise ISOTPError(f"Frame {frame[0] & 0x0F:X} received instead of {seq & 0x0F:X} (ECU {ecu})")
+            n = min(len(buffer) - received, len(frame) - 1)
+            buffer[received:received + n] = frame[1:1 + n]
+            received += n
+            if received < len(buffer):
+                state[1], state[2] = received, seq + 1
+                return None
+            del self._pending[ecu]
+            return bytes(buffer)
+        if kind == 3:  # flow control, sent by the tester
+            return None
+        raise ISOTPError(f"Unknown frame type: {frame.hex()}")
+
+    def reset(self):
+        self._pending.clear()
+
+
+def _unhex(line: bytes) -> bytes:
+    try:
+        return binascii.unhexlify(line)
+    except (ValueError, binascii.Error):
+        raise ISOTPError(f"Unexpected line: {line}") from None
+
+
+def parse_line(line: bytes, headers: bool) -> Tuple[Optional[int], bytes]:
+    """
+    CAN ID (None when the headers are off) and bytes of a frame line displayed with the CAN auto-formatting off
+    """
+    line = line.replace(b' ', b'')
+    ecu = None
+    if headers:
+        # 11 bits IDs have 3 digits, 29 bits IDs 8 (followed by whole bytes)
+        digits = 3 if len(line) % 2 else 8
+        ecu = int.from_bytes(_unhex(line[:digits].zfill(8)), 'big')
+        line = line[digits:]
+    return ecu, _unhex(line)
+
+
+def segment(payload: bytes, padding: Optional[int] = 0x00) -> List[bytes]:
+    """
+    Frames (PCI byte first) of a message to send, padded to 8 bytes with the padding byte (if not None)
+    """
+    if len(payload) <= 7:
+        frames = [bytes((len(payload),)) + payload]
+    elif len(payload) <= 0xFFF:
+        frames = [bytes((0x10 | (len(payload) >> 8), len(payload) & 0xFF)) + payload[:6]]
+        frames += [bytes((0x20 | (i & 0x0F),)) + payload[6 + 7 * (i - 1):6 + 7 * i]
+                   for i in range(1, frame_count(len(payload)))]
+    else:
+        raise ISOTPError(f"Message too long for CAN frames of 8 bytes: {len(payload)} bytes")
+    if padding is not None:
+        frames = [frame.ljust(8, bytes((padding,))) for frame in frames]
+    return frames
+
+
+def frame_count(size: int) -> int:
+    """
+    Number of CAN frames of a message of size bytes
+    """
+    return 1 if size <= 7 else 1 + -(-(size - 6) // 7)
+
+
+def parse_flow_control(frame: bytes) -> Tuple[int, int, float]:
+    """
+    Flow status (0 continue, 1 wait, 2 overflow), block size (0: no more flow control) and separation time (in
+    seconds) of a flow control frame
+    """
+    if len(frame) < 3 or frame[0] >> 4 != 3:
+        raise ISOTPError(f"Flow control expected: {frame.hex()}")
+    st_min = frame[2]
+    if st_min <= 0x7F:
+        seconds = st_min / 1000
+    elif 0xF1 <= st_min <= 0xF9:
+        seconds = (st_min - 0xF0) / 10_000
+    else:  # reserved values: the longest time
+        seconds = 0.127
+    return frame[0] & 0x0F, frame[1], seconds
+
+
+def reassemble(lines: List[bytes], headers: bool = False, caf: bool = True) -> List[Tuple[Optional[int], bytes]]:
+    """
+    Messages contained in the lines of an answer, with the CAN ID of the ECU sending each one (None when the headers
+    are off), in the order they were completed.
+    headers and caf are the headers (AT H) and CAN auto-formatting (AT CAF) settings of the adapter.
+    """
+    messages = []
+    if headers or not caf:
+        reassembler = Reassembler()
+        for line in lines:
+            ecu, frame = parse_line(line, headers)
+            message = reassembler.feed(ecu, frame)
+            if message is not None:
+                messages.append((ecu, message))
+        if reassembler.pending:
+            raise ISOTPError(f"{reassembler.pending} message(s) not complete")
+        return messages
+
+    buffer = None
+    received = seq = 0
+    for line in lines:
+        if len(line) == 3 and buffer is None:  # length of a multi-frame message
+            buffer = bytearray(int(line, 16))
+            received, seq = 0, 0
+        elif line[1:2] == b':' and buffer is not None:
+            if line[:1] != b'%X' % (seq & 0x0F):
+                raise ISOTPError(f"Line {line} received instead of line {seq & 0x0F:X}")
+            data = _unhex(line[2:].replace(b' ', b''))
+            n = min(len(buffer) - received, len(data))
+            buffer[received:received + n] = data[:n]
+            received += n
+            seq += 1
+            if received >= len(buffer):
+                messages.append((None, bytes(buffer)))
+                buffer = None
+        else:
+            messages.append((None, _unhex(line.replace(b' ', b''))))
+    if buffer is not None:
+        raise ISOTPError("Multi-frame message not complete")
+    return messages
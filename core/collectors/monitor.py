@@ -0,0 +1,61 @@
+"""
+CAN bus monitoring helpers: parsing of the frames displayed by an ELM327 in monitor mode (AT MA, headers on), and
+planning of the adapter filters (AT CRA, AT CF / AT CM) so that the adapter drops the frames of the uninteresting IDs.
+"""
+import binascii
+from collections import namedtuple
+from typing import Iterable, Optional, Tuple
+
+CANFrame = namedtuple('CANFrame', ['timestamp', 'id', 'data'])
+FilterPlan = namedtuple('FilterPlan', ['commands', 'filter', 'mask', 'exact'])
+
+# lines sent by the ELM327 in the middle of the frames, and the ones ending the monitoring
+MONITOR_ERRORS = (b'CAN ERROR', b'BUS ERROR', b'FB ERROR', b'LV RESET')
+MONITOR_END = (b'BUFFER FULL', b'STOPPED')
+
+
+def id_digits(protocol: int) -> int:
+    """
+    Number of hex digits of the CAN IDs of an ISO 15765-4 protocol (29 bits for protocols 7 and 9, else 11 bits)
+    """
+    return 8 if protocol in (7, 9) else 3
+
+
+def parse_frame(line: bytes, digits: int) -> Optional[Tuple[int, bytes]]:
+    """
+    ID and data of a frame line displayed with the headers on (with or without spaces), None if the line is not a
+    valid frame (e.g. ended by '<RX ERROR' or '<DATA ERROR').
+    """
+    line = line.replace(b' ', b'')
+    if len(line) < digits or b'<' in line:
+        return None
+    try:
+        return int(line[:digits], 16), binascii.unhexlify(line[digits:])
+    except (ValueError, binascii.Error):
+        return None
+
+
+def plan_filters(ids: Iterable[int], digits: int = 3, cra: bool = True) -> FilterPlan:
+    """
+    Adapter filter letting the given CAN IDs through: a single ID is set by AT CRA (if cra, ELM327 v1.3+), several
+    IDs by the filter and mask (AT CF, AT CM) of the bits they have in common. A single pair cannot express any set,
+    exact tells if the frames passed are only the ones of the given IDs (else they must be filtered again).
+    """
+    ids = sorted(set(ids))
+    if not ids:
+        raise ValueError("No CAN ID to monitor")
+    width = 29 if digits == 8 else 11
+    full = (1 << width) - 1
+    mask = full
+    for can_id in ids[1:]:
+        mask &= ~(can_id ^ ids[0])
+    mask &= full
+    value = ids[0] & mask
+    exact = len(ids) == 1 << (width - bin(mask).count('1'))
+
+    if len(ids) == 1 and cra:
+        commands = [b'AT CRA %0*X' % (digits, value)]
+    else:
+        commands = [b'AT CF %0*X' % (digits, value), b'AT CM %0*X' % (digits, mask)]
+    return FilterPlan(commands, value, mask, exact)
+
@@ -0,0 +1,146 @@
+import heapq
+import logging
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Iterator, Optional
+
+from core.collectors.ELM327 import ELM327, ELM327Error
+
+Sample = namedtuple('Sample', ['timestamp', 'pid', 'data'])
+
+
+class PIDScheduler:
+    """
+    Polls Mode 01 PIDs of an ELM327, each one at its own target rate.
+
+    The PIDs are interleaved on the serial link by earliest due time. A PID cannot accumulate more than one missed
+    sample, so when the link is saturated the slow PIDs still get their rate and the fast ones share what remains.
+    The PIDs that are due at the same time are batched in multi-PID requests when the vehicle allows it.
+    """
+
+    def __init__(self, elm: ELM327, rates: Dict[int, float], mode: int = 0x01, batch: bool = True):
+        self.logger = logging.getLogger('MCL.PIDScheduler')
+
+        if not rates:
+            raise ValueError("At least one PID must be scheduled")
+        for pid, rate in rates.items():
+            if rate <= 0:
+                raise ValueError(f"Rate of PID {pid:02X} must be positive (got {rate})")
+
+        self._elm = elm
+        self._mode = mode
+        # only Mode 01 PIDs can be requested together
+        self._batch_size = ELM327.MAX_PIDS_PER_REQUEST if batch and mode == 0x01 else 1
+        self._periods: Dict[int, float] = {pid: 1 / rate for pid, rate in rates.items()}
+
+        self._counts: Dict[int, int] = {pid: 0 for pid in rates}
+        self._errors: Dict[int, int] = {pid: 0 for pid in rates}
+        self._start: Optional[float] = None
+        self._stop: Optional[float] = None
+        self._stopped = threading.Event()
+
+    @property
+    def rates(self) -> Dict[int, float]:
+        """
+        Target rate of each PID (Hz)
+        """
+        return {pid: 1 / period for pid, period in self._periods.items()}
+
+    def achieved_rates(self) -> Dict[int, float]:
+        """
+        Rate actually achieved for each PID (Hz) since the beginning of the polling
+        """
+        if self._start is None:
+            return {pid: 0.0 for pid in self._periods}
+        elapsed = (self._stop or time.monotonic()) - self._start
+        if elapsed <= 0:
+            return {pid: 0.0 for pid in self._periods}
+        return {pid: count / elapsed for pid, count in self._counts.items()}
+
+    def errors(self) -> Dict[int, int]:
+        """
+        Number of failed requests for each PID
+        """
+        return dict(self._errors)
+
+    def stop(self):
+        """
+        Stops the polling (can be called from another thread).
+        """
+        self._stopped.set()
+
+    def samples(self, duration: Optional[float] = None) -> Iterator[Sample]:
+        """
+        Polls the PIDs and yields the samples, forever (until stop() is called) or during the given duration (in
+        seconds).
+        The failed requests (ELM327Error) are counted in errors(). A failure of the link (OSError, e.g. a
+        ConnectionError or a serial.SerialException) ends the polling and is raised, achieved_rates() still gives the
+        rates up to it.
+        """
+        self._stopped.clear()
+        now = time.monotonic()
+        self._start = now
+        self._stop = None
+        self._counts = {pid: 0 for pid in self._periods}
+        self._errors = {pid: 0 for pid in self._periods}
+        end = None if duration is None else now + duration
+
+        # (due time, pid) of every PID
+        queue = [(now, pid) for pid in self._periods]
+        heapq.heapify(queue)
+
+        try:
+            while True:
+                due, pid = queue[0]
+                now = time.monotonic()
+                if end is not None and min(due, now) >= end:
+                    break
+                if due > now:
+                    self._stopped.wait(due - now if end is None else min(due, end) - now)
+                    now = time.monotonic()
+                if self._stopped.is_set() or (end is not None and now >= end):
+                    break
+
+                # every PID already due is requested in the same round trip
+                batch = [heapq.heappop(queue)]
+                while queue and queue[0][0] <= now and len(batch) < self._batch_size:
+                    batch.append(heapq.heappop(queue))
+
+                if len(batch) == 1:
+                    try:
+                        values = {pid: self._elm.query(self._mode, pid)}
+                    except ELM327Error as e:
+                        self.logger.debug("PID %02X failed: %s", pid, e)
+                        values = {}
+                else:
+                    values = self._elm.query_pids(pid for _, pid in batch)
+                now = time.monotonic()
+
+                for due, pid in batch:
+                    period = self._periods[pid]
+                    heapq.heappush(queue, (max(due + period, now - period), pid))
+
+                    data = values.get(pid)
+                    if data is None:
+                        self._errors[pid] += 1
+                    else:
+                        self._counts[pid] += 1
+                        yield Sample(now, pid, data)
+        finally:
+            self._stop = time.monotonic()
+
+    def run(self, duration: Optional[float] = None, callback: Optional[Callable[[Sample], None]] = None):
+        """
+        Polls the PIDs during the given duration (in seconds), calling the callback on each sample.
+        Returns the achieved rates (they are logged even if the link fails).
+        """
+        try:
+            for sample in self.samples(duration):
+                if callback is not None:
+                    callback(sample)
+        finally:
+            rates = self.achieved_rates()
+            for pid, rate in rates.items():
+                self.logger.info("PID %02X: %.2f Hz achieved (%.2f Hz targeted)", pid, rate, 1 / self._periods[pid])
+        return rates
@@ -3,6 +3,20 @@ from typing import Optional
 
 
 class AbstractConnection(metaclass=ABCMeta):
+    @property
+    def name(self) -> str:
+        """
+        Name of the connection (e.g. its port), used to label its logs and metrics
+        """
+        return type(self).__name__
+
+    @property
+    def serial_number(self) -> Optional[str]:
+        """
+        Serial number of the device, if it has one
+        """
+        return None
+
     @abstractmethod
     def connect(self, port):
         pass
@@ -11,6 +25,13 @@ class AbstractConnection(metaclass=ABCMeta):
     def read(self, size: int):
         pass
 
+    @abstractmethod
+    def read_into(self, buffer: memoryview) -> int:
+        """
+        Reads the available bytes into the buffer (at least one, unless the read times out). Returns their number.
+        """
+        pass
+
     @abstractmethod
     def read_all(self):
         pass
@@ -0,0 +1,28 @@
+from abc import ABCMeta, abstractmethod
+from typing import Optional
+
+
+class AsyncAbstractConnection(metaclass=ABCMeta):
+    @abstractmethod
+    async def connect(self, port):
+        pass
+
+    @abstractmethod
+    async def read(self, size: int):
+        pass
+
+    @abstractmethod
+    async def read_all(self):
+        pass
+
+    @abstractmethod
+    async def read_until(self, expected: bytes = b'\n', size: Optional[int] = None):
+        pass
+
+    @abstractmethod
+    async def flush(self):
+        pass
+
+    @abstractmethod
+    async def write(self, data: bytes):
+        pass
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import serial
+
+from core.connection.async_abstract_conn import AsyncAbstractConnection
+from core.connection.usb_serial import search_port, set_low_latency
+
+
+class AsyncUSBSerial(AsyncAbstractConnection):
+    """
+    USB serial connection driven by the asyncio event loop (POSIX only: the port file descriptor is watched by the
+    loop instead of being read by a blocking call).
+    """
+
+    @property
+    def baudrate(self):
+        return self.com.baudrate
+
+    @baudrate.setter
+    def baudrate(self, value):
+        self.com.baudrate = value
+        self._baudrate = value
+        self.logger.debug("Baudrate set to %s", value)
+
+    def __init__(self, port=None, baudrate: int = 38400, low_latency: bool = False):
+        self.logger = logging.getLogger('MCL.AsyncUSBSerial')
+
+        self._baudrate: int = baudrate
+        self._port = port
+        self.low_latency = low_latency
+        self.com: serial.Serial = None
+        self.hw_ref = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._buffer = bytearray()
+        self._received = asyncio.Event()
+        self._error: Optional[Exception] = None  # of the port, raised by the reads
+
+    async def connect(self, port=None):
+        port = port or self._port
+        if port is None:
+            port, self.hw_ref = search_port()
+
+        self.com = serial.Serial(port, self._baudrate, timeout=0)
+        self._error = None
+        if self.low_latency:
+            set_low_latency(self.com)
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self.com.fileno(), self._on_readable)
+        self.logger.info("ELM327 connected!")
+
+    def close(self):
+        if self.com is not None:
+            self._loop.remove_reader(self.com.fileno())
+            self.com.close()
+            self.com = None
+
+    def _on_readable(self):
+        try:
+            data = os.read(self.com.fileno(), 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._fail(serial.SerialException(f"read failed: {e}"))
+            return
+        if not data:
+            # stays readable forever: the reader is removed, the reads raise
+            self._fail(serial.SerialException("The port is readable but returned no data (device disconnected?)"))
+            return
+        self._buffer += data
+        self._received.set()
+
+    def _fail(self, error: Exception):
+        self._loop.remove_reader(self.com.fileno())
+        self._error = error
+        self._received.set()
+
+    async def _wait_data(self):
+        if self._error is not None:
+            raise self._error
+        self._received.clear()
+        await self._received.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _take(self, size: int) -> bytes:
+        ret = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return ret
+
+    async def read(self, size: int):
+        while len(self._buffer) < size:
+            await self._wait_data()
+        ret = self._take(size)
+        self.logger.debug("read %s", ret)
+        return ret
+
+    async def read_all(self):
+        ret = self._take(len(self._buffer))
+        self.logger.debug("read %s", ret)
+        return ret
+
+    async def read_until(self, expected: bytes = b'\n', size: Optional[int] = None):
+        start = 0
+        while True:
+            i = self._buffer.find(expected, start)
+            if i >= 0:
+                end = i + len(expected)
+                if size is not None:
+                    end = min(end, size)
+                break
+            if size is not None and len(self._buffer) >= size:
+                end = size
+                break
+            # the expected bytes may straddle the already searched part and the next data
+            start = max(0, len(self._buffer) - len(expected) + 1)
+            await self._wait_data()
+        ret = self._take(end)
+        self.logger.debug("read %s", ret)
+        return ret
+
+    async def flush(self):
+        await self._loop.run_in_executor(None, self.com.flush)
+
+    async def write(self, data: bytes):
+        self.logger.debug("writing %s", data)
+        fd = self.com.fileno()
+        view = memoryview(data)
+        while view:
+            try:
+                view = view[os.write(fd, view):]
+            except BlockingIOError:
+                pass
+            if view:
+                writable = self._loop.create_future()
+                self._loop.add_writer(fd, writable.set_result, None)
+                try:
+                    await writable
+                finally:
+                    self._loop.remove_writer(fd)
+        return len(data)
@@ -0,0 +1,149 @@
+import time
+from typing import Iterator, Optional
+
+from core.connection.abstract_conn import AbstractConnection
+from core.utils.metrics import AdapterMetrics
+
+
+class FrameReader:
+    """
+    Buffered reader of a connection: the bytes are received by bulk reads into a reusable buffer, and handed out as
+    memoryviews of that buffer.
+
+    A returned memoryview is only valid until the next read on the FrameReader (its bytes may be overwritten), convert
+    it with bytes() to keep it. Once a FrameReader is used, every read of the connection must go through it.
+    The reads (bytes, timeouts and time spent waiting) are counted in the metrics, if given.
+    """
+
+    def __init__(self, connection: AbstractConnection, size: int = 4096, metrics: Optional[AdapterMetrics] = None):
+        self._conn = connection
+        self.metrics = metrics
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._start = 0  # first byte not handed out yet
+        self._end = 0  # end of the received bytes
+
+    @property
+    def buffered(self) -> int:
+        """
+        Number of received bytes not handed out yet
+        """
+        return self._end - self._start
+
+    def _reserve(self, size: int):
+        """
+        Makes room for size more bytes at the end of the buffer.
+        """
+        if len(self._buf) - self._end >= size:
+            return
+        pending = self._end - self._start
+        if len(self._buf) - pending >= size:
+            # move the bytes not handed out yet to the beginning of the buffer
+            self._buf[:pending] = self._buf[self._start:self._end]
+        else:
+            # the memoryviews already handed out keep the old buffer alive, it cannot be resized
+            buf = bytearray(max(len(self._buf) * 2, pending + size))
+            buf[:pending] = self._buf[self._start:self._end]
+            self._buf, self._view = buf, memoryview(buf)
+        self._start, self._end = 0, pending
+
+    def _fill(self) -> int:
+        """
+        Receives the available bytes (at least one, unless the read times out). Returns their number.
+        """
+        self._reserve(1)
+        if self.metrics is None:
+            n = self._conn.read_into(self._view[self._end:])
+        else:
+            start = time.perf_counter()
+            n = self._conn.read_into(self._view[self._end:])
+            self.metrics.read(n, time.perf_counter() - start)
+        self._end += n
+        return n
+
+    def _take(self, size: int) -> memoryview:
+        ret = self._view[self._start:self._start + size]
+        self._start += size
+        if self._start == self._end:
+            self._start = self._end = 0
+        return ret
+
+    def read(self, size: int) -> memoryview:
+        """
+        Reads size bytes (less if the connection times out).
+        """
+        while self.buffered < size:
+            if not self._fill():
+                break
+        return self._take(min(size, self.buffered))
+
+    def read_until(self, expected: bytes = b'>', size: Optional[int] = None) -> memoryview:
+        """
+        Reads up to the expected bytes included, or size bytes (less if the connection times out).
+        """
+        search = self._start
+        while True:
+            i = self._buf.find(expected, search, self._end)
+            if i >= 0:
+                n = i + len(expected) - self._start
+                break
+            if size is not None and self.buffered >= size:
+                n = size
+                break
+            # the expected bytes may straddle the already searched part and the next bytes
+            search = max(self._start, self._end - len(expected) + 1)
+            start = self._start
+            if not self._fill():
+                n = self.buffered
+                break
+            search -= start - self._start  # the buffer may have been compacted
+        if size is not None:
+            n = min(n, size)
+        return self._take(n)
+
+    def read_line(self, terminator: bytes = b'\r') -> Optional[memoryview]:
+        """
+        Reads up to the terminator included. Returns None if the connection times out before, the bytes received stay
+        buffered for the next call (for streams whose lines may be slow to come, e.g. the monitoring of a quiet bus).
+        """
+        search = self._start
+        while True:
+            i = self._buf.find(terminator, search, self._end)
+            if i >= 0:
+                return self._take(i + len(terminator) - self._start)
+            search = max(self._start, self._end - len(terminator) + 1)
+            start = self._start
+            if not self._fill():
+                return None
+            search -= start - self._start  # the buffer may have been compacted
+
+    def read_all(self) -> memoryview:
+        """
+        Reads the bytes already received, without waiting.
+        """
+        data = self._conn.read_all()
+        if self.metrics is not None and data:
+            self.metrics.read(len(data), 0.0)
+        if data:
+            self._reserve(len(data))
+            self._buf[self._end:self._end + len(data)] = data
+            self._end += len(data)
+        return self._take(self.buffered)
+
+    def clear(self):
+        """
+        Drops the bytes not handed out yet.
+        """
+        self._start = self._end = 0
+
+    def frames(self, terminator: bytes = b'>') -> Iterator[memoryview]:
+        """
+        Yields the frames ended by the terminator, until the connection times out.
+        """
+        while True:
+            frame = self.read_until(terminator)
+            if frame[-len(terminator):] != terminator:
+                if len(frame):
+                    yield frame
+                return
+            yield frame
@@ -0,0 +1,780 @@
+import logging
+import os
+import select
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from core.connection.abstract_conn import AbstractConnection
+
+# default answers of the simulated vehicle: Mode 01 PID -> data bytes
+DEFAULT_PIDS: Dict[int, bytes] = {
+    0x00: bytes.fromhex('BE1FB813'),
+    0x04: bytes.fromhex('3F'),
+    0x05: bytes.fromhex('7B'),
+    0x0B: bytes.fromhex('21'),
+    0x0C: bytes.fromhex('1AF8'),
+    0x0D: bytes.fromhex('32'),
+    0x0F: bytes.fromhex('44'),
+    0x10: bytes.fromhex('0194'),
+    0x11: bytes.fromhex('26'),
+    0x20: bytes.fromhex('80018001'),
+    0x40: bytes.fromhex('44000000'),
+}
+
+# default data identifiers of the simulated ECU (UDS ReadDataByIdentifier): DID -> data bytes
+DEFAULT_DIDS: Dict[int, bytes] = {
+    0xF187: b'8200123456',
+    0xF18C: b'SN0042',
+    0xF190: b'VF1AB000123456789',
+    0xF195: b'SW 1.02',
+}
+
+# default memory of the simulated ECU, read by RequestUpload and TransferData
+DEFAULT_MEMORY = bytes(range(256)) * 256
+
+# default traffic of the simulated CAN bus, sent in turn when monitoring: (ID, data bytes)
+DEFAULT_BUS: List[Tuple[int, bytes]] = [
+    (0x0C9, bytes.fromhex('8012A4000000C000')),
+    (0x0F1, bytes.fromhex('00400000')),
+    (0x1E9, bytes.fromhex('00000000000000FE')),
+    (0x3C9, bytes.fromhex('0A0B00000000')),
+    (0x4C1, bytes.fromhex('0000000000FF2000')),
+    (0x7E8, bytes.fromhex('064100BE1FB81300')),
+]
+
+
+class ELM327Simulator(AbstractConnection):
+    """
+    In-process emulation of an ELM327 connected to a CAN vehicle (ISO 15765-4, 11 bits, 500 kbps).
+
+    The protocol is searched (search_time seconds) at the first OBD request, unless it is set by AT SP. The vehicle
+    answers Mode 01 (pids), Modes 03/07/0A (dtcs), its VIN in Mode 09 (none if vin is None), the UDS reads of the
+    data identifiers dids (service 22) and the uploads of memory (services 35, 36 and 37). With the CAN
+    auto-formatting off (AT CAF0), the host segments its messages and the ECU answers their first frames with
+    ecu_flow_control. In monitor mode (AT MA), the frames of bus are sent in turn, bus_rate frames per second, through
+    the receive filters (AT CRA, AT CF, AT CM); when the host does not read them fast enough, the transmit buffer of
+    the adapter overflows.
+
+    latency is the time taken by the vehicle to answer an OBD request, response_timeout the time the adapter waits for
+    more answers when the number of responses is not given in the request (limited by AT ST). With byte_timing, the
+    bytes take the time they would need on a serial link at the current baudrate, and the consecutive frames of the
+    ECU the time they need on the bus (or the STmin of the flow control). The reads wait up to timeout seconds (None:
+    forever), like a serial port.
+    """
+
+    def __init__(self, version: str = '1.5', linefeeds: bool = False, latency: float = 0.0,
+                 response_timeout: float = 0.0, byte_timing: bool = False, max_baudrate: int = 500_000,
+                 pids: Optional[Dict[int, bytes]] = None, dtcs: Optional[List[int]] = None, ecus: int = 1,
+                 timeout: Optional[float] = None, vin: Optional[str] = 'VF1AB000123456789',
+                 search_time: float = 0.0, bus: Optional[List[Tuple[int, bytes]]] = None, bus_rate: float = 1000.0,
+                 dids: Optional[Dict[int, bytes]] = None, memory: Optional[bytes] = None):
+        self.logger = logging.getLogger('MCL.ELM327Simulator')
+
+        self.version = version
+        self.latency = latency
+        self.response_timeout = response_timeout
+        self.byte_timing = byte_timing
+        self.max_baudrate = max_baudrate
+        self.pids = DEFAULT_PIDS if pids is None else pids
+        self.dtcs = [] if dtcs is None else dtcs
+        self.ecus = ecus
+        self.timeout = timeout
+        self.vin = vin
+        self.search_time = search_time
+        self.bus = DEFAULT_BUS if bus is None else bus
+        self.dids = DEFAULT_DIDS if dids is None else dids
+        self.memory = DEFAULT_MEMORY if memory is None else memory
+        self.bus_rate = bus_rate
+
+        self.vehicle_protocol = 6
+        self._stored_protocol = 0  # AT SP, 0 for an automatic search
+        self._preferred = 0  # protocol tried first by the automatic search (AT SP A / AT TP A)
+        self.protocol = 0  # protocol in use, 0 until found
+
+        self.reset_time = 0.05
+        self.brd_timeout = 0.075  # AT BRT
+        self.monitor_buffer = 256  # size of the transmit buffer
+        self.ecu_flow_control = b'\x30\x00\x00'  # sent by the ECU to the host segmenting a message (CAF off)
+        self.ecu_flow_waits = 0  # flow control WAIT frames sent by the ECU before each flow control
+        self.max_block = 0x402  # of the TransferData answers
+
+        self._monitoring = False
+        self._receiving: Optional[list] = None  # message segmented by the host: buffer, frames received
+        self._upload: Optional[list] = None  # address, remaining bytes and block counter of an upload
+
+        self._default_linefeeds = linefeeds
+        self._baudrate = self.DEFAULT_BAUDRATE
+        self._host_baudrate = self.DEFAULT_BAUDRATE
+        self._brd_pending: Optional[int] = None
+        self._brd_timer: Optional[threading.Timer] = None
+
+        self._in = bytearray()
+        self._out = bytearray()
+        self._ready = 0.0  # time at which the whole output buffer has been transmitted
+        self._cond = threading.Condition()
+        self._commands = threading.Lock()  # the commands are processed one at a time (_cond is released in between)
+        self._last = b''
+        self._defaults()
+
+    DEFAULT_BAUDRATE = 38_400
+    # duration of a CAN frame of 8 bytes at 500 kbps (bits stuffing included)
+    CAN_FRAME_TIME = 0.00026
+
+    def _defaults(self):
+        self.protocol = self._stored_protocol
+        self.echo = True
+        self.linefeeds = self._default_linefeeds
+        self.spaces = True
+        self.headers = False
+        self.caf = True
+        self.st = 0x32  # AT ST, by 4 ms
+        self.can_filter = 0  # AT CF / AT CRA
+        self.can_mask = 0  # AT CM / AT CRA, all IDs pass
+        self.responses = True  # AT R
+        self.fc_data = b'\x30\x00\x00'  # flow control sent by the adapter (AT FC SD with AT FC SM 1 or 2)
+        self._fc_user = self.fc_data  # AT FC SD
+
+    @property
+    def _eol(self):
+        return b'\r\n' if self.linefeeds else b'\r'
+
+    @property
+    def baudrate(self):
+        return self._host_baudrate
+
+    @baudrate.setter
+    def baudrate(self, value):
+        self._host_baudrate = value
+
+    @property
+    def ati(self):
+        return b'ELM327 v' + self.version.encode('ascii')
+
+    # AbstractConnection interface
+
+    def connect(self, port):
+        pass
+
+    def read(self, size: int):
+        return self._take(lambda buf: size if len(buf) >= size else None, self.timeout)
+
+    def read_into(self, buffer: memoryview) -> int:
+        ret = self._take(lambda buf: min(len(buf), len(buffer)) or None, self.timeout)
+        buffer[:len(ret)] = ret
+        return len(ret)
+
+    def read_all(self):
+        with self._cond:
+            ret = bytes(self._out)
+            self._out.clear()
+            return ret
+
+    def read_until(self, expected: bytes = b'\n', size: Optional[int] = None):
+        def find(buf):
+            i = buf.find(expected)
+            if i >= 0:
+                i += len(expected)
+                return i if size is None else min(i, size)
+            if size is not None and len(buf) >= size:
+                return size
+            return None
+        return self._take(find, self.timeout)
+
+    def flush(self):
+        pass
+
+    def write(self, data: bytes):
+        if self.byte_timing:
+            time.sleep(len(data) * 10 / self._host_baudrate)
+        with self._commands, self._cond:
+            if self._monitoring:
+                # any character stops the monitoring
+                self._monitoring = False
+                self._answer([b'STOPPED'])
+                self._cond.notify_all()
+                return len(data)
+            for c in data:
+                if c == 0x0D:
+                    self._process(bytes(self._in))
+                    self._in.clear()
+                elif c not in (0x0A, 0x20) or self._in:
+                    self._in.append(c)
+            self._cond.notify_all()
+        return len(data)
+
+    # internals
+
+    def _take(self, find, timeout: Optional[float]):
+        """
+        Takes the bytes of the output buffer once find() gives their number, or what is there after the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                n = find(self._out)
+                if n is not None:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    n = len(self._out)
+                    break
+                self._cond.wait(remaining)
+            ret = bytes(self._out[:n])
+            del self._out[:n]
+            # time at which the last taken byte is transmitted
+            ready = self._ready - len(self._out) * 10 / self._baudrate
+        if self.byte_timing:
+            delay = ready - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return ret
+
+    def _sleep(self, seconds: float):
+        """
+        Waits in the processing of a command (called holding _cond), with _cond released: what is already emitted (the
+        echo...) can be read meanwhile.
+        """
+        self._cond.notify_all()
+        self._cond.release()
+        try:
+            time.sleep(seconds)
+        finally:
+            self._cond.acquire()
+
+    def _rates_match(self) -> bool:
+        # UARTs tolerate a few percent of error (4 MHz / divisor is not exactly the standard rates)
+        return abs(self._host_baudrate - self._baudrate) <= 0.03 * self._baudrate
+
+    def _emit(self, data: bytes):
+        if not self._rates_match():
+            data = bytes(b ^ 0x55 for b in data)  # garbage when the rates mismatch
+        self._out += data
+        now = time.monotonic()
+        self._ready = max(self._ready, now) + len(data) * 10 / self._baudrate
+
+    def _answer(self, lines: List[bytes]):
+        eol = self._eol
+        self._emit(b''.join(line + eol for line in lines) + eol + b'>')
+
+    def _process(self, line: bytes):
+        if self._brd_pending is not None:
+            self._finish_brd(line)
+            return
+        if self.echo:
+            self._emit(line + self._eol)
+        if not line:
+            line = self._last
+        self._last = line
+
+        cmd = line.replace(b' ', b'').upper()
+        if cmd.startswith(b'AT'):
+            self._at(cmd[2:])
+        else:
+            if self.latency:
+                self._sleep(self.latency)
+            self._obd(cmd)
+
+    def _at(self, cmd: bytes):
+        if cmd == b'Z':
+            # the adapter answers at its default baudrate once reset, the host has the reset time to follow it
+            self._baudrate = self.DEFAULT_BAUDRATE
+            timer = threading.Timer(self.reset_time, self._finish_reset)
+            timer.daemon = True
+            timer.start()
+        elif cmd == b'WS':
+            self._defaults()
+            self._emit(self._eol)
+            self._answer([self.ati])
+        elif cmd == b'I':
+            self._answer([self.ati])
+        elif cmd == b'D':
+            self._defaults()
+            self._answer([b'OK'])
+        elif cmd in (b'E0', b'E1'):
+            self.echo = cmd == b'E1'
+            self._answer([b'OK'])
+        elif cmd in (b'L0', b'L1'):
+            self.linefeeds = cmd == b'L1'
+            self._answer([b'OK'])
+        elif cmd in (b'S0', b'S1'):
+            self.spaces = cmd == b'S1'
+            self._answer([b'OK'])
+        elif cmd in (b'H0', b'H1'):
+            self.headers = cmd == b'H1'
+            self._answer([b'OK'])
+        elif cmd in (b'CAF0', b'CAF1'):
+            self.caf = cmd == b'CAF1'
+            self._answer([b'OK'])
+        elif cmd in (b'R0', b'R1'):
+            self.responses = cmd == b'R1'
+            self._answer([b'OK'])
+        elif cmd.startswith(b'FCSD') and 6 <= len(cmd) <= 14 and len(cmd) % 2 == 0:
+            self._fc_user = bytes.fromhex(cmd[4:].decode('ascii'))
+            self._answer([b'OK'])
+        elif cmd in (b'FCSM0', b'FCSM1', b'FCSM2'):
+            self.fc_data = self._fc_user if cmd != b'FCSM0' else b'\x30\x00\x00'
+            self._answer([b'OK'])
+        elif cmd == b'RV':
+            self._answer([b'12.6V'])
+        elif cmd == b'DP':
+            if self.protocol == 6:
+                self._answer([(b'' if self._stored_protocol else b'AUTO, ') + b'ISO 15765-4 (CAN 11/500)'])
+            else:
+                self._answer([b'AUTO' if not self._stored_protocol else b'%X' % self.protocol])
+        elif cmd == b'DPN':
+            self._answer([(b'' if self._stored_protocol else b'A') + b'%X' % self.protocol])
+        elif cmd[:2] in (b'SP', b'TP') and len(cmd) in (3, 4):
+            protocol = cmd[-1:]
+            if protocol not in b'0123456789ABC':
+                self._answer([b'?'])
+                return
+            # SP A6: automatic, protocol 6 tried first
+            self._preferred = int(protocol, 16) if len(cmd) == 4 else 0
+            protocol = 0 if len(cmd) == 4 or protocol == b'0' else int(protocol, 16)
+            if cmd[:2] == b'SP':
+                self._stored_protocol = protocol
+            self.protocol = protocol
+            self._answer([b'OK'])
+        elif cmd[:2] == b'ST' and len(cmd) == 4:
+            try:
+                self.st = int(cmd[2:], 16) or 0x32  # ST 00: default timeout
+            except ValueError:
+                self._answer([b'?'])
+                return
+            self._answer([b'OK'])
+        elif cmd[:3] == b'CRA' and len(cmd) in (3, 6, 11):
+            if len(cmd) == 3:
+                self.can_filter = self.can_mask = 0
+            else:
+                digits = cmd[3:].decode('ascii')  # X digits match any value
+                self.can_filter = int(digits.replace('X', '0'), 16)
+                self.can_mask = int(''.join('0' if c == 'X' else 'F' for c in digits), 16)
+            self._answer([b'OK'])
+        elif cmd[:2] in (b'CF', b'CM') and len(cmd) in (5, 10):
+            if cmd[:2] == b'CF':
+                self.can_filter = int(cmd[2:], 16)
+            else:
+                self.can_mask = int(cmd[2:], 16)
+            self._answer([b'OK'])
+        elif cmd == b'MA':
+            if not self.protocol:
+                self.protocol = self.vehicle_protocol
+            self._monitoring = True
+            threading.Thread(target=self._monitor, daemon=True).start()
+        elif cmd.startswith(b'BRD') and len(cmd) == 5:
+            divisor = int(cmd[3:], 16)
+            if divisor == 0:
+                self._answer([b'?'])
+                return
+            self._emit(b'OK' + self._eol)
+            self._brd_pending = self._baudrate
+            self._baudrate = round(4_000_000 / divisor)
+            self._start_brd_timer(self._send_brd_ati)
+        elif cmd[:2] in (b'SP', b'TP', b'ST', b'AT', b'SH', b'CF', b'CM', b'FC', b'CR', b'CA', b'BR'):
+            self._answer([b'OK'])
+        else:
+            self._answer([b'?'])
+
+    def _monitor(self):
+        period = 1 / self.bus_rate
+        due = time.monotonic()
+        i = 0
+        while True:
+            time.sleep(max(0.0, due - time.monotonic()))
+            with self._cond:
+                if not self._monitoring:
+                    return
+                now = time.monotonic()
+                sep = b' ' if self.spaces else b''
+                lines = []
+                while due <= now:
+                    can_id, data = self.bus[i % len(self.bus)]
+                    i += 1
+                    due += period
+                    if (can_id ^ self.can_filter) & self.can_mask:
+                        continue
+                    line = sep.join(b'%02X' % b for b in data)
+                    if self.headers:
+                        line = b'%03X' % can_id + sep + line
+                    lines.append(line + self._eol)
+                data = b''.join(lines)
+                if self.byte_timing:
+                    pending = max(0.0, self._ready - now) * self._baudrate / 10
+                else:
+                    pending = len(self._out)
+                if pending + len(data) > self.monitor_buffer:
+                    self._monitoring = False
+                    self._answer([b'BUFFER FULL'])
+                else:
+                    self._emit(data)
+                self._cond.notify_all()
+
+    def _finish_reset(self):
+        with self._cond:
+            self.sync_host()
+            self._defaults()
+            self._emit(self._eol)
+            self._answer([self.ati])
+            self._cond.notify_all()
+
+    def _start_brd_timer(self, callback):
+        self._brd_timer = threading.Timer(self.brd_timeout, callback)
+        self._brd_timer.daemon = True
+        self._brd_timer.start()
+
+    def _send_brd_ati(self):
+        # the adapter waits for the host to change its baudrate, then sends its ID at the new rate
+        with self._cond:
+            if self._brd_pending is None:
+                return
+            self.sync_host()
+            self._emit(self.ati + self._eol)
+            self._start_brd_timer(self._revert_brd)
+            self._cond.notify_all()
+
+    def _revert_brd(self):
+        with self._cond:
+            if self._brd_pending is None:
+                return
+            self._baudrate = self._brd_pending
+            self._brd_pending = None
+            self.sync_host()
+            self._emit(self._eol + b'>')
+            self._cond.notify_all()
+
+    def _finish_brd(self, line: bytes):
+        self._brd_timer.cancel()
+        old = self._brd_pending
+        self._brd_pending = None
+        if line or self._baudrate > 1.03 * self.max_baudrate or not self._rates_match():
+            self._baudrate = old
+            self._emit(self._eol + b'>')
+        else:
+            self._answer([b'OK'])
+
+    def sync_host(self):
+        """
+        Updates the baudrate of the host side (nothing to do when the host is in-process)
+        """
+        pass
+
+    def _obd(self, cmd: bytes):
+        count = None
+        if len(cmd) % 2:  # the last digit is the number of responses
+            count = int(cmd[-1:], 16)
+            cmd = cmd[:-1]
+        try:
+            raw = bytes.fromhex(cmd.decode('ascii'))
+        except ValueError:
+            self._answer([b'?'])
+            return
+        if count is None and self.response_timeout and self.responses:
+            self._sleep(min(self.response_timeout, self.st * 0.004))  # waiting for more responses (AT ST at most)
+        if not raw:
+            self._answer([b'?'])
+            return
+
+        status = []
+        if not self.protocol:
+            if self._preferred != self.vehicle_protocol:
+                status.append(b'SEARCHING...')
+                self._sleep(self.search_time)
+            self.protocol = self.vehicle_protocol
+        if self.protocol != self.vehicle_protocol:
+            self._answer([b'UNABLE TO CONNECT'])
+            return
+        if not self.caf:
+            # the host gives the PCI bytes and segments the messages
+            raw = self._receive(raw, count)
+            if raw is None:
+                return
+
+        mode = raw[0]
+        if mode == 0x01:
+            payload = bytearray([0x41])
+            for pid in raw[1:7]:
+                if pid in self.pids:
+                    payload += bytes([pid]) + self.pids[pid]
+            if len(payload) == 1:
+                self._answer(status + [b'NO DATA'])
+                return
+        elif mode in (0x03, 0x07, 0x0A):
+            payload = bytearray([mode + 0x40, len(self.dtcs)])
+            for dtc in self.dtcs:
+                payload += dtc.to_bytes(2, 'big')
+        elif mode == 0x09 and raw[1:] == b'\x00' and self.vin is not None:
+            payload = bytes.fromhex('490040000000')  # PID 02 supported
+        elif mode == 0x09 and raw[1:] == b'\x02' and self.vin is not None:
+            payload = b'\x49\x02\x01' + self.vin.encode('ascii')
+        elif mode == 0x22 and len(raw) >= 3 and len(raw) % 2:
+            dids = [int.from_bytes(raw[i:i + 2], 'big') for i in range(1, len(raw), 2)]
+            if all(did in self.dids for did in dids):
+                payload = b'\x62' + b''.join(did.to_bytes(2, 'big') + self.dids[did] for did in dids)
+            else:
+                payload = b'\x7F\x22\x31'  # request out of range
+        elif mode in (0x35, 0x36, 0x37):
+            payload = self._transfer(raw)
+        else:
+            self._answer(status + [b'NO DATA'])
+            return
+
+        if not self.responses:
+            self._answer([])
+            return
+        lines = status
+        for ecu in range(self.ecus):
+            frames = self._frames(bytes(payload), b'%03X' % (0x7E8 + ecu))
+            if self.byte_timing and len(payload) > 7:
+                # consecutive frames sent by the ECU, separated by the STmin of the flow control
+                st_min = self.fc_data[2] / 1000 if self.fc_data[2] <= 0x7F else 0.0001 * (self.fc_data[2] & 0x0F)
+                self._sleep(-(-(len(payload) - 6) // 7) * max(st_min, self.CAN_FRAME_TIME))
+            lines += frames
+        self._answer(lines)
+
+    def _receive(self, frame: bytes, count: Optional[int] = None) -> Optional[bytes]:
+        """
+        Takes a frame of a message sent by the host (CAN auto-formatting off). Returns the message once complete, else
+        answers the flow control expected by the host (if any, after ecu_flow_waits WAIT frames; the adapter returns
+        after count frames if it is given).
+        """
+        kind = frame[0] >> 4
+        if kind == 0:
+            self._receiving = None
+            if not 0 < frame[0] < len(frame):
+                # no data, or less than its length (e.g. a request sent without its PCI byte): ignored by the ECUs
+                self._answer([b'NO DATA'])
+                return None
+            return frame[1:1 + frame[0]]
+        if kind == 1:
+            size = ((frame[0] & 0x0F) << 8) | frame[1]
+            self._receiving = [bytearray(frame[2:8]), 0, size]
+            self._answer_flow_control(count)
+            return None
+        if kind == 2 and self._receiving is not None:
+            buffer, received, size = self._receiving
+            buffer += frame[1:8]
+            received += 1
+            self._receiving[1] = received
+            if len(buffer) >= size:
+                self._receiving = None
+                return bytes(buffer[:size])
+            block_size = self.ecu_flow_control[1]
+            if block_size and received % block_size == 0:
+                self._answer_flow_control(count)
+            elif self.responses:
+                self._answer([b'NO DATA'])
+            else:
+                self._answer([])
+            return None
+        self._answer([b'NO DATA'])
+        return None
+
+    def _answer_frame(self, frame: bytes):
+        self._answer([self._frame_line(frame)])
+
+    def _answer_flow_control(self, count: Optional[int]):
+        frames = [b'\x31\x00\x00'] * self.ecu_flow_waits + [self.ecu_flow_control]
+        self._answer([self._frame_line(frame) for frame in frames[:count or None]])
+
+    def _frame_line(self, frame: bytes) -> bytes:
+        sep = b' ' if self.spaces else b''
+        line = sep.join(b'%02X' % b for b in frame.ljust(8, b'\x00'))
+        return b'7E8' + sep + line if self.headers else line
+
+    def _transfer(self, raw: bytes) -> bytes:
+        """
+        Answer to a RequestUpload (35), TransferData (36) or RequestTransferExit (37) request, reading memory
+        """
+        mode = raw[0]
+        if mode == 0x35:
+            if len(raw) < 3 or len(raw) != 3 + (raw[2] >> 4) + (raw[2] & 0x0F):
+                return b'\x7F\x35\x13'
+            address = int.from_bytes(raw[3:3 + (raw[2] & 0x0F)], 'big')
+            size = int.from_bytes(raw[3 + (raw[2] & 0x0F):], 'big')
+            if address + size > len(self.memory):
+                return b'\x7F\x35\x31'
+            self._upload = [address, size, 1]
+            return b'\x75\x20' + self.max_block.to_bytes(2, 'big')
+        if self._upload is None:
+            return bytes((0x7F, mode, 0x24))  # request sequence error
+        if mode == 0x37:
+            self._upload = None
+            return b'\x77'
+        address, remaining, counter = self._upload
+        if raw[1:2] != bytes((counter & 0xFF,)):
+            return b'\x7F\x36\x73'  # wrong block sequence counter
+        n = min(remaining, self.max_block - 2)
+        self._upload = [address + n, remaining - n, counter + 1]
+        return b'\x76' + raw[1:2] + self.memory[address:address + n]
+
+    def _frames(self, payload: bytes, header: bytes) -> List[bytes]:
+        """
+        Lines of an ISO-TP message, as displayed by the ELM327 (with or without headers and CAN auto-formatting)
+        """
+        sep = b' ' if self.spaces else b''
+        if self.headers or not self.caf:
+            if len(payload) <= 7:
+                frames = [bytes([len(payload)]) + payload]
+            else:
+                frames = [bytes([0x10 | (len(payload) >> 8), len(payload) & 0xFF]) + payload[:6]]
+                rest, seq = payload[6:], 1
+                while rest:
+                    frames.append(bytes([0x20 | (seq & 0x0F)]) + rest[:7].ljust(7, b'\x00'))
+                    rest, seq = rest[7:], seq + 1
+            if not self.caf:
+                frames = [f.ljust(8, b'\x00') for f in frames]
+            prefix = header + sep if self.headers else b''
+            return [prefix + sep.join(b'%02X' % b for b in f) for f in frames]
+        if len(payload) <= 7:
+            return [sep.join(b'%02X' % b for b in payload)]
+        lines = [b'%03X' % len(payload)]
+        chunks = [payload[:6]] + [payload[i:i + 7] for i in range(6, len(payload), 7)]
+        for i, chunk in enumerate(chunks):
+            if i:
+                chunk = chunk.ljust(7, b'\x00')
+            lines.append(b'%X:' % (i & 0x0F) + sep + sep.join(b'%02X' % b for b in chunk))
+        return lines
+
+
+class PtyELM327Simulator:
+    """
+    ELM327Simulator served on a pseudo-terminal, so that a real serial connection (USBSerial) can attach to it.
+    The device to open is given by the port attribute, the baudrate set by the host is followed. POSIX only.
+    """
+
+    def __init__(self, **kwargs):
+        import pty
+        import termios
+        import tty
+
+        self._termios = termios
+        self.sim = ELM327Simulator(**kwargs)
+        self.sim.sync_host = self._sync_host
+
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+
+        self._running = True
+        self._threads = [threading.Thread(target=self._input, daemon=True),
+                         threading.Thread(target=self._output, daemon=True)]
+        for t in self._threads:
+            t.start()
+
+    def _host_baudrate(self) -> int:
+        speed = self._termios.tcgetattr(self._slave)[5]
+        for name in dir(self._termios):
+            if name.startswith('B') and name[1:].isdigit() and getattr(self._termios, name) == speed:
+                return int(name[1:])
+        return self.sim.baudrate
+
+    def _sync_host(self):
+        self.sim.baudrate = self._host_baudrate()
+
+    def _input(self):
+        while self._running:
+            if not select.select([self._master], [], [], 0.1)[0]:
+                continue
+            try:
+                data = os.read(self._master, 4096)
+            except OSError:
+                break
+            if data:
+                self._sync_host()
+                self.sim.write(data)
+
+    def _output(self):
+        while self._running:
+            data = self.sim._take(lambda buf: len(buf) or None, timeout=0.1)
+            if data:
+                try:
+                    os.write(self._master, data)
+                except OSError:
+                    break
+
+    def close(self):
+        self._running = False
+        for t in self._threads:
+            t.join()
+        os.close(self._master)
+        os.close(self._slave)
+
+
+class TCPELM327Simulator:
+    """
+    ELM327Simulator served on a TCP port like a WiFi adapter, so that a TCPSocket can connect to it. The clients are
+    served one at a time (the next ones wait), the simulated adapter keeps its state between them. The address to
+    connect to is given by the address attribute (port 0 picks a free port).
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **kwargs):
+        import socket
+
+        self.sim = ELM327Simulator(**kwargs)
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()[:2]
+        self._client = None
+
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        import socket
+
+        while self._running:
+            if not select.select([self._server], [], [], 0.1)[0]:
+                continue
+            try:
+                client, _ = self._server.accept()
+            except OSError:
+                break
+            # the answers are sent as they are emitted (a WiFi adapter does not wait for the ACK of the previous ones)
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._client = client
+            output = threading.Thread(target=self._output, args=(client,), daemon=True)
+            output.start()
+            self._input(client)
+            output.join()
+            client.close()
+            self._client = None
+
+    def _input(self, client):
+        while self._running:
+            if not select.select([client], [], [], 0.1)[0]:
+                continue
+            try:
+                data = client.recv(4096)
+            except OSError:
+                break
+            if not data:
+                break
+            self.sim.write(data)
+        self.disconnect()
+
+    def _output(self, client):
+        while self._running and self._client is client:
+            data = self.sim._take(lambda buf: len(buf) or None, timeout=0.1)
+            if data:
+                try:
+                    client.sendall(data)
+                except OSError:
+                    break
+
+    def disconnect(self):
+        """
+        Drops the connection of the current client (as a WiFi adapter losing its client).
+        """
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.shutdown(2)  # SHUT_RDWR
+            except OSError:
+                pass
+
+    def close(self):
+        self._running = False
+        self.disconnect()
+        self._thread.join()
+        self._server.close()
@@ -0,0 +1,237 @@
+import logging
+import select
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from core.connection.abstract_conn import AbstractConnection
+from core.connection.framing import FrameReader
+
+# address of most WiFi ELM327 adapters
+DEFAULT_HOST = '192.168.0.10'
+DEFAULT_PORT = 35000
+
+
+class _Receiver:
+    """
+    Receiving side of a TCPSocket, read by its FrameReader
+    """
+
+    def __init__(self, conn: 'TCPSocket'):
+        self._conn = conn
+        self._chunk = bytearray(4096)
+
+    def read_into(self, buffer: memoryview) -> int:
+        return self._conn._recv(buffer)
+
+    def read_all(self) -> bytes:
+        ret = bytearray()
+        view = memoryview(self._chunk)
+        while self._conn.sock is not None and select.select([self._conn.sock], [], [], 0)[0]:
+            n = self._conn._recv(view)
+            if not n:
+                break
+            ret += view[:n]
+        return bytes(ret)
+
+
+class TCPSocket(AbstractConnection):
+    """
+    TCP connection to a network ELM327 (WiFi adapters, or ser2net-like bridges).
+
+    The requests are sent at once (TCP_NODELAY, no Nagle delay on the short commands), the received bytes are read in
+    bulk into an internal buffer (a FrameReader). When the connection is lost, it is opened again, retries times at
+    most, waiting backoff seconds before the first try and doubling the wait up to max_backoff. A lost answer is not
+    replayed: the read raises a ConnectionResetError once the connection is back, the next commands go through.
+    """
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """
+        Timeout of the reads (in seconds, None to wait forever)
+        """
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, value: Optional[float]):
+        self._timeout = value
+        if self.sock is not None:
+            self.sock.settimeout(value)
+
+    @property
+    def name(self) -> str:
+        return f'{self.host}:{self.port}'
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: Optional[float] = None,
+                 connect_timeout: float = 5.0, retries: int = 5, backoff: float = 0.1, max_backoff: float = 5.0,
+                 buffer_size: int = 4096):
+        self.logger = logging.getLogger('MCL.TCPSocket')
+
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.sock: Optional[socket.socket] = None
+        self._timeout = timeout
+
+        self._reader = FrameReader(_Receiver(self), buffer_size)
+
+        self.connect((host, port))
+        self.logger.info("ELM327 connected!")
+
+    def connect(self, port):
+        """
+        Opens the connection to the (host, port) address.
+        """
+        self.host, self.port = port
+        self.close()
+        self.sock = socket.create_connection((self.host, self.port), self.connect_timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.settimeout(self._timeout)
+        self._reader.clear()
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def reconnect(self):
+        """
+        Opens the connection again, with exponential backoff. Raises a ConnectionError after retries failures.
+        """
+        self.close()
+        delay = self.backoff
+        for attempt in range(1, self.retries + 1):
+            time.sleep(delay)
+            try:
+                self.connect((self.host, self.port))
+                self.logger.info("Reconnected to %s (attempt %s)", self.name, attempt)
+                return
+            except OSError as e:
+                self.logger.warning("Reconnection to %s failed (attempt %s): %s", self.name, attempt, e)
+            delay = min(delay * 2, self.max_backoff)
+        raise ConnectionError(f"Connection to {self.name} lost")
+
+    def _lost(self, error: Exception):
+        self.logger.warning("Connection to %s lost: %s", self.name, error)
+        self.reconnect()
+        raise ConnectionResetError(f"Connection to {self.name} lost, the answer is lost (reconnected)") from error
+
+    def _recv(self, buffer: memoryview) -> int:
+        """
+        Receives the available bytes into the buffer (at least one, unless the read times out). Returns their number.
+        """
+        if self.sock is None:
+            self.reconnect()
+        try:
+            n = self.sock.recv_into(buffer)
+        except socket.timeout:
+            return 0
+        except OSError as e:
+            self._lost(e)
+        if not n:
+            self._lost(ConnectionResetError("closed by the adapter"))
+        return n
+
+    def read(self, size: int):
+        ret = bytes(self._reader.read(size))
+        self.logger.debug("read %s", ret)
+        return ret
+
+    def read_into(self, buffer: memoryview) -> int:
+        if self._reader.buffered:
+            n = min(len(buffer), self._reader.buffered)
+            buffer[:n] = self._reader.read(n)
+        else:
+            n = self._recv(buffer)
+        if n and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("read %s", bytes(buffer[:n]))
+        return n
+
+    def read_all(self):
+        ret = bytes(self._reader.read_all())
+        self.logger.debug("read %s", ret)
+        return ret
+
+    def read_until(self, expected: bytes = b'\n', size: Optional[int] = None):
+        ret = bytes(self._reader.read_until(expected, size))
+        self.logger.debug("read %s", ret)
+        return ret
+
+    def flush(self):
+        pass  # sendall() returns once the bytes are sent
+
+    def write(self, data: bytes):
+        self.logger.debug("writing %s", data)
+        if self.sock is None:
+            self.reconnect()
+        try:
+            self.sock.sendall(data)
+        except OSError as e:
+            # the command was not received (or partly, the adapter drops it at the next carriage return)
+            self.logger.warning("Connection to %s lost: %s", self.name, e)
+            self.reconnect()
+            self.sock.sendall(data)
+        return len(data)
+
+
+class ConnectionPool:
+    """
+    TCP connections to network adapters, shared by several clients (threads). A WiFi adapter accepts a single
+    connection: there is one per adapter, opened at its first lease and lent to one client at a time, the others wait
+    for it. The adapter keeps its state (settings, protocol) from one client to the next.
+
+    For many clients polling an adapter continuously, a single ELM327 driving it through a CommandQueue is cheaper
+    than leases.
+    """
+
+    def __init__(self, **options):
+        """
+        options are given to the TCPSocket connections (timeout, retries, backoff...).
+        """
+        self.options = options
+        self._lock = threading.Lock()
+        self._adapters: Dict[Tuple[str, int], Tuple[threading.Lock, list]] = {}  # lock, [connection or None]
+
+    @contextmanager
+    def lease(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+              timeout: Optional[float] = None) -> Iterator[TCPSocket]:
+        """
+        Lends the connection to an adapter for the time of the with block. Raises a TimeoutError if it is not free
+        after timeout seconds (None to wait forever).
+        """
+        with self._lock:
+            lock, slot = self._adapters.setdefault((host, port), (threading.Lock(), [None]))
+        if not lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError(f"Adapter {host}:{port} busy")
+        try:
+            if slot[0] is None:
+                slot[0] = TCPSocket(host, port, **self.options)
+            elif slot[0].sock is None:
+                slot[0].reconnect()
+            yield slot[0]
+        finally:
+            lock.release()
+
+    def close(self):
+        """
+        Closes the connections (the ones lent are closed when they are given back).
+        """
+        with self._lock:
+            adapters = list(self._adapters.values())
+            self._adapters.clear()
+        for lock, slot in adapters:
+            with lock:
+                if slot[0] is not None:
+                    slot[0].close()
+                    slot[0] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,11 +1,93 @@
 import logging
-from typing import Optional
+import os
+import select
+import time
+from typing import Dict, List, Optional, Tuple
 
 import serial
 from serial.tools.list_ports import comports
 
 from core.connection.abstract_conn import AbstractConnection
 
+logger = logging.getLogger('MCL.USBSerial')
+
+# latency timers of the ports before set_low_latency changed them, restored when the low latency mode is disabled
+_previous_timers: Dict[str, int] = {}
+
+
+def search_ports() -> List[Tuple[str, str]]:
+    """
+    Returns the device and the hardware reference ('FTDI' or 'CH340') of every ELM327-USB found.
+    """
+    ret = []
+    for p in comports():
+        if p.vid == 0x0403 and p.pid == 0x6001:
+            logger.debug("Found ELM327-USB (FTDI): %s", p.device)
+            ret.append((p.device, 'FTDI'))
+        elif p.vid == 0x1A86 and p.pid == 0x7523:
+            logger.debug("Found ELM327-USB (CH340): %s", p.device)
+            ret.append((p.device, 'CH340'))
+    return ret
+
+
+def search_port() -> Tuple[str, str]:
+    """
+    Returns the device and the hardware reference ('FTDI' or 'CH340') of the first ELM327-USB found.
+    """
+    ports = search_ports()
+    if not ports:
+        logger.error("No ELM327-USB found!")
+        raise ConnectionError("No ELM327-USB found!")
+    return ports[0]
+
+
+def _latency_timer_path(port: str) -> str:
+    return f'/sys/class/tty/{os.path.basename(os.path.realpath(port))}/device/latency_timer'
+
+
+def latency_timer(port: str) -> Optional[int]:
+    """
+    Latency timer (in ms) of the FTDI chip of a port, None if it has none (CH340, not Linux...)
+    """
+    try:
+        with open(_latency_timer_path(port)) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def set_low_latency(com: serial.Serial, enabled: bool = True, timer: int = 1):
+    """
+    Cuts down the time between the reception of bytes by the USB chip and their delivery to the reads (Linux): the
+    latency timer of an FTDI chip is set to timer ms (16 by default, the chip waits that long before sending a packet
+    that is not full, i.e. every short answer of an ELM327), and the ASYNC_LOW_LATENCY flag of the tty is set (the
+    received bytes are pushed to the reads at once). Disabling it restores the latency timer found when it was enabled.
+    The sysfs latency_timer file must be writable (root, or a udev rule), the failures are only logged.
+    """
+    path = _latency_timer_path(com.port)
+    before = latency_timer(com.port)
+    if before is None:
+        logger.debug("No latency timer for %s", com.port)
+    elif enabled or com.port in _previous_timers:
+        value = timer if enabled else _previous_timers[com.port]
+        try:
+            with open(path, 'w') as f:
+                f.write(str(value))
+            logger.info("Latency timer of %s: %s ms -> %s ms", com.port, before, value)
+        except OSError as e:
+            logger.warning("Latency timer of %s not set (%s ms kept): %s", com.port, before, e)
+        else:
+            if enabled:
+                _previous_timers.setdefault(com.port, before)
+            else:
+                del _previous_timers[com.port]
+
+    if hasattr(com, 'set_low_latency_mode'):
+        try:
+            com.set_low_latency_mode(enabled)
+        except ValueError as e:  # not a real serial port (e.g. a pty), or not allowed
+            logger.debug("ASYNC_LOW_LATENCY not set on %s: %s", com.port, e)
+
 
 class USBSerial(AbstractConnection):
     @property
@@ -16,14 +98,51 @@ class USBSerial(AbstractConnection):
     def baudrate(self, value):
         self.com.baudrate = value
         self._baudrate = value
-        self.logger.debug(f"Baudrate set to {value}")
+        self.logger.debug("Baudrate set to %s", value)
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """
+        Timeout of the reads (in seconds, None to wait forever)
+        """
+        return self.com.timeout
+
+    @timeout.setter
+    def timeout(self, value: Optional[float]):
+        self.com.timeout = value
 
-    def __init__(self, port=None, baudrate: int = 38400):
+    @property
+    def name(self) -> str:
+        return self.com.port
+
+    @property
+    def serial_number(self) -> Optional[str]:
+        for p in comports():
+            if p.device == self.com.port:
+                return p.serial_number
+        return None
+
+    @property
+    def latency_timer(self) -> Optional[int]:
+        """
+        Latency timer of the FTDI chip (in ms), None if it has none
+        """
+        return latency_timer(self.com.port)
+
+    def __init__(self, port=None, baudrate: int = 38400, low_latency: bool = False,
+                 buffer_size: Optional[int] = None):
+        """
+        low_latency sets the low latency mode of the port (see set_low_latency). buffer_size sets the size of the
+        driver buffers, where the OS allows it (Windows).
+        """
         self.logger = logging.getLogger('MCL.USBSerial')
 
         self._baudrate: int = baudrate
         self.com: serial.Serial = None
         self.hw_ref = None
+        self.low_latency = low_latency
+        self.buffer_size = buffer_size
+        self._fd: Optional[int] = None  # read directly (POSIX)
 
         # Connection to USB device
         if port is None:
@@ -32,40 +151,64 @@ class USBSerial(AbstractConnection):
         self.logger.info("ELM327 connected!")
 
     def _search_port(self):
-        ports = comports()
-        for p in ports:
-            if p.vid == 0x0403 and p.pid == 0x6001:
-                self.hw_ref = 'FTDI'
-                self.logger.debug(f"Found ELM327-USB (FTDI): {p.device}")
-                return p.device
-            elif p.vid == 0x1A86 and p.pid == 0x7523:
-                self.hw_ref = 'CH340'
-                self.logger.debug(f"Found ELM327-USB (CH340): {p.device}")
-                return p.device
-        self.logger.error("No ELM327-USB found!")
-        raise ConnectionError("No ELM327-USB found!")
+        port, self.hw_ref = search_port()
+        return port
 
     def connect(self, port):
         self.com = serial.Serial(port, self._baudrate)
+        if self.low_latency:
+            set_low_latency(self.com)
+        if self.buffer_size is not None:
+            if hasattr(self.com, 'set_buffer_size'):
+                self.com.set_buffer_size(rx_size=self.buffer_size, tx_size=self.buffer_size)
+            else:
+                self.logger.debug("The size of the driver buffers cannot be set on this OS")
+        self._fd = self.com.fileno() if os.name == 'posix' else None
 
     def read(self, size: int):
         ret = self.com.read(size)
-        self.logger.debug(f"read {ret}")
+        self.logger.debug("read %s", ret)
         return ret
 
+    def read_into(self, buffer: memoryview) -> int:
+        if self._fd is None:
+            ret = self.com.read(min(len(buffer), max(1, self.com.in_waiting)))
+            buffer[:len(ret)] = ret
+            self.logger.debug("read %s", ret)
+            return len(ret)
+
+        # the bytes are read straight into the buffer as soon as the port is readable (a retry only waits for the
+        # rest of the timeout)
+        timeout = self.com.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                if not select.select([self._fd], [], [], timeout)[0]:
+                    return 0
+                n = os.readv(self._fd, [buffer])
+                break
+            except (BlockingIOError, InterruptedError):
+                if deadline is not None:
+                    timeout = max(0.0, deadline - time.monotonic())
+        if not n:
+            raise serial.SerialException("The port is readable but returned no data (device disconnected?)")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("read %s", bytes(buffer[:n]))
+        return n
+
     def read_all(self):
         ret = self.com.read_all()
-        self.logger.debug(f"read {ret}")
+        self.logger.debug("read %s", ret)
         return ret
 
     def read_until(self, expected: bytes = b'\n', size: Optional[int] = None):
         ret = self.com.read_until(expected, size)
-        self.logger.debug(f"read {ret}")
+        self.logger.debug("read %s", ret)
         return ret
 
     def flush(self):
         self.com.flush()
 
     def write(self, data: bytes):
-        self.logger.debug(f"writing {data}")
+        self.logger.debug("writing %s", data)
         return self.com.write(data)
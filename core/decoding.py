@@ -0,0 +1,89 @@
+"""
+Decoding of Mode 01 PIDs by batches, with NumPy: the samples of a PID are converted into an array of data bytes and the
+SAE J1979 formulas of core.PID are applied to its columns, so decoding thousands of samples costs a few array
+operations instead of one Python call per value.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, Sequence, Tuple, Union
+
+import numpy as np
+
+from core.PID import MODE01_PID_SIZES, MODE01_PIDS
+
+# value of each ASCII hexadecimal digit, 0xFF for the other characters
+_HEX_DIGITS = np.full(256, 0xFF, dtype=np.uint8)
+_HEX_DIGITS[np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)] = np.arange(16)
+_HEX_DIGITS[np.frombuffer(b'abcdef', dtype=np.uint8)] = np.arange(10, 16)
+
+
+def hex_to_array(lines: Sequence[Union[bytes, str]]) -> np.ndarray:
+    """
+    Converts hexadecimal lines of the same length (spaces allowed, e.g. b'41 0C 1A F8') into an array of bytes, one
+    row per line.
+    """
+    if not lines:
+        return np.empty((0, 0), dtype=np.uint8)
+    rows = [(line.encode('ascii') if isinstance(line, str) else bytes(line)).translate(None, b' ') for line in lines]
+    width = len(rows[0])
+    if width % 2 or any(len(row) != width for row in rows):
+        raise ValueError("The lines do not have the same even number of hexadecimal digits")
+    text = b''.join(rows)
+
+    digits = _HEX_DIGITS[np.frombuffer(text, dtype=np.uint8)]
+    if (digits == 0xFF).any():
+        raise ValueError("The lines are not hexadecimal")
+    digits = digits.reshape(len(lines), -1)
+    return (digits[:, 0::2] << 4) | digits[:, 1::2]
+
+
+def parse_replies(pid: int, lines: Sequence[Union[bytes, str]]) -> np.ndarray:
+    """
+    Data bytes of Mode 01 replies of a PID (e.g. b'41 0C 1A F8'), one row per reply.
+    """
+    size = MODE01_PID_SIZES[pid]
+    data = hex_to_array(lines)
+    if len(lines) and (data.shape[1] != size + 2 or (data[:, 0] != 0x41).any() or (data[:, 1] != pid).any()):
+        raise ValueError(f"The lines are not replies to PID {pid:02X}")
+    return data[:, 2:]
+
+
+def decode_array(pid: int, data: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Values of the fields of a Mode 01 PID, from an array of its data bytes (one row per sample).
+    """
+    data = np.asarray(data, dtype=np.uint8)
+    if data.ndim != 2 or data.shape[1] < MODE01_PID_SIZES[pid]:
+        raise ValueError(f"PID {pid:02X} has {MODE01_PID_SIZES[pid]} data bytes per sample")
+    columns = [data[:, i].astype(np.int32) for i in range(min(data.shape[1], 4))]
+    columns += [np.zeros(len(data), dtype=np.int32)] * (4 - len(columns))
+    ret = {}
+    for field in MODE01_PIDS[pid]:
+        ret[field.name] = np.asarray(field.formula(*columns), dtype=np.float64)
+    return ret
+
+
+def decode_replies(pid: int, lines: Sequence[Union[bytes, str]]) -> Dict[str, np.ndarray]:
+    """
+    Values of the fields of a Mode 01 PID, from its replies (e.g. b'41 0C 1A F8').
+    """
+    return decode_array(pid, parse_replies(pid, lines))
+
+
+def decode_samples(samples: Iterable[Tuple[float, int, bytes]]) -> Dict[int, Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """
+    Decodes Mode 01 samples (timestamp, PID, data bytes), as given by PIDScheduler.
+    Returns, for each PID having numeric fields, the timestamps of its samples and the values of its fields.
+    Samples with a wrong number of data bytes are dropped.
+    """
+    timestamps = defaultdict(list)
+    data = defaultdict(list)
+    for timestamp, pid, value in samples:
+        if pid in MODE01_PIDS and len(value) == MODE01_PID_SIZES[pid]:
+            timestamps[pid].append(timestamp)
+            data[pid].append(value)
+
+    ret = {}
+    for pid, values in data.items():
+        array = np.frombuffer(b''.join(values), dtype=np.uint8).reshape(len(values), MODE01_PID_SIZES[pid])
+        ret[pid] = (np.array(timestamps[pid], dtype=np.float64), decode_array(pid, array))
+    return ret
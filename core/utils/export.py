@@ -0,0 +1,266 @@
+"""
+Columnar export of PID samples to Arrow record batches and Parquet files, for pandas, Polars...
+
+The table has one row per sample: adapter, time (wall-clock, UTC), timestamp (time.monotonic() of the sample), mode,
+PID and data bytes, plus a float64 column per field of the decoded PIDs (see core.PID), null on the rows of the
+other PIDs. The samples are written by chunks, so the memory used does not grow with the session.
+
+pyarrow is only needed by this module (pip install pyarrow).
+"""
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from core.PID import MODE01_PIDS, PIDField
+from core.collectors.fleet import FleetSample
+from core.collectors.pid_scheduler import Sample
+from core.decoding import decode_array
+from core.utils.recorder import SAMPLE, Recording, record_dtype
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("pyarrow is needed to export samples to Arrow or Parquet (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _fields(pids: Iterable[int]) -> List[PIDField]:
+    return [field for pid in pids if pid in MODE01_PIDS for field in MODE01_PIDS[pid]]
+
+
+def schema(pids: Iterable[int] = ()):
+    """
+    Arrow schema of the samples, with the field columns of the given Mode 01 PIDs
+    """
+    pa = _pyarrow()
+    columns = [
+        pa.field('adapter', pa.dictionary(pa.int32(), pa.string())),
+        pa.field('time', pa.timestamp('us', tz='UTC')),
+        pa.field('timestamp', pa.float64()),
+        pa.field('mode', pa.uint8()),
+        pa.field('pid', pa.uint8()),
+        pa.field('data', pa.binary()),
+    ]
+    columns += [pa.field(field.name, pa.float64(), metadata={'unit': field.unit}) for field in _fields(pids)]
+    return pa.schema(columns)
+
+
+def record_batch(records: np.ndarray, times: np.ndarray, adapter: str = '', pids: Sequence[int] = ()):
+    """
+    Arrow record batch of samples given as records of a recording (see core.utils.recorder), with their wall-clock
+    times. The fields of the given Mode 01 PIDs are decoded.
+    """
+    pa = _pyarrow()
+    n = len(records)
+
+    # data bytes: the first size bytes of each record, concatenated
+    sizes = records['size'].astype(np.int32)
+    offsets = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(sizes, out=offsets[1:])
+    data = records['data'][np.arange(records['data'].shape[1]) < sizes[:, None]]
+
+    columns = [
+        pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), pa.array([adapter])),
+        pa.array((times * 1e6).astype(np.int64), pa.timestamp('us', tz='UTC')),
+        pa.array(records['timestamp']),
+        pa.array(records['mode']),
+        pa.array(records['pid']),
+        pa.Array.from_buffers(pa.binary(), n, [None, pa.py_buffer(offsets), pa.py_buffer(data)]),
+    ]
+    for pid in pids:
+        if pid not in MODE01_PIDS:
+            continue
+        rows = (records['pid'] == pid) & (records['mode'] == 0x01)
+        if not rows.any():
+            columns += [pa.nulls(n, pa.float64())] * len(MODE01_PIDS[pid])
+            continue
+        values = decode_array(pid, records['data'][rows])
+        for field in MODE01_PIDS[pid]:
+            column = np.zeros(n)
+            column[rows] = values[field.name]
+            columns.append(pa.array(column, mask=~rows))
+    return pa.RecordBatch.from_arrays(columns, schema=schema(pids))
+
+
+class ParquetSampleWriter:
+    """
+    Writes samples (Sample, FleetSample, or records of a recording) into a Parquet file, by row groups of chunk_size
+    samples.
+    The wall-clock time of live samples is computed from their monotonic timestamp, their mode is the given one.
+    """
+
+    def __init__(self, path: str, pids: Iterable[int] = (), chunk_size: int = 65_536, compression: str = 'zstd',
+                 data_size: int = 12, mode: int = 0x01):
+        pa = _pyarrow()
+        self.logger = logging.getLogger('MCL.ParquetSampleWriter')
+
+        self.path = path
+        self.pids = [pid for pid in dict.fromkeys(pids) if pid in MODE01_PIDS]
+        self.chunk_size = chunk_size
+        self.mode = mode
+        self.rows = 0
+
+        self._dtype = record_dtype(data_size)
+        self._writer = pa.parquet.ParquetWriter(path, schema(self.pids), compression=compression)
+        self._pending: Dict[str, List[Sample]] = defaultdict(list)
+        self._count = 0
+        self._clock = time.time() - time.monotonic()
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of live samples not written yet
+        """
+        return self._count
+
+    def write(self, samples: Iterable[Union[Sample, FleetSample]], adapter: str = ''):
+        """
+        Writes live samples. The adapter of a FleetSample is its own, else the given one.
+        """
+        for sample in samples:
+            if len(sample) == 4:
+                self._pending[sample[0]].append(sample[1:])
+            else:
+                self._pending[adapter].append(sample)
+            self._count += 1
+            if self._count >= self.chunk_size:
+                self.flush()
+
+    def write_records(self, records: np.ndarray, times: np.ndarray, adapter: str = ''):
+        """
+        Writes records of a recording, with their wall-clock times.
+        """
+        for start in range(0, len(records), self.chunk_size):
+            stop = start + self.chunk_size
+            self._write_batch(record_batch(records[start:stop], times[start:stop], adapter, self.pids))
+
+    def flush(self):
+        """
+        Writes the pending live samples.
+        """
+        size = self._dtype['data'].shape[0]
+        for adapter, samples in self._pending.items():
+            if not samples:
+                continue
+            records = np.zeros(len(samples), dtype=self._dtype)
+            records['timestamp'] = [s[0] for s in samples]
+            records['mode'] = self.mode
+            records['pid'] = [s[1] for s in samples]
+            records['size'] = [min(len(s[2]), size) for s in samples]
+            data = b''.join(bytes(s[2][:size]).ljust(size, b'\x00') for s in samples)
+            records['data'] = np.frombuffer(data, dtype=np.uint8).reshape(len(samples), size)
+            self._write_batch(record_batch(records, records['timestamp'] + self._clock, adapter, self.pids))
+        self._pending.clear()
+        self._count = 0
+
+    def _write_batch(self, batch):
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+        self.logger.info("%s samples written to %s", self.rows, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class RollingParquetWriter:
+    """
+    Writes live samples into a series of Parquet files, a new one being started every max_rows samples or every
+    max_seconds seconds. The files are named <prefix>_<date>_<number>.parquet in the given directory.
+    The pending samples are written at least every flush_interval seconds, so a file never lags much behind the poller.
+    """
+
+    def __init__(self, directory: str, prefix: str = 'session', pids: Iterable[int] = (), max_rows: int = 1_000_000,
+                 max_seconds: Optional[float] = None, flush_interval: float = 60.0, **kwargs):
+        self.directory = directory
+        self.prefix = prefix
+        self.pids = list(pids)
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.flush_interval = flush_interval
+        self._kwargs = kwargs
+
+        self.paths: List[str] = []
+        self._writer: Optional[ParquetSampleWriter] = None
+        self._opened = 0.0
+        self._flushed = 0.0
+
+    def _open(self):
+        s = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        path = os.path.join(self.directory, f'{self.prefix}_{s}_{len(self.paths):04d}.parquet')
+        self._writer = ParquetSampleWriter(path, self.pids, **self._kwargs)
+        self.paths.append(path)
+        self._opened = self._flushed = time.monotonic()
+
+    def write(self, samples: Iterable[Union[Sample, FleetSample]], adapter: str = ''):
+        """
+        Writes live samples, e.g. PIDScheduler.samples() or ELM327Fleet.samples() (until they end).
+        """
+        for sample in samples:
+            if self._writer is None:
+                self._open()
+            self._writer.write((sample,), adapter)
+
+            now = time.monotonic()
+            if now - self._flushed >= self.flush_interval:
+                self._writer.flush()
+                self._flushed = now
+            if self._writer.rows + self._writer.pending >= self.max_rows or \
+                    (self.max_seconds is not None and now - self._opened >= self.max_seconds):
+                self._writer.close()
+                self._writer = None
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def export_recording(recording: Union[str, Recording], path: str, adapter: str = '',
+                     pids: Optional[Iterable[int]] = None, chunk_size: int = 1 << 20, **kwargs) -> int:
+    """
+    Exports a recording (see core.utils.recorder) into a Parquet file, chunk by chunk.
+    The fields of the given Mode 01 PIDs are decoded (by default, of all the PIDs recorded).
+    Returns the number of samples written.
+    """
+    if not isinstance(recording, str):
+        return _export(recording, path, adapter, pids, chunk_size, **kwargs)
+    with Recording(recording) as rec:
+        return _export(rec, path, adapter, pids, chunk_size, **kwargs)
+
+
+def _export(rec: Recording, path: str, adapter: str, pids: Optional[Iterable[int]], chunk_size: int, **kwargs) -> int:
+    records = rec.records
+    if pids is None:
+        found = set()
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            found.update(np.unique(chunk['pid'][(chunk['kind'] == SAMPLE) & (chunk['mode'] == 0x01)]).tolist())
+        pids = sorted(found)
+
+    with ParquetSampleWriter(path, pids, chunk_size=chunk_size, data_size=rec.data_size, **kwargs) as writer:
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            chunk = chunk[chunk['kind'] == SAMPLE]
+            writer.write_records(chunk, rec.wall_times(chunk['timestamp']), adapter)
+    return writer.rows
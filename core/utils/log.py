@@ -1,14 +1,87 @@
+import atexit
 import logging
+import queue
+import threading
+import time
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 
 console_h: Optional[logging.StreamHandler] = None
+listener: Optional[QueueListener] = None
 
+# loggers tracing every read and write of the connections
+IO_LOGGERS = ('MCL.USBSerial', 'MCL.AsyncUSBSerial', 'MCL.TCPSocket')
 
-def setup_log():
-    global console_h
+
+class IOTraceFilter(logging.Filter):
+    """
+    Limits the I/O traces (DEBUG records) of a logger: only one record out of sample is kept, and at most rate records
+    per second. The next kept record tells how many were dropped.
+    """
+
+    def __init__(self, sample: int = 1, rate: Optional[float] = None):
+        super().__init__()
+        self.sample = sample
+        self.rate = rate
+
+        self._lock = threading.Lock()
+        self._seen = 0
+        self._dropped = 0
+        self._tokens = rate or 0.0
+        self._last = time.monotonic()
+
+    def _keep(self) -> bool:
+        self._seen += 1
+        if self._seen % self.sample:
+            return False
+        if self.rate is None:
+            return True
+        # token bucket, allowing bursts of one second of traces
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        with self._lock:
+            if not self._keep():
+                self._dropped += 1
+                return False
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            record.msg = f"{record.msg} (%d traces dropped)"
+            record.args = (record.args or ()) + (dropped,)
+        return True
+
+
+class _LazyQueueHandler(QueueHandler):
+    """
+    QueueHandler leaving the formatting of the records to the listener thread.
+    The arguments of the log calls must not be modified after the calls.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_log(level: int = logging.DEBUG, queued: bool = False, io_sample: int = 1,
+              io_rate: Optional[float] = None):
+    """
+    Logs the MCL messages of the given level into a debug_<date>.log file, and the warnings on the console.
+
+    With queued, the records are only put in a queue by the logging threads; they are formatted and written by a
+    background thread (stopped at exit, or by stop_log()). io_sample and io_rate limit the I/O traces of the
+    connections (see IOTraceFilter), so the debug file can stay enabled at high poll rates.
+    """
+    global console_h, listener
     logger = logging.getLogger('MCL')
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(level)
 
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
 
@@ -21,8 +94,29 @@ def setup_log():
     console_h.setLevel(logging.WARNING)
     console_h.setFormatter(formatter)
 
-    logger.addHandler(debugfile_fh)
-    logger.addHandler(console_h)
+    if queued:
+        records = queue.SimpleQueue()
+        listener = QueueListener(records, debugfile_fh, console_h, respect_handler_level=True)
+        listener.start()
+        atexit.register(stop_log)
+        logger.addHandler(_LazyQueueHandler(records))
+    else:
+        logger.addHandler(debugfile_fh)
+        logger.addHandler(console_h)
+
+    if io_sample > 1 or io_rate is not None:
+        for name in IO_LOGGERS:
+            logging.getLogger(name).addFilter(IOTraceFilter(io_sample, io_rate))
+
+
+def stop_log():
+    """
+    Writes the records still queued and stops the background thread of a queued log.
+    """
+    global listener
+    if listener is not None:
+        listener.stop()
+        listener = None
 
 
 def set_console_log_level(lvl):
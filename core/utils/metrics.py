@@ -0,0 +1,249 @@
+"""
+Metrics of the drivers: counters and histograms, grouped in a registry that can be read in-process (snapshot()) or
+exported in the Prometheus text format (prometheus(), serve()).
+
+The metrics are updated without lock: each one must be updated by a single thread (an adapter is driven by one
+thread), reading them from other threads is safe.
+"""
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# upper bounds (in seconds) of the latency histograms
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+
+class Histogram:
+    """
+    Distribution of values in buckets given by their upper bounds (the last bucket has no bound)
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Estimation of a percentile (0-100), by linear interpolation in its bucket
+        """
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return low + (high - low) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class Registry:
+    """
+    Metrics by name and labels
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._metrics: Dict[str, Dict[Labels, object]] = {}
+        self.start = time.monotonic()
+
+    def _get(self, kind: str, name: str, help_: str, labels: Dict[str, str], factory):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._help.setdefault(name, (kind, help_))
+            metrics = self._metrics.setdefault(name, {})
+            if key not in metrics:
+                metrics[key] = factory()
+            return metrics[key]
+
+    def counter(self, name: str, help_: str = '', **labels: str) -> Counter:
+        return self._get('counter', name, help_, labels, Counter)
+
+    def histogram(self, name: str, help_: str = '', buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+                  **labels: str) -> Histogram:
+        return self._get('histogram', name, help_, labels, lambda: Histogram(buckets))
+
+    def _items(self) -> List[Tuple[str, str, str, List[Tuple[Labels, object]]]]:
+        with self._lock:
+            return [(name, *self._help[name], list(metrics.items())) for name, metrics in self._metrics.items()]
+
+    def snapshot(self) -> Dict[str, List[dict]]:
+        """
+        Current values: for each metric name, the labels and value of a counter, or the labels, count, sum and
+        percentiles of a histogram
+        """
+        ret = {}
+        for name, kind, _, metrics in self._items():
+            values = []
+            for labels, metric in metrics:
+                value = {'labels': dict(labels)}
+                if kind == 'counter':
+                    value['value'] = metric.value
+                else:
+                    value.update(count=metric.count, sum=metric.sum,
+                                 **{f'p{p}': metric.percentile(p) for p in (50, 90, 99)})
+                values.append(value)
+            ret[name] = values
+        return ret
+
+    def prometheus(self) -> str:
+        """
+        Current values in the Prometheus text exposition format
+        """
+        def fmt(labels, extra=()):
+            labels = tuple(labels) + tuple(extra)
+            if not labels:
+                return ''
+            return '{' + ','.join('%s="%s"' % (k, str(v).replace('\\', r'\\').replace('"', r'\"'))
+                                  for k, v in labels) + '}'
+
+        lines = []
+        for name, kind, help_, metrics in self._items():
+            lines.append(f'# HELP {name} {help_}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, metric in metrics:
+                if kind == 'counter':
+                    lines.append(f'{name}{fmt(labels)} {metric.value}')
+                    continue
+                total = 0
+                for bound, n in zip(metric.buckets + (float('inf'),), metric.counts):
+                    total += n
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{fmt(labels, (("le", le),))} {total}')
+                lines.append(f'{name}_sum{fmt(labels)} {metric.sum}')
+                lines.append(f'{name}_count{fmt(labels)} {metric.count}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int = 9100, host: str = '') -> ThreadingHTTPServer:
+        """
+        Serves the metrics for Prometheus (GET /metrics) in a background thread. Stop it with shutdown().
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='MCL-metrics', daemon=True).start()
+        return server
+
+
+# registry used by default by the drivers
+REGISTRY = Registry()
+
+
+class AdapterMetrics:
+    """
+    Metrics of an adapter (labelled by its name): link traffic, commands and their latency, split into the time spent
+    waiting for the adapter and the time spent in Python, and the errors and status lines answered.
+    """
+
+    def __init__(self, adapter: str, registry: Registry = REGISTRY):
+        self.adapter = adapter
+        self.registry = registry
+
+        self.bytes_read = registry.counter('mcl_bytes_read_total', "Bytes received from the adapter", adapter=adapter)
+        self.bytes_written = registry.counter('mcl_bytes_written_total', "Bytes sent to the adapter", adapter=adapter)
+        self.reads = registry.counter('mcl_reads_total', "Reads of the connection", adapter=adapter)
+        self.timeouts = registry.counter('mcl_read_timeouts_total', "Reads that timed out", adapter=adapter)
+        self.wait_seconds = registry.counter('mcl_adapter_wait_seconds_total', "Time spent waiting for the adapter",
+                                             adapter=adapter)
+        self.host_seconds = registry.counter('mcl_host_seconds_total', "Time spent in Python by the commands",
+                                             adapter=adapter)
+        self._commands: Dict[str, Tuple[Counter, Histogram]] = {}
+        self._answers: Dict[str, Counter] = {}
+        # the rates of summary() are the ones of this adapter since its metrics were created (the registry may be older,
+        # and hold the counts of a previous connection with the same name)
+        self.start = time.monotonic()
+        self._commands_before: Dict[str, int] = {}
+
+    def read(self, size: int, seconds: float):
+        self.reads.inc()
+        self.wait_seconds.inc(seconds)
+        if size:
+            self.bytes_read.inc(size)
+        else:
+            self.timeouts.inc()
+
+    def written(self, size: int):
+        self.bytes_written.inc(size)
+
+    def command(self, kind: str, seconds: float, wait: float):
+        """
+        Records a command (kind 'at' or 'obd'), its duration and the part of it spent waiting for the adapter
+        """
+        if kind not in self._commands:
+            self._commands[kind] = (
+                self.registry.counter('mcl_commands_total', "Commands sent", adapter=self.adapter, kind=kind),
+                self.registry.histogram('mcl_command_seconds', "Duration of the commands", adapter=self.adapter,
+                                        kind=kind))
+            self._commands_before[kind] = self._commands[kind][0].value
+        counter, histogram = self._commands[kind]
+        counter.inc()
+        histogram.observe(seconds)
+        self.host_seconds.inc(max(0.0, seconds - wait))
+
+    def answer(self, line: str):
+        """
+        Records an error or status line answered by the adapter ('?', 'NO DATA', 'BUS INIT: ...'...)
+        """
+        if line not in self._answers:
+            self._answers[line] = self.registry.counter('mcl_answers_total', "Error and status lines answered",
+                                                        adapter=self.adapter, answer=line)
+        self._answers[line].inc()
+
+    def summary(self) -> dict:
+        """
+        Overview of the adapter: commands per second, latency percentiles, traffic, errors and time split
+        """
+        elapsed = time.monotonic() - self.start
+        commands = {}
+        for kind, (counter, histogram) in self._commands.items():
+            commands[kind] = {'count': counter.value,
+                              'per_second': (counter.value - self._commands_before[kind]) / elapsed,
+                              **{f'p{p}': histogram.percentile(p) for p in (50, 90, 99)}}
+        return {
+            'adapter': self.adapter,
+            'commands': commands,
+            'bytes_read': self.bytes_read.value,
+            'bytes_written': self.bytes_written.value,
+            'timeouts': self.timeouts.value,
+            'answers': {line: counter.value for line, counter in self._answers.items()},
+            'adapter_wait_seconds': self.wait_seconds.value,
+            'host_seconds': self.host_seconds.value,
+        }
@@ -0,0 +1,227 @@
+"""
+Binary recording of PID samples.
+
+A recording is an append-only file of fixed-width records, so that it can be memory-mapped and read as a NumPy array.
+Every index_interval records, an index record (kind INDEX) holds the wall-clock time at which it was written: the last
+record of each block gives the time range of the block, so seeking by time only touches the index records and one
+block. The timestamps of the samples must not decrease (they are the time.monotonic() values of the PIDScheduler).
+The timestamps of a session appending to an existing recording are moved onto the clock of the session that created it,
+through the wall clock (time.monotonic() starts again at each boot), so that they stay sorted.
+
+Layout (little-endian): a header of HEADER_SIZE bytes (magic, version, data size, index interval, monotonic and
+wall-clock times of the creation) followed by the records (timestamp float64, kind, mode, PID and size uint8, data).
+"""
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from core.collectors.pid_scheduler import Sample
+from core.decoding import decode_array
+
+MAGIC = b'MCLR'
+VERSION = 1
+HEADER_SIZE = 32
+_HEADER = struct.Struct('<4sHHIdd')
+
+# kinds of records
+SAMPLE = 0
+INDEX = 1
+
+
+def record_dtype(data_size: int) -> np.dtype:
+    """
+    NumPy type of the records of a recording
+    """
+    return np.dtype([('timestamp', '<f8'), ('kind', 'u1'), ('mode', 'u1'), ('pid', 'u1'), ('size', 'u1'),
+                     ('data', 'u1', (data_size,))])
+
+
+class Recorder:
+    """
+    Appends PID samples to a recording (created if needed).
+    The records are buffered by the file object, and flushed at each index record.
+    """
+
+    def __init__(self, path: str, data_size: int = 12, index_interval: int = 1024):
+        self.logger = logging.getLogger('MCL.Recorder')
+        if data_size < 8:
+            raise ValueError("The data size must be at least 8 bytes (the index records hold a float64)")
+        if index_interval < 2:
+            raise ValueError("There must be at least one sample between two index records")
+
+        self.path = path
+        self._file = open(path, 'ab+')
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() == 0:
+            self.data_size = data_size
+            self.index_interval = index_interval
+            self._file.write(_HEADER.pack(MAGIC, VERSION, data_size, index_interval, time.monotonic(),
+                                          time.time()).ljust(HEADER_SIZE, b'\x00'))
+            # added to the timestamps written
+            self.clock_offset = 0.0
+        else:
+            self._file.seek(0)
+            magic, version, self.data_size, self.index_interval, start_monotonic, start_time = _HEADER.unpack(
+                self._file.read(_HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a recording")
+            self._file.seek(0, os.SEEK_END)
+            self.clock_offset = (time.time() - time.monotonic()) - (start_time - start_monotonic)
+
+        self._record = struct.Struct(f'<dBBBB{self.data_size}s')
+        size = self._file.tell() - HEADER_SIZE
+        if size % self._record.size:
+            # the end of the last record was not written (crash), it is overwritten
+            self.logger.warning("Truncated record at the end of %s", path)
+            self._file.truncate(HEADER_SIZE + size - size % self._record.size)
+            self._file.seek(0, os.SEEK_END)
+        self._count = size // self._record.size
+        self._last = float('-inf')  # timestamp of the last record
+        if self._count:
+            self._file.seek(HEADER_SIZE + (self._count - 1) * self._record.size)
+            self._last, = struct.unpack('<d', self._file.read(8))
+            self._file.seek(0, os.SEEK_END)
+
+    def write(self, timestamp: float, pid: int, data: bytes, mode: int = 0x01):
+        """
+        Appends a sample. Its data is truncated to the data size of the recording. Raises a ValueError if its timestamp
+        (moved by clock_offset) is before the one of the last sample.
+        """
+        timestamp += self.clock_offset
+        if timestamp < self._last:
+            raise ValueError(f"Timestamp {timestamp} before the last one recorded ({self._last})")
+        self._last = timestamp
+        size = min(len(data), self.data_size)
+        self._file.write(self._record.pack(timestamp, SAMPLE, mode, pid, size, bytes(data[:size])))
+        self._count += 1
+        if self._count % self.index_interval == self.index_interval - 1:
+            self._file.write(self._record.pack(timestamp, INDEX, 0, 0, 8, struct.pack('<d', time.time())))
+            self._count += 1
+            self._file.flush()
+
+    def record(self, samples: Iterable[Sample], mode: int = 0x01) -> int:
+        """
+        Appends samples (as given by PIDScheduler.samples()). Returns their number.
+        """
+        n = 0
+        for timestamp, pid, data in samples:
+            self.write(timestamp, pid, data, mode)
+            n += 1
+        return n
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class Recording:
+    """
+    Memory-mapped recording. The records are read through NumPy views of the file, nothing is loaded up-front.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.data_size, self.index_interval, self.start_monotonic, self.start_time = \
+            _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a recording")
+
+        dtype = record_dtype(self.data_size)
+        count = (len(self._mmap) - HEADER_SIZE) // dtype.itemsize  # a truncated last record is ignored
+        self.records: np.ndarray = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=HEADER_SIZE)
+        # last record of each complete block, an index record
+        self._index = self.records[self.index_interval - 1::self.index_interval]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def seek(self, timestamp: float) -> int:
+        """
+        Position of the first record whose timestamp is not before the given one.
+        """
+        block = int(np.searchsorted(self._index['timestamp'], timestamp, side='left'))
+        start = block * self.index_interval
+        stop = min(start + self.index_interval, len(self.records))
+        return start + int(np.searchsorted(self.records['timestamp'][start:stop], timestamp, side='left'))
+
+    def between(self, start: Optional[float] = None, stop: Optional[float] = None) -> np.ndarray:
+        """
+        View of the records whose timestamp is in [start, stop[ (index records included).
+        """
+        first = 0 if start is None else self.seek(start)
+        last = len(self.records) if stop is None else self.seek(stop)
+        return self.records[first:last]
+
+    def pid(self, pid: int, start: Optional[float] = None, stop: Optional[float] = None, mode: int = 0x01) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Timestamps and data bytes (one row per sample) of a PID between two times.
+        """
+        records = self._select(pid, start, stop, mode)
+        size = int(records['size'].max()) if len(records) else 0
+        return records['timestamp'], records['data'][:, :size]
+
+    def decode(self, pid: int, start: Optional[float] = None, stop: Optional[float] = None) \
+            -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Timestamps and values of the fields of a Mode 01 PID between two times (see core.decoding).
+        """
+        records = self._select(pid, start, stop, 0x01)
+        return records['timestamp'], decode_array(pid, records['data'])
+
+    def _select(self, pid: int, start: Optional[float], stop: Optional[float], mode: int) -> np.ndarray:
+        records = self.between(start, stop)
+        return records[(records['kind'] == SAMPLE) & (records['pid'] == pid) & (records['mode'] == mode)]
+
+    def wall_time(self, timestamp: float) -> float:
+        """
+        Wall-clock time (time.time()) of a sample timestamp, using the nearest index record before it.
+        """
+        return float(self.wall_times(np.array([timestamp]))[0])
+
+    def wall_times(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Wall-clock times of an array of sample timestamps (see wall_time).
+        """
+        # offset between the two clocks at the creation, then at each index record
+        offsets = np.empty(len(self._index) + 1)
+        offsets[0] = self.start_time - self.start_monotonic
+        offsets[1:] = self._index['data'][:, :8].copy().view('<f8')[:, 0] - self._index['timestamp']
+        blocks = np.searchsorted(self._index['timestamp'], timestamps, side='right')
+        return timestamps + offsets[blocks]
+
+    def samples(self, start: Optional[float] = None, stop: Optional[float] = None) -> Iterator[Sample]:
+        """
+        Yields the samples between two times, as PIDScheduler does.
+        """
+        for timestamp, kind, _, pid, size, data in self.between(start, stop).tolist():
+            if kind == SAMPLE:
+                yield Sample(timestamp, pid, bytes(data[:size]))
+
+    def close(self):
+        """
+        Unmaps the file. The views handed out must have been released.
+        """
+        self.records = self._index = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
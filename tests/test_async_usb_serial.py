@@ -0,0 +1,30 @@
+import asyncio
+import os
+import pty
+import tty
+
+import pytest
+import serial
+
+from core.connection.async_usb_serial import AsyncUSBSerial
+
+
+def test_read_raises_when_the_device_disappears():
+    async def run():
+        master, slave = pty.openpty()
+        tty.setraw(slave)
+        conn = AsyncUSBSerial(os.ttyname(slave))
+        await conn.connect()
+        try:
+            os.write(master, b'OK\r>')
+            assert await conn.read_until(b'>') == b'OK\r>'
+            read = asyncio.ensure_future(conn.read(1))
+            await asyncio.sleep(0.05)
+            os.close(master)  # hang-up: the port stays readable, with no data
+            with pytest.raises(serial.SerialException):
+                await asyncio.wait_for(read, 2)
+        finally:
+            conn.close()
+            os.close(slave)
+
+    asyncio.run(run())
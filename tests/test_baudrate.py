@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from core.collectors.AsyncELM327 import AsyncELM327
+from core.collectors.ELM327 import ELM327
+from core.connection.async_usb_serial import AsyncUSBSerial
+from core.connection.simulator import PtyELM327Simulator
+from core.connection.usb_serial import USBSerial
+from core.utils.metrics import Registry
+
+
+@pytest.fixture
+def sims():
+    sims = []
+    yield lambda **kwargs: sims.append(PtyELM327Simulator(**kwargs)) or sims[-1]
+    for sim in sims:
+        sim.close()
+
+
+def test_negotiated_per_adapter(sims, monkeypatch):
+    monkeypatch.setattr(ELM327, 'negotiated_baudrates', {})
+    fast, slow = sims(), sims(max_baudrate=115_200)
+    # identical adapters (same AT I string, no serial number) on two ports
+    elm_fast = ELM327(USBSerial(fast.port), registry=Registry())
+    elm_slow = ELM327(USBSerial(slow.port), registry=Registry())
+    assert elm_fast.negotiate_baudrate(probes=2) == ELM327.BAUD500K
+    assert elm_slow.negotiate_baudrate(probes=2) == ELM327.BAUD115_2K
+    assert ELM327.negotiated_baudrates == {(b'ELM327 v1.5', fast.port): ELM327.BAUD500K,
+                                           (b'ELM327 v1.5', slow.port): ELM327.BAUD115_2K}
+
+
+def test_async_set_baudrate(sims):
+    sim = sims(max_baudrate=115_200)
+
+    async def run():
+        conn = AsyncUSBSerial(sim.port)
+        await conn.connect()
+        try:
+            elm = AsyncELM327(conn)
+            await elm.connect()
+            await elm.set_baudrate(elm.BAUD57_6K)
+            assert elm._baudrate == conn.baudrate == 57_600
+            assert await elm.send_command(b'AT I') == b'ELM327 v1.5'
+
+            # the adapter cannot run at 500 kbauds: the handshake fails, the adapter goes back to 57600 bauds
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(elm.set_baudrate(elm.BAUD500K), 5)
+            assert elm._baudrate == conn.baudrate == 57_600
+            assert await elm.send_command(b'AT I') == b'ELM327 v1.5'
+        finally:
+            conn.close()
+
+    asyncio.run(run())
@@ -0,0 +1,22 @@
+import json
+
+from benchmarks.elm327 import PIDS, main
+from core.collectors.ELM327 import ELM327
+
+
+def test_sim_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(ELM327, 'negotiated_baudrates', {})
+    path = tmp_path / 'results.json'
+    main(['--backend', 'sim', '--iterations', '12', '--output', str(path)])
+
+    report = json.loads(path.read_text())
+    assert report['parameters']['backend'] == 'sim'
+    results = report['results']
+    # negotiated above the default 38400 baud
+    assert results['baudrate'] > 38400
+    assert set(results['connect']) == {'reset_to_ready', 'reconnect'}
+    for name in ('send_command', 'query_single', 'pids_single', 'pids_batched', 'pids_queued'):
+        latency = results[name]['latency']
+        assert 0 < latency['min'] <= latency['p50'] <= latency['max']
+        assert results[name]['per_second'] > 0
+    assert results['pids_batched']['pids_per_second'] == results['pids_batched']['per_second'] * len(PIDS)
@@ -0,0 +1,44 @@
+from core.collectors.ELM327 import ELM327
+from core.collectors.capabilities import CapabilityCache
+from core.connection.simulator import ELM327Simulator
+from core.utils.metrics import Registry
+
+
+def test_known_vehicle_protocol_not_stored(tmp_path):
+    cache = CapabilityCache(str(tmp_path / 'capabilities.json'))
+    sim = ELM327Simulator()
+    ELM327(sim, registry=Registry(), cache=cache)
+
+    elm = ELM327(sim, registry=Registry(), cache=cache)
+    assert elm.vin == 'VF1AB000123456789'
+    assert elm.protocol == 6
+    assert sim._stored_protocol == 0  # AT SP would write the adapter's default protocol
+
+
+def test_vehicle_changed(tmp_path):
+    cache = CapabilityCache(str(tmp_path / 'capabilities.json'))
+    sim = ELM327Simulator()
+    ELM327(sim, registry=Registry(), cache=cache)
+
+    sim.vin = 'WVWZZZ1JZXW000001'
+    sim.vehicle_protocol = 7
+    elm = ELM327(sim, registry=Registry(), cache=cache)
+    assert elm.vin == 'WVWZZZ1JZXW000001'
+    assert elm.protocol == 7
+    assert sim._stored_protocol == 0
+
+
+def test_known_baudrate_not_usable(tmp_path, monkeypatch):
+    monkeypatch.setattr(ELM327, 'negotiated_baudrates', {})
+    path = str(tmp_path / 'capabilities.json')
+    elm = ELM327(ELM327Simulator(), registry=Registry(), cache=CapabilityCache(path))
+    assert elm.negotiate_baudrate(probes=2) == ELM327.BAUD500K
+
+    # same adapter on a link that cannot run at 500 kbauds
+    ELM327.negotiated_baudrates.clear()
+    for _ in range(2):
+        elm = ELM327(ELM327Simulator(max_baudrate=115_200), registry=Registry(), cache=CapabilityCache(path))
+        assert elm.baudrate == 38_400
+        assert elm.vin == 'VF1AB000123456789'
+        assert 'baudrate' not in CapabilityCache(path).adapter(elm._cache_key)
+        assert ELM327.negotiated_baudrates == {}
@@ -0,0 +1,33 @@
+from core.collectors.ELM327 import ELM327
+from core.collectors.command_queue import CommandQueue
+from core.connection.simulator import DEFAULT_PIDS, ELM327Simulator
+from core.utils.metrics import Registry
+
+
+def make(**kwargs):
+    return ELM327(ELM327Simulator(**kwargs), registry=Registry())
+
+
+def test_answers_in_order():
+    elm = make(latency=0.002)
+    with CommandQueue(elm) as q:
+        futures = [q.query(0x01, pid) for pid in (0x0C, 0x0D, 0x0C)]
+        dpn = q.submit(b'AT DPN')
+        last = q.query(0x01, 0x0F)
+        # the queue owns the link while it runs: everything goes through it
+        assert [f.result(5) for f in futures] == [DEFAULT_PIDS[0x0C], DEFAULT_PIDS[0x0D], DEFAULT_PIDS[0x0C]]
+        assert dpn.result(5) == b'A6'
+        assert last.result(5) == DEFAULT_PIDS[0x0F]
+
+
+def test_repeat():
+    elm = make()
+    expected = elm.send_request(b'010C')
+    with CommandQueue(elm) as q:
+        assert q.map([b'010C'] * 3 + [b'AT DPN', b'010C']) == [expected] * 3 + [b'A6', expected]
+    # the first request written in full, and the one after the AT command
+    assert q.repeated == 2
+
+    with CommandQueue(elm, repeat=False) as q:
+        q.map([b'010C'] * 3)
+    assert q.repeated == 0
@@ -0,0 +1,50 @@
+import pytest
+
+from core.collectors.ELM327 import ELM327
+from core.connection.simulator import ELM327Simulator
+from core.utils.metrics import Registry
+
+# 4 DTC: the answers of Modes 03/07/0A span several frames
+DTCS = [0x0133, 0xC155, 0x1000, 0x0300]
+CODES = ['P0133', 'U0155', 'P1000', 'P0300']
+
+
+def codes(ecus):
+    return [[code for code, _ in dtcs] for dtcs in ecus]
+
+
+@pytest.mark.parametrize('mode', ELM327.DTC_MODES)
+@pytest.mark.parametrize('headers', [False, True], ids=['headers-off', 'headers-on'])
+def test_read_dtcs(mode, headers):
+    elm = ELM327(ELM327Simulator(dtcs=DTCS), registry=Registry())
+    if headers:
+        elm.send_command(b'AT H1')
+    dtcs = elm.read_dtcs(mode)
+    assert codes(dtcs) == [CODES]
+    assert all(description for _, description in dtcs[0])
+
+
+@pytest.mark.parametrize('headers', [False, True], ids=['headers-off', 'headers-on'])
+def test_read_dtcs_several_ecus(headers):
+    elm = ELM327(ELM327Simulator(dtcs=DTCS, ecus=2), registry=Registry())
+    if headers:
+        elm.send_command(b'AT H1')
+    assert codes(elm.read_dtcs(0x07)) == [CODES, CODES]
+
+
+def test_read_no_dtcs():
+    elm = ELM327(ELM327Simulator(), registry=Registry())
+    assert elm.read_dtcs() == [[]]
+
+
+def test_scan_dtcs():
+    elm = ELM327(ELM327Simulator(dtcs=DTCS[:1]), registry=Registry())
+    dtcs = elm.scan_dtcs()
+    assert list(dtcs) == list(ELM327.DTC_MODES)
+    assert all(codes(ecus) == [CODES[:1]] for ecus in dtcs.values())
+
+
+def test_read_dtcs_caf_off():
+    # without the automatic formatting, the request lacks its PCI byte: the ECU ignores it
+    elm = ELM327(ELM327Simulator(dtcs=DTCS), registry=Registry(), settings={b'CAF': b'0'})
+    assert elm.read_dtcs() == []
@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from core.collectors.fleet import FleetSample  # noqa: E402
+from core.collectors.pid_scheduler import Sample  # noqa: E402
+from core.utils.export import ParquetSampleWriter, RollingParquetWriter, export_recording  # noqa: E402
+from core.utils.recorder import SAMPLE, Recorder, Recording  # noqa: E402
+
+
+def samples(count):
+    """
+    count samples alternating the engine speed (0C) and the vehicle speed (0D)
+    """
+    start = time.monotonic()
+    return [Sample(start + i, 0x0C, bytes((0x0B, 0xB8 + i))) if i % 2 == 0 else Sample(start + i, 0x0D, bytes((i,)))
+            for i in range(count)]
+
+
+def test_sample_writer(tmp_path):
+    path = str(tmp_path / 'samples.parquet')
+    live = samples(5)
+    with ParquetSampleWriter(path, pids=[0x0C, 0x0D, 0x0C], chunk_size=4) as writer:
+        writer.write(live, adapter='car')
+        writer.write([FleetSample('truck', live[-1].timestamp + 1, 0x0D, b'\x50')])
+        assert writer.pending == 2
+
+    assert writer.rows == 6
+    # a row group per chunk of 4 samples, then one per adapter of the samples pending at the close
+    assert pq.ParquetFile(path).metadata.num_row_groups == 3
+    table = pq.read_table(path).to_pydict()
+    assert table['adapter'] == ['car'] * 5 + ['truck']
+    assert table['mode'] == [0x01] * 6
+    assert table['pid'] == [0x0C, 0x0D, 0x0C, 0x0D, 0x0C, 0x0D]
+    assert table['data'] == [s.data for s in live] + [b'\x50']
+    assert table['timestamp'] == [s.timestamp for s in live] + [live[-1].timestamp + 1]
+    assert table['engine_speed'] == [750.0, None, 750.5, None, 751.0, None]
+    assert table['vehicle_speed'] == [None, 1.0, None, 3.0, None, 80.0]
+    # wall-clock times: the monotonic timestamps moved to the epoch
+    wall = time.time() - time.monotonic() + live[0].timestamp
+    assert abs(table['time'][0].timestamp() - wall) < 1
+
+
+def test_sample_writer_schema(tmp_path):
+    path = str(tmp_path / 'samples.parquet')
+    # unknown PIDs have no field column, all the rows of a PID never sampled are null
+    with ParquetSampleWriter(path, pids=[0x0C, 0x05, 0xFF]) as writer:
+        writer.write(samples(1))
+
+    table = pq.read_table(path)
+    assert table.schema.names == ['adapter', 'time', 'timestamp', 'mode', 'pid', 'data', 'engine_speed',
+                                  'coolant_temperature']
+    assert table.schema.field('engine_speed').metadata == {b'unit': b'rpm'}
+    assert table.column('coolant_temperature').null_count == 1
+
+
+def test_rolling_writer(tmp_path):
+    live = samples(10)
+    with RollingParquetWriter(str(tmp_path), prefix='drive', pids=[0x0C], max_rows=4) as writer:
+        writer.write(live)
+
+    assert len(writer.paths) == 3
+    assert all(path.startswith(str(tmp_path / 'drive_')) for path in writer.paths)
+    assert [pq.read_metadata(path).num_rows for path in writer.paths] == [4, 4, 2]
+    timestamps = [ts for path in writer.paths for ts in pq.read_table(path).column('timestamp').to_pylist()]
+    assert timestamps == [s.timestamp for s in live]
+
+
+def test_rolling_writer_flush_interval(tmp_path):
+    writer = RollingParquetWriter(str(tmp_path), pids=[0x0C], flush_interval=0.0)
+    writer.write(samples(3))
+    # the samples are written as they come, the file is readable once closed
+    assert writer._writer.pending == 0
+    assert writer._writer.rows == 3
+    writer.close()
+    assert pq.read_metadata(writer.paths[0]).num_rows == 3
+
+
+def test_export_recording(tmp_path):
+    path = str(tmp_path / 'session.mclr')
+    start = time.monotonic()
+    with Recorder(path, index_interval=4) as rec:
+        for i in range(10):
+            rec.write(start + i / 10, 0x0C, bytes((0x0B, 0xB8 + i)))
+            rec.write(start + i / 10, 0x05, bytes((40 + i,)))
+        rec.write(start + 1, 0x02, b'VIN', mode=0x09)
+
+    out = str(tmp_path / 'session.parquet')
+    assert export_recording(path, out, adapter='car', chunk_size=8) == 21
+
+    table = pq.read_table(out)
+    # the fields of the recorded Mode 01 PIDs only
+    assert table.schema.names[6:] == ['coolant_temperature', 'engine_speed']
+    rows = table.to_pydict()
+    assert set(rows['adapter']) == {'car'}
+    assert rows['engine_speed'][:4] == [750.0, None, 750.25, None]
+    assert rows['coolant_temperature'][:4] == [None, 0.0, None, 1.0]
+    assert rows['mode'][-1] == 0x09 and rows['data'][-1] == b'VIN'
+    with Recording(path) as rec:
+        walls = rec.wall_times(rec.records['timestamp'][rec.records['kind'] == SAMPLE])
+    assert [t.timestamp() for t in rows['time']] == pytest.approx(walls.tolist(), abs=1e-6)
+
+
+def test_export_recording_pids(tmp_path):
+    path = str(tmp_path / 'session.mclr')
+    with Recorder(path) as rec:
+        rec.write(time.monotonic(), 0x0C, b'\x0B\xB8')
+        rec.write(time.monotonic(), 0x0D, b'\x50')
+
+    out = str(tmp_path / 'session.parquet')
+    with Recording(path) as rec:
+        assert export_recording(rec, out, pids=[0x0D]) == 2
+    rows = pq.read_table(out).to_pydict()
+    assert 'engine_speed' not in rows
+    assert rows['vehicle_speed'] == [None, 80.0]
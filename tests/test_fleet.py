@@ -0,0 +1,28 @@
+import os
+import pty
+import time
+
+from core.collectors.fleet import ELM327Fleet
+from core.connection.simulator import PtyELM327Simulator
+
+
+def test_polling_and_stuck_adapter():
+    sim = PtyELM327Simulator()
+    # nothing answers on this port: its worker stays stuck in the reset of the adapter
+    master, slave = pty.openpty()
+    silent = os.ttyname(slave)
+    try:
+        fleet = ELM327Fleet({0x0C: 50.0}, ports=[sim.port, silent])
+        fleet.start()
+        samples = list(fleet.samples(duration=0.5))
+        start = time.monotonic()
+        fleet.stop(timeout=1.0)
+        assert time.monotonic() - start < 3.0
+    finally:
+        sim.close()
+        os.close(master)
+        os.close(slave)
+
+    assert samples and all(s.adapter == sim.port and s.data == bytes.fromhex('1AF8') for s in samples)
+    assert fleet.achieved_rates[sim.port][0x0C] > 0
+    assert fleet.errors == {silent: "Worker did not stop in time"}
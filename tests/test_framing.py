@@ -0,0 +1,91 @@
+from typing import List
+
+from core.connection.framing import FrameReader
+from core.utils.metrics import AdapterMetrics, Registry
+
+
+class Chunks:
+    """
+    Connection receiving the given chunks, one per read (a read after the last one times out)
+    """
+
+    def __init__(self, chunks: List[bytes], pending: bytes = b''):
+        self.chunks = list(chunks)
+        self.pending = pending  # returned by read_all
+
+    def read_into(self, buffer: memoryview) -> int:
+        if not self.chunks:
+            return 0
+        chunk = self.chunks.pop(0)
+        n = min(len(chunk), len(buffer))
+        buffer[:n] = chunk[:n]
+        if n < len(chunk):
+            self.chunks.insert(0, chunk[n:])
+        return n
+
+    def read_all(self) -> bytes:
+        ret, self.pending = self.pending, b''
+        return ret
+
+
+def test_delimiter_split_across_chunks():
+    reader = FrameReader(Chunks([b'41 0C 1A F8\r\r', b'>41 0D 32\r', b'\r', b'>']))
+    assert bytes(reader.read_until(b'\r\r>')) == b'41 0C 1A F8\r\r>'
+    assert bytes(reader.read_until(b'\r\r>')) == b'41 0D 32\r\r>'
+    assert reader.buffered == 0
+
+
+def test_frames_in_one_chunk():
+    reader = FrameReader(Chunks([b'OK\r\r>ELM327 v1.5\r\r>', b'NO DATA\r\r>']))
+    assert [bytes(f) for f in reader.frames()] == [b'OK\r\r>', b'ELM327 v1.5\r\r>', b'NO DATA\r\r>']
+
+
+def test_read_until_size():
+    reader = FrameReader(Chunks([b'0123456789>']))
+    assert bytes(reader.read_until(b'>', size=4)) == b'0123'
+    assert bytes(reader.read_until(b'>', size=20)) == b'456789>'
+
+
+def test_read_around_buffer_boundaries():
+    # a small buffer: compacted, then grown
+    reader = FrameReader(Chunks([b'abcdef', b'ghij', b'klmnopqrstuvwxyz']), size=8)
+    assert bytes(reader.read(3)) == b'abc'
+    assert bytes(reader.read(5)) == b'defgh'  # the rest of the first chunk and the start of the second
+    assert bytes(reader.read(10)) == b'ijklmnopqr'
+    assert bytes(reader.read(2)) == b'st'
+    assert bytes(reader.read(20)) == b'uvwxyz'  # times out, partial
+
+
+def test_read_line():
+    conn = Chunks([b'7E8 03 41', b' 0C\r7E9', b''])
+    reader = FrameReader(conn)
+    assert bytes(reader.read_line()) == b'7E8 03 41 0C\r'
+    assert reader.read_line() is None  # timed out, the bytes stay buffered
+    assert reader.buffered == 3
+    conn.chunks = [b' 03 41 0D\r']
+    assert bytes(reader.read_line()) == b'7E9 03 41 0D\r'
+
+
+def test_timeout_returns_partial():
+    reader = FrameReader(Chunks([b'SEARCHING...\r']))
+    assert bytes(reader.read_until(b'>')) == b'SEARCHING...\r'
+    assert bytes(reader.read_until(b'>')) == b''
+    assert list(FrameReader(Chunks([b'41 0C'])).frames()) == [b'41 0C']
+
+
+def test_read_all_and_clear():
+    conn = Chunks([b'abc', b'ghi'], pending=b'def')
+    reader = FrameReader(conn)
+    assert bytes(reader.read(1)) == b'a'
+    assert bytes(reader.read_all()) == b'bcdef'  # buffered, then received without waiting
+    assert bytes(reader.read(2)) == b'gh'
+    reader.clear()
+    assert reader.buffered == 0 and bytes(reader.read(1)) == b''
+
+
+def test_metrics():
+    metrics = AdapterMetrics('test', Registry())
+    reader = FrameReader(Chunks([b'OK\r', b'\r>']), metrics=metrics)
+    reader.read_until(b'>')
+    reader.read_until(b'>')
+    assert (metrics.reads.value, metrics.bytes_read.value, metrics.timeouts.value) == (3, 5, 1)
@@ -0,0 +1,88 @@
+import pytest
+
+from core.collectors.isotp import (ISOTPError, frame_count, negative_response, parse_flow_control, parse_line,
+                                   reassemble, segment)
+
+VIN = bytes.fromhex('490201') + b'VF1AB000123456789'
+VIN_FRAMES = ['10 14 49 02 01 56 46 31', '21 41 42 30 30 30 31 32', '22 33 34 35 36 37 38 39']
+
+
+@pytest.mark.parametrize('size, count', [(0, 1), (7, 1), (8, 2), (13, 2), (14, 3), (20, 3), (0xFFF, 586)])
+def test_frame_count(size, count):
+    assert frame_count(size) == count
+    assert len(segment(bytes(size))) == count
+
+
+def test_segment():
+    assert segment(b'\x22\xF1\x90') == [bytes.fromhex('0322F19000000000')]
+    assert segment(b'\x22\xF1\x90', padding=None) == [bytes.fromhex('0322F190')]
+    assert segment(VIN, padding=0xAA) == [bytes.fromhex(f.replace(' ', '')) + b'\xAA' * (8 - len(f.split()))
+                                          for f in VIN_FRAMES]
+    with pytest.raises(ISOTPError):
+        segment(bytes(0x1000))
+
+
+def test_segment_sequence_numbers_wrap():
+    frames = segment(bytes(range(200)), padding=None)
+    assert [f[0] for f in frames[1:18]] == [0x20 | (i & 0x0F) for i in range(1, 18)]
+    assert b''.join(f[1:] for f in frames[1:]) == bytes(range(6, 200))
+
+
+@pytest.mark.parametrize('frame, expected', [
+    ('300000', (0, 0, 0.0)),
+    ('31000A', (1, 0, 0.010)),
+    ('320814', (2, 8, 0.020)),
+    ('3000F5', (0, 0, 0.0005)),
+    ('3000FA', (0, 0, 0.127)),
+])
+def test_parse_flow_control(frame, expected):
+    status, block, seconds = parse_flow_control(bytes.fromhex(frame))
+    assert (status, block) == expected[:2] and seconds == pytest.approx(expected[2])
+
+
+@pytest.mark.parametrize('frame', ['3000', '210000'])
+def test_parse_flow_control_invalid(frame):
+    with pytest.raises(ISOTPError):
+        parse_flow_control(bytes.fromhex(frame))
+
+
+def test_parse_line():
+    assert parse_line(b'7E8 03 41 0C 1A', True) == (0x7E8, bytes.fromhex('03410C1A'))
+    assert parse_line(b'18DAF110034100BE', True) == (0x18DAF110, bytes.fromhex('034100BE'))
+    assert parse_line(b'03 41 0C 1A', False) == (None, bytes.fromhex('03410C1A'))
+    with pytest.raises(ISOTPError):
+        parse_line(b'NO DATA', False)
+
+
+def test_reassemble_formatted():
+    lines = [b'014', b'0: 49 02 01 56 46 31', b'1: 41 42 30 30 30 31 32', b'2: 33 34 35 36 37 38 39']
+    assert reassemble(lines) == [(None, VIN)]
+    assert reassemble([b'41 0C 1A F8']) == [(None, bytes.fromhex('410C1AF8'))]
+    with pytest.raises(ISOTPError):
+        reassemble(lines[:-1])
+    with pytest.raises(ISOTPError):
+        reassemble([lines[0], lines[2]])
+
+
+def test_reassemble_caf_off():
+    lines = [f.encode() + b' 00' * (8 - len(f.split())) for f in VIN_FRAMES]
+    assert reassemble(lines, caf=False) == [(None, VIN)]
+    assert reassemble([b'04 41 0C 1A F8 55 55 55'], caf=False) == [(None, bytes.fromhex('410C1AF8'))]
+
+
+def test_reassemble_several_ecus():
+    lines = [b'7E8 ' + VIN_FRAMES[0].encode(), b'7E9 04 41 0C 1A F8', b'7EA 10 08 49 02 01 00 00 00',
+             b'7E8 ' + VIN_FRAMES[1].encode(), b'7EA 21 00 00', b'7E8 ' + VIN_FRAMES[2].encode()]
+    assert reassemble(lines, headers=True) == [(0x7E9, bytes.fromhex('410C1AF8')),
+                                               (0x7EA, bytes.fromhex('4902010000000000')), (0x7E8, VIN)]
+
+
+def test_reassemble_wrong_sequence():
+    with pytest.raises(ISOTPError):
+        reassemble([b'7E8 ' + VIN_FRAMES[0].encode(), b'7E8 ' + VIN_FRAMES[2].encode()], headers=True)
+
+
+def test_negative_response():
+    assert negative_response(bytes.fromhex('7F2231')) == 'request out of range (NRC 31)'
+    assert negative_response(bytes.fromhex('7F22AB')) == 'unknown (NRC AB)'
+    assert negative_response(bytes.fromhex('62F190')) is None
@@ -0,0 +1,119 @@
+import logging
+
+import pytest
+
+from core.utils import log
+from core.utils.log import IO_LOGGERS, IOTraceFilter, setup_log, stop_log
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def trace(i, level=logging.DEBUG):
+    return logging.LogRecord('MCL.USBSerial', level, __file__, 0, "read %d", (i,), None)
+
+
+def kept(trace_filter, records):
+    return [record.getMessage() for record in records if trace_filter.filter(record)]
+
+
+def test_filter_sample():
+    trace_filter = IOTraceFilter(sample=3)
+    assert kept(trace_filter, map(trace, range(1, 10))) == [
+        'read 3 (2 traces dropped)', 'read 6 (2 traces dropped)', 'read 9 (2 traces dropped)']
+
+
+def test_filter_keeps_other_levels():
+    trace_filter = IOTraceFilter(sample=100, rate=0.001)
+    records = [trace(i, level) for i, level in enumerate((logging.INFO, logging.WARNING, logging.ERROR))]
+    assert kept(trace_filter, records) == ['read 0', 'read 1', 'read 2']
+
+
+def test_filter_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(log, 'time', clock)
+    trace_filter = IOTraceFilter(rate=2)
+    # a burst of one second of traces, then nothing until a token is back
+    assert kept(trace_filter, map(trace, range(5))) == ['read 0', 'read 1']
+    clock.now += 0.25
+    assert kept(trace_filter, [trace(5)]) == []
+    clock.now += 0.25
+    assert kept(trace_filter, [trace(6)]) == ['read 6 (4 traces dropped)']
+    # the bucket does not fill over one second of traces
+    clock.now += 10
+    assert len(kept(trace_filter, map(trace, range(7, 12)))) == 2
+
+
+def test_filter_sample_and_rate(monkeypatch):
+    monkeypatch.setattr(log, 'time', Clock())
+    trace_filter = IOTraceFilter(sample=2, rate=1)
+    assert kept(trace_filter, map(trace, range(1, 7))) == ['read 2 (1 traces dropped)']
+
+
+@pytest.fixture
+def mcl_logger(tmp_path, monkeypatch):
+    """
+    The MCL logger, restored after the test. The debug file is written in tmp_path.
+    """
+    monkeypatch.chdir(tmp_path)
+    logger = logging.getLogger('MCL')
+    level, handlers = logger.level, list(logger.handlers)
+    yield logger
+    stop_log()
+    for handler in logger.handlers[len(handlers):]:
+        logger.removeHandler(handler)
+        handler.close()
+    logger.setLevel(level)
+    for name in IO_LOGGERS:
+        for trace_filter in logging.getLogger(name).filters[:]:
+            logging.getLogger(name).removeFilter(trace_filter)
+
+
+def debug_file(tmp_path):
+    path, = tmp_path.glob('debug_*.log')
+    return path.read_text()
+
+
+def test_setup_log(mcl_logger, tmp_path, capsys):
+    setup_log()
+    logging.getLogger('MCL.test').debug("polling %s", 'rpm')
+    logging.getLogger('MCL.test').warning("timeout")
+
+    assert log.listener is None
+    text = debug_file(tmp_path)
+    assert 'DEBUG - MCL.test - polling rpm' in text and 'WARNING - MCL.test - timeout' in text
+    err = capsys.readouterr().err
+    assert 'timeout' in err and 'polling' not in err
+
+
+def test_setup_log_queued(mcl_logger, tmp_path, capsys):
+    setup_log(queued=True)
+    assert log.listener is not None
+    for i in range(100):
+        logging.getLogger('MCL.test').debug("sample %d", i)
+    logging.getLogger('MCL.test').warning("timeout")
+
+    # the queued records are all written when the log is stopped
+    stop_log()
+    assert log.listener is None
+    lines = debug_file(tmp_path).splitlines()
+    assert [line.split(' - ')[-1] for line in lines] == [f'sample {i}' for i in range(100)] + ['timeout']
+    err = capsys.readouterr().err
+    assert 'timeout' in err and 'sample' not in err
+    # a second stop, e.g. at exit, does nothing
+    stop_log()
+
+
+def test_setup_log_io_filters(mcl_logger, tmp_path):
+    setup_log(queued=True, io_sample=10)
+    assert all(isinstance(logging.getLogger(name).filters[-1], IOTraceFilter) for name in IO_LOGGERS)
+    for i in range(1, 31):
+        logging.getLogger('MCL.USBSerial').debug("read %d", i)
+    stop_log()
+    assert [line.split(' - ')[-1] for line in debug_file(tmp_path).splitlines()] == [
+        'read 10 (9 traces dropped)', 'read 20 (9 traces dropped)', 'read 30 (9 traces dropped)']
@@ -0,0 +1,75 @@
+import pytest
+
+from core.utils.metrics import AdapterMetrics, Counter, Histogram, Registry
+
+
+def test_counter():
+    counter = Counter()
+    counter.inc()
+    counter.inc(2.5)
+    assert counter.value == 3.5
+
+
+def test_histogram():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    assert histogram.percentile(50) is None
+    for value in (0.5, 1.0, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]  # the bounds are inclusive
+    assert (histogram.count, histogram.sum) == (5, 16.0)
+    assert histogram.percentile(40) == pytest.approx(1.0)
+    assert histogram.percentile(50) == pytest.approx(1.5)
+    assert histogram.percentile(100) == 4.0  # the last bucket has no bound
+
+
+def test_registry():
+    registry = Registry()
+    assert registry.counter('c', 'help', adapter='a') is registry.counter('c', adapter='a')
+    assert registry.counter('c', adapter='a') is not registry.counter('c', adapter='b')
+    registry.counter('c', adapter='a').inc(3)
+    registry.histogram('h', 'Durations', buckets=(0.1,), kind='obd').observe(0.05)
+    snapshot = registry.snapshot()
+    assert snapshot['c'] == [{'labels': {'adapter': 'a'}, 'value': 3}, {'labels': {'adapter': 'b'}, 'value': 0}]
+    [h] = snapshot['h']
+    assert h.pop('labels') == {'kind': 'obd'}
+    assert h == pytest.approx({'count': 1, 'sum': 0.05, 'p50': 0.05, 'p90': 0.09, 'p99': 0.099})
+
+
+def test_prometheus():
+    registry = Registry()
+    registry.counter('mcl_reads_total', "Reads", adapter='/dev/tty"USB0"').inc(2)
+    histogram = registry.histogram('mcl_seconds', "Durations", buckets=(0.1, 1.0), kind='at')
+    histogram.observe(0.05)
+    histogram.observe(5.0)
+    assert registry.prometheus() == '\n'.join([
+        '# HELP mcl_reads_total Reads',
+        '# TYPE mcl_reads_total counter',
+        'mcl_reads_total{adapter="/dev/tty\\"USB0\\""} 2',
+        '# HELP mcl_seconds Durations',
+        '# TYPE mcl_seconds histogram',
+        'mcl_seconds_bucket{kind="at",le="0.1"} 1',
+        'mcl_seconds_bucket{kind="at",le="1.0"} 1',
+        'mcl_seconds_bucket{kind="at",le="+Inf"} 2',
+        'mcl_seconds_sum{kind="at"} 5.05',
+        'mcl_seconds_count{kind="at"} 2',
+    ]) + '\n'
+
+
+def test_summary_rate_of_the_adapter():
+    registry = Registry()
+    registry.start -= 1000  # registry running long before the adapter connects
+    old = AdapterMetrics('adapter', registry)
+    for _ in range(50):
+        old.command('obd', 0.001, 0.0008)
+
+    # reconnection of the same adapter
+    metrics = AdapterMetrics('adapter', registry)
+    metrics.start -= 1.0
+    for _ in range(100):
+        metrics.command('obd', 0.001, 0.0008)
+    metrics.answer('NO DATA')
+    summary = metrics.summary()
+    assert summary['commands']['obd']['count'] == 150
+    assert summary['commands']['obd']['per_second'] == pytest.approx(100, rel=0.05)
+    assert summary['answers'] == {'NO DATA': 1}
+    assert summary['host_seconds'] == pytest.approx(150 * 0.0002)
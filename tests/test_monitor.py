@@ -0,0 +1,99 @@
+import itertools
+import time
+
+import pytest
+
+from core.collectors.ELM327 import ELM327, ELM327Error
+from core.collectors.monitor import id_digits, parse_frame, plan_filters
+from core.connection.simulator import DEFAULT_BUS, ELM327Simulator
+from core.utils.metrics import Registry
+
+
+def make(**sim_args):
+    sim = ELM327Simulator(**sim_args)
+    elm = ELM327(sim, registry=Registry())
+    # the monitor needs the protocol, found by the first request
+    elm.query(0x01, 0x00)
+    return sim, elm
+
+
+def test_parse_frame():
+    assert parse_frame(b'7E8 03 41 0C 1A', 3) == (0x7E8, bytes.fromhex('03410C1A'))
+    assert parse_frame(b'18DAF11003410C1A', 8) == (0x18DAF110, bytes.fromhex('03410C1A'))
+    assert parse_frame(b'7E8 03 41 <RX ERROR', 3) is None
+    assert parse_frame(b'7E', 3) is None
+    assert parse_frame(b'CAN ERROR', 3) is None
+    assert id_digits(6) == 3 and id_digits(7) == 8
+
+
+def test_plan_filters():
+    assert plan_filters([0x7E8]) == ([b'AT CRA 7E8'], 0x7E8, 0x7FF, True)
+    assert plan_filters([0x7E8], cra=False).commands == [b'AT CF 7E8', b'AT CM 7FF']
+    # 7E8-7EB differ by the 2 low bits only
+    assert plan_filters([0x7E8, 0x7E9, 0x7EA, 0x7EB]) == ([b'AT CF 7E8', b'AT CM 7FC'], 0x7E8, 0x7FC, True)
+    plan = plan_filters([0x7E8, 0x7EB])
+    assert (plan.mask, plan.exact) == (0x7FC, False)
+    assert plan_filters([0x18DAF110], digits=8).commands == [b'AT CRA 18DAF110']
+
+
+def test_monitor():
+    sim, elm = make()
+    frames = elm.monitor()
+    received = list(itertools.islice(frames, 2 * len(DEFAULT_BUS)))
+    frames.close()
+
+    assert [(can_id, data) for _, can_id, data in received] == DEFAULT_BUS * 2
+    assert all(a.timestamp <= b.timestamp for a, b in zip(received, received[1:]))
+    # stopped, with the headers off again: the adapter answers the next requests
+    assert not sim._monitoring
+    assert elm._state[b'H'] == b'0' and not sim.headers
+    assert elm.query(0x01, 0x0C)
+
+
+def test_monitor_ids():
+    sim, elm = make()
+    frames = elm.monitor(ids=[0x1E9, 0x7E8])
+    received = list(itertools.islice(frames, 6))
+    # filtered by the adapter, the IDs are in the filter while monitoring
+    assert (sim.can_filter, sim.can_mask) != (0, 0)
+    frames.close()
+
+    assert [can_id for _, can_id, _ in received] == [0x1E9, 0x7E8] * 3
+    assert (sim.can_filter, sim.can_mask) == (0, 0)
+    assert elm.query(0x01, 0x0C)
+
+
+def test_monitor_filters_restored_before_cra():
+    # AT CRA without arguments is 1.4: the filters are reset by AT D
+    sim, elm = make(version='1.3')
+    frames = elm.monitor(ids=[0x0C9])
+    assert next(frames).id == 0x0C9
+    frames.close()
+    assert (sim.can_filter, sim.can_mask) == (0, 0)
+    assert elm.query(0x01, 0x0C)
+
+
+def test_monitor_needs_protocol():
+    elm = ELM327(ELM327Simulator(), registry=Registry())
+    with pytest.raises(ELM327Error):
+        next(elm.monitor())
+
+
+@pytest.mark.parametrize('restart', [True, False])
+def test_monitor_buffer_full(restart):
+    sim, elm = make(bus_rate=2000)
+    sim.monitor_buffer = 64
+    frames = elm.monitor(restart=restart)
+    next(frames)
+    # the host stops reading: the adapter buffer overflows
+    time.sleep(0.1)
+    if restart:
+        # restarted after each overflow, which the traffic can cause again
+        assert len(list(itertools.islice(frames, 50))) == 50
+        frames.close()
+        assert elm.metrics.summary()['answers']['BUFFER FULL'] >= 1
+    else:
+        with pytest.raises(ELM327Error):
+            list(itertools.islice(frames, 50))
+        assert elm.metrics.summary()['answers']['BUFFER FULL'] == 1
+    assert elm.query(0x01, 0x0C)
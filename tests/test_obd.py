@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from core.OBD import DATA_DIR, DTCDatabase, OBDErrorCodes, dtc_to_raw, raw_to_dtc, unpack_dtcs
+
+# values of the former OBDErrorCodes Enum
+ENUM_SAMPLE = {
+    'P0000': "Aucune panne détectée",
+    'P0001': "Commande de régulateur de volume de carburant - circuit ouvert",
+    'P0133': "Sonde Lambda 1, ligne 1 - réponse lente",
+    'P0300': "Cylindre(s) multiple(s) - ratés d'allumage aléatoire détectés",
+    'P0420': "Circuit de catalyseur, ligne 1 - rendement inférieur au - Plus de détails...",
+    'P0999': "Électrovanne de changement de vitesse F - circuit de commande trop fort",
+}
+
+
+def test_unpack_dtcs():
+    assert unpack_dtcs(bytes.fromhex('0133C12300000000')) == [0x0133, 0xC123]
+    assert unpack_dtcs(bytes.fromhex('0133C1')) == [0x0133]  # odd byte ignored
+    assert unpack_dtcs(b'') == []
+
+
+def test_dtc_codes():
+    assert raw_to_dtc(0x0133) == 'P0133'
+    assert raw_to_dtc(0xC123) == 'U0123'
+    assert dtc_to_raw('B1A2F') == 0x9A2F
+    with pytest.raises(ValueError):
+        dtc_to_raw('X0133')
+
+
+@pytest.mark.parametrize('code', ENUM_SAMPLE)
+def test_lookup_matches_the_enum(code):
+    assert OBDErrorCodes[code] == ENUM_SAMPLE[code]
+    assert OBDErrorCodes.description(dtc_to_raw(code)) == ENUM_SAMPLE[code]
+    assert code in OBDErrorCodes
+
+
+def test_database():
+    assert len(OBDErrorCodes) == 997
+    codes = list(OBDErrorCodes)
+    assert codes[0] == 'P0000' and codes[-1] == 'P0999' and codes == sorted(codes)
+    assert OBDErrorCodes.description('P1000') is None
+    with pytest.raises(KeyError):
+        OBDErrorCodes['P1000']
+    assert OBDErrorCodes.decode([0x0133, 0x1000, 0xC155]) == [
+        ('P0133', ENUM_SAMPLE['P0133']),
+        ('P1000', "Code constructeur (Groupe motopropulseur)"),
+        ('U0155', "Code inconnu (Réseau)"),
+    ]
+
+
+def test_build_reproduces_the_shipped_file(tmp_path):
+    path = str(tmp_path / 'dtc.bin')
+    DTCDatabase.build(os.path.join(DATA_DIR, 'dtc_fr.tsv'), path)
+    with open(path, 'rb') as built, open(OBDErrorCodes.path, 'rb') as shipped:
+        assert built.read() == shipped.read()
+
+
+def test_build_round_trip(tmp_path):
+    table = {'P0133': "Sonde lente", 'C0035': "Capteur de roue", 'B1A2F': "Carrosserie é", 'U0100': "Réseau"}
+    source = tmp_path / 'dtc.tsv'
+    source.write_text(''.join(f'{code}\t{text}\n' for code, text in table.items()) + '\n', encoding='utf-8')
+    DTCDatabase.build(str(source), str(tmp_path / 'dtc.bin'))
+
+    db = DTCDatabase(str(tmp_path / 'dtc.bin'))
+    assert {code: db[code] for code in db} == table
+    assert db.descriptions([0x0133, 0x0134]) == ["Sonde lente", None]
@@ -0,0 +1,43 @@
+from collections import Counter
+
+import pytest
+
+from core.PID import MODE01_PIDS, decode
+
+
+def test_field_names_unique():
+    names = Counter(field.name for fields in MODE01_PIDS.values() for field in fields)
+    assert [name for name, n in names.items() if n > 1] == []
+
+
+@pytest.mark.parametrize('pid', [0x14, 0x24, 0x34])
+def test_o2_sensor_fields_kept(pid):
+    assert len(decode(pid, bytes.fromhex('80008000'))) == len(MODE01_PIDS[pid])
+
+
+def test_decode():
+    assert decode(0x0C, bytes.fromhex('1AF8')) == {'engine_speed': 0x1AF8 / 4}
+    assert decode(0x05, bytes.fromhex('7B')) == {'coolant_temperature': 0x7B - 40}
+
+
+def test_decode_array():
+    np = pytest.importorskip('numpy')
+    from core.decoding import decode_replies
+
+    values = decode_replies(0x0C, [b'41 0C 1A F8', b'410C0FA0'])
+    assert np.allclose(values['engine_speed'], [0x1AF8 / 4, 0x0FA0 / 4])
+
+
+def test_hex_to_array():
+    pytest.importorskip('numpy')
+    from core.decoding import hex_to_array
+
+    assert hex_to_array([b'41 0C 1A F8', '410C0FA0']).tolist() == [[0x41, 0x0C, 0x1A, 0xF8], [0x41, 0x0C, 0x0F, 0xA0]]
+    assert hex_to_array([]).shape == (0, 0)
+    # same number of digits in total, but ragged lines
+    with pytest.raises(ValueError):
+        hex_to_array([b'410C1A', b'410C1AF8F8'])
+    with pytest.raises(ValueError):
+        hex_to_array([b'410', b'C1A'])
+    with pytest.raises(ValueError):
+        hex_to_array([b'41 0C 1A FG'])
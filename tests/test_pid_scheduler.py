@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from core.collectors.ELM327 import ELM327
+from core.collectors.pid_scheduler import PIDScheduler
+from core.connection.simulator import ELM327Simulator
+from core.utils.metrics import Registry
+
+
+def test_duration_not_overrun():
+    scheduler = PIDScheduler(ELM327(ELM327Simulator(), registry=Registry()), {0x0C: 1.0})
+    start = time.monotonic()
+    samples = list(scheduler.samples(duration=0.3))
+    assert time.monotonic() - start < 0.6
+    assert [s.pid for s in samples] == [0x0C]
+
+
+def test_unsupported_pid_counted_as_error():
+    scheduler = PIDScheduler(ELM327(ELM327Simulator(), registry=Registry()), {0x0C: 100.0, 0x42: 100.0},
+                             batch=False)
+    samples = list(scheduler.samples(duration=0.2))
+    assert {s.pid for s in samples} == {0x0C}
+    assert scheduler.errors()[0x42] > 0
+
+
+class FailingSimulator(ELM327Simulator):
+    fail = False
+
+    def write(self, data: bytes):
+        if self.fail:
+            raise ConnectionError("adapter unplugged")
+        return super().write(data)
+
+
+def test_link_failure_raised_with_rates():
+    sim = FailingSimulator()
+    scheduler = PIDScheduler(ELM327(sim, registry=Registry()), {0x0C: 100.0})
+    samples = scheduler.samples()
+    next(samples)
+    sim.fail = True
+    with pytest.raises(ConnectionError):
+        list(samples)
+    assert scheduler.achieved_rates()[0x0C] > 0
@@ -0,0 +1,52 @@
+import pytest
+
+from core.collectors.ELM327 import ELM327
+from core.connection.simulator import DEFAULT_PIDS, ELM327Simulator
+from core.utils.metrics import Registry
+
+PIDS = [0x04, 0x05, 0x0B, 0x0C, 0x0D, 0x0F, 0x10, 0x11]
+
+
+def make(**kwargs):
+    sim = ELM327Simulator(**kwargs)
+    elm = ELM327(sim, registry=Registry())
+    elm.query(0x01, 0x00)  # the protocol is searched, and known, before recording the requests
+    assert elm.protocol == 6
+    requests = []
+    write = sim.write
+
+    def recording(data):
+        requests.append(bytes(data).rstrip(b'\r\n'))
+        return write(data)
+
+    sim.write = recording
+    return sim, elm, requests
+
+
+def test_batched_by_six():
+    sim, elm, requests = make()
+    assert elm.query_pids(PIDS + [0x0C]) == {pid: DEFAULT_PIDS[pid] for pid in PIDS}
+    assert requests == [b'0104050B0C0D0F', b'011011']
+
+
+def test_unanswered_pids_left_out():
+    sim, elm, requests = make()
+    # 0x06 is not supported by the vehicle, 0xA6 has no known size (requested alone)
+    assert elm.query_pids([0x0C, 0x06, 0x0D, 0xA6]) == {0x0C: DEFAULT_PIDS[0x0C], 0x0D: DEFAULT_PIDS[0x0D]}
+    assert requests == [b'010C060D', b'01A6']
+
+
+@pytest.mark.parametrize('headers', [False, True], ids=['headers-off', 'headers-on'])
+def test_several_ecus(headers):
+    sim, elm, requests = make(ecus=2)
+    if headers:
+        elm.send_command(b'AT H1')
+    assert elm.query_pids(PIDS[:6]) == {pid: DEFAULT_PIDS[pid] for pid in PIDS[:6]}
+    assert requests[-1] == b'0104050B0C0D0F' and len(requests) == (2 if headers else 1)
+
+
+def test_single_requests_without_can():
+    sim, elm, requests = make()
+    elm._protocol = 3  # ISO 9141-2: one PID per request
+    assert elm.query_pids([0x0C, 0x0D]) == {0x0C: DEFAULT_PIDS[0x0C], 0x0D: DEFAULT_PIDS[0x0D]}
+    assert [r[:4] for r in requests] == [b'010C', b'010D']
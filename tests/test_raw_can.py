@@ -0,0 +1,63 @@
+import pytest
+
+from core.collectors.ELM327 import ELM327, ELM327Error
+from core.connection.simulator import DEFAULT_MEMORY, ELM327Simulator
+from core.utils.metrics import Registry
+
+# 9 bytes: a first frame and a consecutive frame
+MULTI_FRAME_READ = bytes.fromhex('22F190F187F18CF195')
+
+
+@pytest.fixture(params=[False, True], ids=['headers-off', 'headers-on'])
+def elm(request):
+    sim = ELM327Simulator()
+    elm = ELM327(sim, registry=Registry())
+    if request.param:
+        elm.send_command(b'AT H1')
+    elm.set_header(0x7E0)
+    return elm
+
+
+def test_upload_restores_auto_formatting(elm):
+    assert elm.upload(0x100, 0x800) == DEFAULT_MEMORY[0x100:0x900]
+    assert elm._state[b'CAF'] == b'1'
+    assert elm.query(0x01, 0x0C) == bytes.fromhex('1AF8')
+
+
+def test_send_frame_restores_auto_formatting(elm):
+    answer = elm.send_frame(bytes.fromhex('020100'))
+    assert answer[0][1][:3] == bytes.fromhex('064100')
+    assert elm.query(0x01, 0x0C) == bytes.fromhex('1AF8')
+
+
+def test_uds_multi_frame_request(elm):
+    answer = elm.uds(MULTI_FRAME_READ)
+    assert answer.startswith(b'\x62\xF1\x90VF1AB000123456789\xF1\x87')
+    assert answer.endswith(b'\xF1\x95SW 1.02')
+
+
+def test_flow_control_wait(elm):
+    elm._conn.ecu_flow_waits = 2
+    assert elm.uds(MULTI_FRAME_READ)[:3] == b'\x62\xF1\x90'
+    assert elm._fc_waits
+
+
+def test_flow_control_too_many_waits(elm):
+    elm._conn.ecu_flow_waits = ELM327.MAX_FC_WAITS + 1
+    with pytest.raises(ELM327Error, match='wait'):
+        elm.uds(MULTI_FRAME_READ)
+    assert elm._state[b'CAF'] == b'1'
+
+
+def test_flow_control_overflow(elm):
+    elm._conn.ecu_flow_control = b'\x32\x00\x00'
+    with pytest.raises(ELM327Error, match='overflow'):
+        elm.uds(MULTI_FRAME_READ)
+    assert elm.query(0x01, 0x0C) == bytes.fromhex('1AF8')
+
+
+def test_caf_off_frame_without_data():
+    elm = ELM327(ELM327Simulator(dtcs=[0x0133]), registry=Registry(), settings={b'CAF': b'0'})
+    # sent as a lone PCI byte (the host gives the PCI bytes with the auto-formatting off): nothing answers
+    assert elm.read_dtcs() == []
+    assert elm.send_request(b'0103') == [b'04 43 01 01 33 00 00 00']
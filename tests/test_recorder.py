@@ -0,0 +1,96 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from core.utils import recorder  # noqa: E402
+from core.utils.recorder import INDEX, SAMPLE, Recorder, Recording  # noqa: E402
+
+
+class Clock:
+    """
+    Monotonic and wall clocks of a machine, moved by the test
+    """
+
+    def __init__(self, monotonic: float, wall: float):
+        self._monotonic = monotonic
+        self._wall = wall
+
+    def monotonic(self) -> float:
+        return self._monotonic
+
+    def time(self) -> float:
+        return self._wall
+
+    def advance(self, seconds: float):
+        self._monotonic += seconds
+        self._wall += seconds
+
+
+def record(path, clock, count, pid=0x0C):
+    """
+    Records count samples, one every 0.1 s. Returns their wall-clock times.
+    """
+    walls = []
+    with Recorder(path, index_interval=4) as rec:
+        for i in range(count):
+            clock.advance(0.1)
+            rec.write(clock.monotonic(), pid, bytes((i, i)))
+            walls.append(clock.time())
+    return walls
+
+
+def test_seek_and_select(tmp_path, monkeypatch):
+    monkeypatch.setattr(recorder, 'time', Clock(1000.0, 1.7e9))
+    path = str(tmp_path / 'rec.mclr')
+    record(path, recorder.time, 10)
+
+    with Recording(path) as rec:
+        samples = rec.records[rec.records['kind'] == SAMPLE]
+        assert len(samples) == 10 and len(rec) == 13  # an index record every 4 records
+        assert (rec.records['kind'][3::4] == INDEX).all()
+        assert rec.seek(0.0) == 0
+        assert rec.seek(1000.35) == 4  # after the index record of the first block
+        assert rec.seek(1e9) == len(rec)
+        timestamps, data = rec.pid(0x0C, 1000.35, 1000.75)
+        assert timestamps.tolist() == pytest.approx([1000.4, 1000.5, 1000.6, 1000.7])
+        assert data.tolist() == [[3, 3], [4, 4], [5, 5], [6, 6]]
+        assert [s.data for s in rec.samples(stop=1000.25)] == [b'\x00\x00', b'\x01\x01']
+
+
+def test_reopen_after_reboot(tmp_path, monkeypatch):
+    path = str(tmp_path / 'rec.mclr')
+    monkeypatch.setattr(recorder, 'time', Clock(1000.0, 1.7e9))
+    walls = record(path, recorder.time, 10)
+
+    # an hour later, after a reboot: the monotonic clock starts again
+    monkeypatch.setattr(recorder, 'time', Clock(5.0, 1.7e9 + 3600))
+    walls += record(path, recorder.time, 10)
+
+    with Recording(path) as rec:
+        samples = rec.records[rec.records['kind'] == SAMPLE]
+        assert len(samples) == 20
+        assert (np.diff(rec.records['timestamp']) >= 0).all()
+        assert rec.wall_times(samples['timestamp']) == pytest.approx(walls)
+        second = rec.between(start=rec.start_monotonic + 3600).copy()
+        assert second[second['kind'] == SAMPLE]['data'][:, 0].tolist() == list(range(10))
+
+
+def test_decreasing_timestamp_refused(tmp_path):
+    with Recorder(str(tmp_path / 'rec.mclr')) as rec:
+        rec.write(10.0, 0x0C, b'\x1A\xF8')
+        with pytest.raises(ValueError):
+            rec.write(9.0, 0x0C, b'\x1A\xF8')
+
+
+def test_truncated_record_dropped(tmp_path):
+    path = tmp_path / 'rec.mclr'
+    with Recorder(str(path)) as rec:
+        rec.write(10.0, 0x0C, b'\x1A\xF8')
+        rec.write(11.0, 0x0C, b'\x1A\xF9')
+    path.write_bytes(path.read_bytes()[:-5])  # crash in the middle of the last record
+
+    with Recorder(str(path)) as rec:
+        with pytest.raises(ValueError):
+            rec.write(9.0, 0x0C, b'\x1A\xF8')  # before the last complete record
+    with Recording(str(path)) as rec:
+        assert [s.timestamp for s in rec.samples()] == [10.0]
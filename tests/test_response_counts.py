@@ -0,0 +1,40 @@
+from core.collectors.ELM327 import ELM327
+from core.connection.simulator import ELM327Simulator
+from core.utils.metrics import Registry
+
+
+def make(ecus=1):
+    sim = ELM327Simulator(ecus=ecus)
+    return sim, ELM327(sim, registry=Registry())
+
+
+def test_counts_keyed_on_the_found_protocol():
+    sim, elm = make()
+    assert elm._protocol is None
+    elm.query(0x01, 0x0C)
+    assert elm.response_counts == {(6, None): {b'010C': 1}}
+    assert elm._prepare_request(b'010C') == (b'010C', b'010C1')
+
+    elm.send_command(b'AT SP 7')  # counts of another protocol not reused
+    assert elm._prepare_request(b'010C') == (b'010C', b'010C')
+
+
+def test_count_dropped_when_fewer_lines():
+    sim, elm = make(ecus=2)
+    elm.send_request(b'0100')
+    assert elm.response_counts[(6, None)][b'0100'] == 2
+    sim.ecus = 1
+    assert len(elm.send_request(b'0100')) == 1  # sent with 2, the adapter waited for its timeout
+    assert b'0100' not in elm.response_counts[(6, None)]
+    elm.send_request(b'0100')
+    assert elm.response_counts[(6, None)][b'0100'] == 1
+
+
+def test_count_checked_again():
+    sim, elm = make(ecus=1)
+    elm.send_request(b'0100')
+    sim.ecus = 2  # an ECU missed when the count was learned
+    answers = [len(elm.send_request(b'0100')) for _ in range(ELM327.COUNT_CHECK)]
+    assert answers[-1] == 2
+    assert elm.response_counts[(6, None)][b'0100'] == 2
+    assert len(elm.send_request(b'0100')) == 2
@@ -0,0 +1,28 @@
+import threading
+import time
+
+from core.connection.simulator import ELM327Simulator
+
+
+def test_output_read_while_answering():
+    sim = ELM327Simulator(latency=0.3, timeout=1.0)
+    writer = threading.Thread(target=sim.write, args=(b'010C\r',))
+    start = time.monotonic()
+    writer.start()
+    # the echo is available before the answer, while the ECU is answering
+    assert sim.read_until(b'\r') == b'010C\r'
+    assert time.monotonic() - start < 0.2
+    assert sim.read_until(b'>') == b'SEARCHING...\r41 0C 1A F8\r\r>'
+    writer.join()
+
+
+def test_commands_processed_in_turn():
+    sim = ELM327Simulator(latency=0.05, timeout=1.0)
+    sim.write(b'ATE0\r')
+    sim.read_until(b'>')
+    writers = [threading.Thread(target=sim.write, args=(b'010C\r',)) for _ in range(2)]
+    for t in writers:
+        t.start()
+    for t in writers:
+        t.join()
+    assert sim.read_all() == b'SEARCHING...\r41 0C 1A F8\r\r>41 0C 1A F8\r\r>'
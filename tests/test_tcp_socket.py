@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from core.connection.simulator import TCPELM327Simulator
+from core.connection.tcp_socket import TCPSocket
+
+
+@pytest.fixture
+def conn():
+    sim = TCPELM327Simulator()
+    # a small buffer, filled and compacted several times by an answer
+    conn = TCPSocket(*sim.address, timeout=1.0, backoff=0.01, buffer_size=8)
+    conn.sim = sim
+    yield conn
+    conn.close()
+    sim.close()
+
+
+def test_read_until(conn):
+    conn.write(b'ATI\r')
+    assert conn.read_until(b'>') == b'ATI\rELM327 v1.5\r\r>'
+    conn.write(b'0100\r')
+    assert conn.read_until(b'\r', size=3) == b'010'
+    assert conn.read_until(b'\r\r>') == b'0\rSEARCHING...\r41 00 BE 1F B8 13\r\r>'
+
+
+def test_reconnect(conn):
+    conn.write(b'ATE0\r')
+    assert conn.read_until(b'>') == b'ATE0\rOK\r\r>'
+    conn.sim.disconnect()
+    with pytest.raises(ConnectionResetError):
+        conn.read_until(b'>')
+    conn.write(b'ATI\r')  # the adapter kept its settings
+    assert conn.read_until(b'>') == b'ELM327 v1.5\r\r>'
+
+
+def test_buffered_bytes_read_first(conn):
+    conn.write(b'ATI\r')
+    assert conn.read_until(b'\r') == b'ATI\r'
+    buffer = memoryview(bytearray(64))
+    received = b''
+    while not received.endswith(b'>'):
+        n = conn.read_into(buffer)
+        assert n
+        received += buffer[:n]
+    assert received == b'ELM327 v1.5\r\r>'
+    conn.write(b'ATI\r')
+    assert conn.read(4) == b'ATI\r'
+    time.sleep(0.1)
+    assert conn.read_all() == b'ELM327 v1.5\r\r>'
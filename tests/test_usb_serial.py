@@ -0,0 +1,51 @@
+import os
+import pty
+import select
+import time
+import tty
+from types import SimpleNamespace
+
+from core.connection import usb_serial
+from core.connection.usb_serial import USBSerial, set_low_latency
+
+
+def test_low_latency_restores_the_latency_timer(tmp_path, monkeypatch):
+    path = tmp_path / 'latency_timer'
+    path.write_text('8')
+    monkeypatch.setattr(usb_serial, '_latency_timer_path', lambda port: str(path))
+    com = SimpleNamespace(port='/dev/ttyUSB9')
+
+    set_low_latency(com)
+    assert path.read_text() == '1'
+    set_low_latency(com)  # enabled twice: the first value is kept
+    set_low_latency(com, enabled=False)
+    assert path.read_text() == '8'
+    set_low_latency(com, enabled=False)  # not enabled: left as it is
+    assert path.read_text() == '8'
+
+
+def test_read_into_retries_within_the_timeout(monkeypatch):
+    master, slave = pty.openpty()
+    tty.setraw(slave)
+    conn = USBSerial(os.ttyname(slave))
+    try:
+        conn.timeout = 0.2
+        timeouts = []
+        real_select = select.select
+
+        def interrupted(rlist, wlist, xlist, timeout):
+            timeouts.append(timeout)
+            if len(timeouts) < 3:
+                time.sleep(0.1)
+                raise InterruptedError
+            return real_select(rlist, wlist, xlist, timeout)
+
+        monkeypatch.setattr(select, 'select', interrupted)
+        start = time.monotonic()
+        assert conn.read_into(memoryview(bytearray(16))) == 0
+        assert time.monotonic() - start < 0.35
+        assert timeouts[0] == 0.2 and timeouts[1] < 0.15 and timeouts[2] == 0.0
+    finally:
+        conn.com.close()
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,44 @@
+from core.collectors.ELM327 import ELM327
+from core.collectors.capabilities import CapabilityCache
+from core.connection.simulator import ELM327Simulator
+from core.utils.metrics import Registry
+
+
+def record(sim):
+    sent = []
+    write = sim.write
+
+    def recording(data):
+        sent.append(bytes(data))
+        return write(data)
+
+    sim.write = recording
+    return sent
+
+
+def test_warm_connect_keeps_the_session(tmp_path):
+    cache = CapabilityCache(str(tmp_path / 'capabilities.json'))
+    sim = ELM327Simulator()
+    ELM327(sim, registry=Registry(), cache=cache, settings=ELM327.THROUGHPUT_PROFILE)
+
+    sent = record(sim)
+    elm = ELM327(sim, registry=Registry(), cache=cache, warm=True, settings=ELM327.THROUGHPUT_PROFILE)
+    commands = b''.join(sent).replace(b' ', b'').split(b'\r')
+    assert not [c for c in commands if c.startswith((b'ATZ', b'ATWS', b'ATTP', b'ATSP', b'ATE', b'ATS0'))]
+    assert elm.vin == 'VF1AB000123456789'
+    assert elm.protocol == 6
+    assert elm.pid_bitmaps
+    assert elm.query(0x01, 0x0C) == bytes.fromhex('1AF8')
+
+
+def test_warm_connect_vehicle_protocol_tried(tmp_path):
+    cache = CapabilityCache(str(tmp_path / 'capabilities.json'))
+    sim = ELM327Simulator()
+    ELM327(sim, registry=Registry(), cache=cache)
+
+    sim.write(b'AT Z\r')  # adapter restarted: no protocol running
+    sim.read_until(b'>')
+    sent = record(sim)
+    elm = ELM327(sim, registry=Registry(), cache=cache, warm=True)
+    assert b'AT TP A6\r' in sent
+    assert elm.protocol == 6